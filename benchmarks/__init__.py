@@ -0,0 +1,12 @@
+# Encoding: UTF-8
+# File: __init__.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+Benchmarks of ``gnsstools`` on synthetic files, with a regression gate against a stored baseline.
+Run ``python -m benchmarks --help`` from the root of the repository.
+"""
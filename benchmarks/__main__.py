@@ -0,0 +1,101 @@
+# Encoding: UTF-8
+# File: __main__.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+Run the benchmarks from the command line, e.g.:
+
+.. code-block:: bash
+
+    # Measure the baseline (on the reference machine)
+    python -m benchmarks --profile day --save benchmarks/baseline.json
+    # Fail (exit code 1) if a benchmark is more than 20% slower
+    python -m benchmarks --profile day --baseline benchmarks/baseline.json --threshold 1.2
+"""
+
+
+# Basic imports
+import argparse
+import json
+import sys
+
+# GNSS ToolBox
+from .suite import PROFILES, run, compare
+
+
+def _format_size(value, unit=""):
+    if value is None:
+        return "-"
+    for prefix in ["", "k", "M", "G"]:
+        if abs(value) < 1000:
+            return f"{value:.1f} {prefix}{unit}"
+        value /= 1000
+    return f"{value:.1f} T{unit}"
+
+
+def _report(results, comparison=None):
+    """Print a table of the results, and of their comparison to the baseline."""
+    print(f"Profile: {results['profile']}")
+    header = f"{'Benchmark':<42}{'Time (s)':>12}{'Items/s':>14}{'Bytes/s':>14}{'Peak RSS':>12}"
+    if comparison is not None:
+        header += f"{'Time':>9}{'RSS':>9}"
+    print(header)
+    for name, stats in results["benchmarks"].items():
+        line = f"{name:<42}{stats['time']:>12.4f}{_format_size(stats['items_per_second']):>14}" \
+               f"{_format_size(stats['bytes_per_second'], 'B'):>14}{_format_size(stats['peak_rss'], 'B'):>12}"
+        if comparison is not None and name in comparison:
+            ratios = comparison[name]
+            memory = "-" if ratios["memory_ratio"] is None else f"x{ratios['memory_ratio']:.2f}"
+            line += f"{'x' + format(ratios['time_ratio'], '.2f'):>9}{memory:>9}"
+            line += "  REGRESSION" if ratios["regression"] else ""
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", default="quick", choices=list(PROFILES),
+                        help="sizes of the synthetic files (default: quick)")
+    parser.add_argument("--hours", type=float, help="duration of the session, overriding the profile")
+    parser.add_argument("--interval", type=float, help="interval between two epochs in seconds, overriding the profile")
+    parser.add_argument("--satellites", type=int, help="number of satellites (up to 120), overriding the profile")
+    parser.add_argument("--queries", type=int, help="number of calls of the per-query benchmarks, overriding the profile")
+    parser.add_argument("--filter", default="*",
+                        help="run only the benchmarks containing or matching this pattern (e.g. 'rinex.load')")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per benchmark, the best is kept (default: 3)")
+    parser.add_argument("--data-dir", help="directory of the synthetic files (default: in the temporary directory)")
+    parser.add_argument("--save", metavar="PATH", help="write the results in a JSON file (e.g. a new baseline)")
+    parser.add_argument("--baseline", metavar="PATH", help="compare the results to this JSON file")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="maximum time ratio to the baseline before failing (default: 1.2)")
+    parser.add_argument("--memory-threshold", type=float,
+                        help="maximum peak RSS ratio to the baseline before failing (default: not checked)")
+    args = parser.parse_args(argv)
+
+    results = run(args.profile, data_dir=args.data_dir, pattern=args.filter, repeat=args.repeat,
+                  hours=args.hours, interval=args.interval, satellites=args.satellites, queries=args.queries)
+
+    comparison = None
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        comparison = compare(results, baseline, threshold=args.threshold, memory_threshold=args.memory_threshold)
+    _report(results, comparison)
+
+    if args.save is not None:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=4)
+
+    if comparison is not None:
+        regressions = [name for name, ratios in comparison.items() if ratios["regression"]]
+        if len(regressions) > 0:
+            print(f"{len(regressions)} regression(s) against {args.baseline}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
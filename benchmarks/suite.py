@@ -0,0 +1,445 @@
+# Encoding: UTF-8
+# File: suite.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module defines the benchmarks, runs them and compares their results to a baseline.
+
+Each benchmark runs in a new process (so that its peak memory is its own), on the synthetic files of a profile.
+It is called a few times: the best wall time gives the throughput (items per second, and bytes per second
+for the readers), and the peak resident set size (RSS) of the process is read at the end.
+
+A run is compared to a baseline (the JSON written by a previous run): a benchmark fails if it is slower than
+``threshold`` times its baseline (and, optionally, if its peak RSS grew more than ``memory_threshold`` times).
+"""
+
+
+# Basic imports
+from concurrent.futures import ProcessPoolExecutor
+import fnmatch
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows: the peak memory is not measured.
+    resource = None
+
+# GNSS ToolBox
+from .synthetic import Constellation, Fixtures, RECEPTOR, START, _gps_time
+
+
+__all__ = [
+    "PROFILES",
+    "BENCHMARKS",
+    "Benchmark",
+    "run",
+    "compare"
+]
+
+
+# Sizes of the synthetic sessions, and number of calls of the benchmarks called once per query.
+PROFILES = {
+    "quick": {"hours": 1, "interval": 30, "satellites": 30, "queries": 200},
+    "hour": {"hours": 1, "interval": 1, "satellites": 60, "queries": 1000},
+    "day": {"hours": 24, "interval": 30, "satellites": 120, "queries": 2000},
+    "full": {"hours": 24, "interval": 1, "satellites": 120, "queries": 5000}
+}
+
+
+class Benchmark(object):
+    r"""
+    Benchmark of a component. The subclasses prepare their data in :meth:`setup` (not measured),
+    and :meth:`run` is measured. :meth:`reset` is called (not measured) before each run, e.g. to clear a cache.
+
+    * :attr:`name` (str): Name of the benchmark.
+
+    * :attr:`items` (int): Number of items (records, queries, epochs...) processed by a run.
+
+    * :attr:`bytes` (int): Number of bytes read by a run, ``None`` if not relevant.
+    """
+
+    name = None
+
+    def __init__(self):
+        super().__init__()
+        self.items = None
+        self.bytes = None
+
+    def setup(self, fixtures, queries):
+        pass
+
+    def reset(self):
+        pass
+
+    def run(self):
+        raise NotImplementedError
+
+
+class _Load(Benchmark):
+    """Benchmark of ``rinex.load`` on one of the synthetic files."""
+
+    kind = None
+    n_jobs = 1
+
+    def setup(self, fixtures, queries):
+        # The readers import pandas on their first call, which is not part of the reading.
+        import pandas
+
+        self.filename = getattr(fixtures, self.kind)
+        self.bytes = os.path.getsize(self.filename)
+
+    def run(self):
+        from gnsstools import rinex
+
+        self.items = len(rinex.load(self.filename, n_jobs=self.n_jobs))
+
+
+class LoadObs2(_Load):
+    name = "rinex.load[obs2]"
+    kind = "obs2"
+
+
+class LoadObs3(_Load):
+    name = "rinex.load[obs3]"
+    kind = "obs3"
+
+
+# Scaling of the parallel reading. The files of less than 8 MB per process, and the processes beyond
+# the number of CPUs, are read sequentially: compare them to ``rinex.load[obs3]`` with the ``day`` profile.
+class LoadObs3Jobs2(_Load):
+    name = "rinex.load[obs3,n_jobs=2]"
+    kind = "obs3"
+    n_jobs = 2
+
+
+class LoadObs3Jobs4(_Load):
+    name = "rinex.load[obs3,n_jobs=4]"
+    kind = "obs3"
+    n_jobs = 4
+
+
+class LoadNav(_Load):
+    name = "rinex.load[nav]"
+    kind = "nav"
+
+
+class LoadSP3(_Load):
+    name = "rinex.load[sp3]"
+    kind = "sp3"
+
+
+def _satellites(df):
+    """GPS and Galileo satellites of a navigation file, as an array of ``(system, prn)``."""
+    return np.unique([(system, prn) for system, prn, _ in df.index if system in ("G", "E")], axis=0)
+
+
+def _session(fixtures):
+    """Epochs of the observation files, as ``datetime64``."""
+    return np.datetime64(START) + np.arange(0, fixtures.hours * 3600, fixtures.interval).astype("timedelta64[s]")
+
+
+def _queries(df, fixtures, queries, seed=0):
+    """Random satellites (among the GPS and Galileo ones) and dates of the session, for the navigation benchmarks.
+
+    Returns:
+        tuple: The systems, PRNs, dates as ``datetime64`` and as ``gnsstime`` of the queries.
+    """
+    from gnsstools.gnsstime import to_gnsstime
+
+    rng = np.random.default_rng(seed)
+    satellites = _satellites(df)
+    satellites = satellites[rng.integers(0, len(satellites), queries)]
+    seconds = rng.uniform(0, fixtures.hours * 3600, queries)
+    times = np.datetime64(START, "ns") + (seconds * 1e9).astype("timedelta64[ns]")
+    return satellites[:, 0], satellites[:, 1].astype(int), times, [to_gnsstime(time) for time in times]
+
+
+class NavSelect(Benchmark):
+    """``NavigationDataFrame.select``, one query at a time, from a new DataFrame (without cache) each run."""
+
+    name = "NavigationDataFrame.select"
+
+    def setup(self, fixtures, queries):
+        from gnsstools import rinex
+
+        self.df = rinex.load(fixtures.nav)
+        self.systems, self.prns, self.times, self.dates = _queries(self.df, fixtures, queries)
+        self.items = queries
+
+    def reset(self):
+        self.nav = self.df.copy()
+
+    def run(self):
+        for system, prn, date in zip(self.systems, self.prns, self.dates):
+            self.nav.select(system, prn, date)
+
+
+class NavSelectMany(NavSelect):
+    """``NavigationDataFrame.select_many``, all the queries at once."""
+
+    name = "NavigationDataFrame.select_many"
+
+    def run(self):
+        self.nav.select_many(self.systems, self.prns, self.times)
+
+
+class SatellitePosition(Benchmark):
+    """``get_satellite_position``, one satellite and date at a time."""
+
+    name = "get_satellite_position"
+
+    def setup(self, fixtures, queries):
+        from gnsstools import rinex
+
+        df = rinex.load(fixtures.nav)
+        systems, prns, _, self.dates = _queries(df, fixtures, queries)
+        self.satellites = [df.select(system, prn, date) for system, prn, date in zip(systems, prns, self.dates)]
+        self.items = queries
+
+    def run(self):
+        from gnsstools.satellites.funtional import get_satellite_position
+
+        for satellite, date in zip(self.satellites, self.dates):
+            get_satellite_position(satellite, date)
+
+
+class SatellitesPosition(Benchmark):
+    """``get_satellites_position``, for all the GPS and Galileo satellites at all the epochs of the session."""
+
+    name = "get_satellites_position"
+
+    def setup(self, fixtures, queries):
+        from gnsstools import rinex
+
+        df = rinex.load(fixtures.nav)
+        satellites, times = _satellites(df), _session(fixtures)
+        self.times = np.repeat(times, len(satellites))
+        systems, prns = np.tile(satellites[:, 0], len(times)), np.tile(satellites[:, 1].astype(int), len(times))
+        self.ephemerides = df.select_many(systems, prns, self.times)
+        self.items = len(self.times)
+
+    def run(self):
+        from gnsstools.satellites.funtional import get_satellites_position
+
+        get_satellites_position(self.ephemerides, self.times)
+
+
+class SP3Lagrange(Benchmark):
+    """The interpolation of ``Orbit.pos_sat_sp3``: ``interpolate_lagrange`` on the orbit of a satellite,
+    one date at a time."""
+
+    name = "Orbit.pos_sat_sp3[interpolate_lagrange]"
+
+    def setup(self, fixtures, queries):
+        from gnsstools import rinex
+
+        df = rinex.load(fixtures.sp3)
+        rng = np.random.default_rng(0)
+        # Orbits as in Orbit.get_sp3: [mjd, X, Y, Z, clock] per satellite.
+        self.orbits = []
+        for (system, prn), orbit in df.groupby(level=["System", "PRN"]):
+            dates = orbit.index.get_level_values("Date").values.astype("datetime64[ns]")
+            mjd = dates.astype(np.int64) / 86400e9 + 40587
+            self.orbits.append(np.column_stack([mjd, orbit[["X", "Y", "Z", "Clock"]].to_numpy()]))
+        start = (np.datetime64(START, "ns").astype(np.int64) / 86400e9) + 40587
+        self.queries = [(self.orbits[rng.integers(len(self.orbits))], start + rng.uniform(0, fixtures.hours / 24))
+                        for _ in range(queries)]
+        self.items = queries
+
+    def run(self):
+        from gnsstools.orbits.interpolation import interpolate_lagrange
+
+        for orbit, mjd in self.queries:
+            interpolate_lagrange(orbit[:, 0], orbit[:, 1:5], [mjd], order=9)
+
+
+class SP3Interpolate(Benchmark):
+    """``SP3Interpolator.interpolate``, for all the satellites at all the epochs of the session."""
+
+    name = "SP3Interpolator.interpolate"
+
+    def setup(self, fixtures, queries):
+        from gnsstools import rinex
+        from gnsstools.orbits.interpolation import SP3Interpolator
+
+        self.interpolator = SP3Interpolator(rinex.load(fixtures.sp3))
+        self.times = _session(fixtures)
+        self.items = len(self.times) * len(self.interpolator.satellites)
+
+    def run(self):
+        for system, prn in self.interpolator.satellites:
+            self.interpolator.interpolate(system, prn, self.times)
+
+
+def _geometry(fixtures, num_epochs, seed=0):
+    """Positions of the satellites above 10 degrees and their distances to the receptor, for some epochs.
+
+    Returns:
+        tuple: Satellites positions ``(E, S, 3)``, distances ``(E, S)`` and mask of the visible satellites ``(E, S)``.
+    """
+    rng = np.random.default_rng(seed)
+    constellation = Constellation(fixtures.satellites, seed=fixtures.seed)
+    _, sow = _gps_time(START)
+    seconds = sow + np.linspace(0, fixtures.hours * 3600, num_epochs, endpoint=False)
+    sat_coords = constellation.positions(seconds)
+    diff = sat_coords - RECEPTOR
+    distances = np.linalg.norm(diff, axis=-1)
+    sin_elevation = np.sum(diff * RECEPTOR, axis=-1) / (distances * np.linalg.norm(RECEPTOR))
+    mask = sin_elevation > np.sin(np.radians(10))
+    distances = distances + 300_000 + rng.normal(0, 3, distances.shape)
+    return sat_coords, distances, mask
+
+
+class TrilaterationOptimize(Benchmark):
+    """``Trilateration.optimize``, one epoch at a time."""
+
+    name = "Trilateration.optimize"
+
+    def setup(self, fixtures, queries):
+        sat_coords, distances, mask = _geometry(fixtures, queries)
+        self.epochs = [(sat_coords[e, mask[e]], distances[e, mask[e]]) for e in range(queries) if mask[e].sum() >= 4]
+        self.items = len(self.epochs)
+
+    def run(self):
+        from gnsstools.trilateration import Trilateration
+
+        for sat_coords, distances in self.epochs:
+            Trilateration(sat_coords, distances).optimize(max_steps=20)
+
+
+class TrilaterationBatch(Benchmark):
+    """``Trilateration.optimize_batch``, for all the epochs of the session at once."""
+
+    name = "Trilateration.optimize_batch"
+
+    def setup(self, fixtures, queries):
+        num_epochs = int(np.ceil(fixtures.hours * 3600 / fixtures.interval))
+        self.sat_coords, self.distances, self.mask = _geometry(fixtures, num_epochs)
+        self.items = num_epochs
+
+    def run(self):
+        from gnsstools.trilateration import Trilateration
+
+        Trilateration.optimize_batch(self.sat_coords, self.distances, self.mask)
+
+
+BENCHMARKS = {benchmark.name: benchmark for benchmark in [
+    LoadObs2, LoadObs3, LoadObs3Jobs2, LoadObs3Jobs4, LoadNav, LoadSP3,
+    NavSelect, NavSelectMany,
+    SatellitePosition, SatellitesPosition,
+    SP3Lagrange, SP3Interpolate,
+    TrilaterationOptimize, TrilaterationBatch
+]}
+
+
+def _peak_rss():
+    """Peak resident set size of the process, in bytes (``None`` if not available)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure(name, fixtures, queries, repeat):
+    """Run a benchmark (in the current process) and return its results."""
+    benchmark = BENCHMARKS[name]()
+    benchmark.setup(fixtures, queries)
+    setup_rss = _peak_rss()
+    times = []
+    for _ in range(repeat):
+        benchmark.reset()
+        start = time.perf_counter()
+        benchmark.run()
+        times.append(time.perf_counter() - start)
+    best = min(times)
+    peak_rss = _peak_rss()
+    return {
+        "time": best,
+        "median_time": float(np.median(times)),
+        "items": benchmark.items,
+        "items_per_second": benchmark.items / best if best > 0 else None,
+        "bytes_per_second": benchmark.bytes / best if benchmark.bytes and best > 0 else None,
+        "peak_rss": peak_rss,
+        "setup_rss": setup_rss
+    }
+
+
+def run(profile="quick", data_dir=None, pattern="*", repeat=3, **sizes):
+    """Run the benchmarks, each one in a new process.
+
+    Args:
+        profile (str, optional): Sizes of the synthetic files, see ``PROFILES``. Defaults to ``"quick"``.
+        data_dir (str, optional): Directory of the synthetic files, written if missing.
+            Defaults to ``None`` (``gnsstools-benchmarks`` in the temporary directory).
+        pattern (str, optional): Run only the benchmarks containing or matching (shell-style) this pattern
+            (e.g. ``"rinex.load"`` or ``"*.select*"``). Defaults to ``"*"``.
+        repeat (int, optional): Number of runs per benchmark, the best one is kept. Defaults to ``3``.
+        sizes (dict): Sizes overriding the ones of the profile (``hours``, ``interval``, ``satellites``, ``queries``).
+
+    Returns:
+        dict: The ``"profile"``, the ``"machine"`` and the results per benchmark.
+    """
+    assert profile in PROFILES, f"Unknown profile {profile}. Available profiles are {', '.join(PROFILES)}."
+    sizes = {**PROFILES[profile], **{key: value for key, value in sizes.items() if value is not None}}
+    queries = sizes.pop("queries")
+    data_dir = data_dir or os.path.join(tempfile.gettempdir(), "gnsstools-benchmarks")
+    fixtures = Fixtures(data_dir, **sizes)
+    fixtures.generate()
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in BENCHMARKS:
+        if pattern not in name and not fnmatch.fnmatchcase(name, pattern):
+            continue
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results[name] = pool.submit(_measure, name, fixtures, queries, repeat).result()
+    return {
+        "profile": {**sizes, "queries": queries},
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "benchmarks": results
+    }
+
+
+def compare(results, baseline, threshold=1.2, memory_threshold=None):
+    """Compare the results of a run to a baseline.
+
+    Args:
+        results (dict): Results of :func:`run`.
+        baseline (dict): Results of a previous run, with the same profile.
+        threshold (float, optional): Maximum ratio of the times (current / baseline). Defaults to ``1.2``.
+        memory_threshold (float, optional): Maximum ratio of the peak RSS. If ``None``, the memory is not checked.
+            Defaults to ``None``.
+
+    Returns:
+        dict: Per benchmark, the ``"time_ratio"``, ``"memory_ratio"`` and ``"regression"`` (``True`` if a threshold
+            is exceeded). The benchmarks missing from the baseline are skipped.
+    """
+    if results["profile"] != baseline["profile"]:
+        raise ValueError(f"The baseline was measured with another profile: {baseline['profile']}. "
+                         f"Got {results['profile']}.")
+    comparison = {}
+    for name, current in results["benchmarks"].items():
+        reference = baseline["benchmarks"].get(name, None)
+        if reference is None:
+            continue
+        time_ratio = current["time"] / reference["time"]
+        memory_ratio = None
+        if current["peak_rss"] and reference["peak_rss"]:
+            memory_ratio = current["peak_rss"] / reference["peak_rss"]
+        regression = time_ratio > threshold
+        if memory_threshold is not None and memory_ratio is not None:
+            regression |= memory_ratio > memory_threshold
+        comparison[name] = {"time_ratio": time_ratio, "memory_ratio": memory_ratio, "regression": regression}
+    return comparison
@@ -0,0 +1,468 @@
+# Encoding: UTF-8
+# File: synthetic.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module generates deterministic synthetic `RINEX` files, to benchmark the readers and the computations
+on realistic sizes without shipping large data files.
+
+The satellites follow Keplerian orbits (GPS, GLONASS, Galileo and BeiDou constellations), so that the files agree
+with each other: the navigation messages and the ``SP3`` positions describe the same orbits, and the pseudo-ranges
+of the observation files are the distances to a receptor (plus the clocks and some noise).
+The same arguments (and seed) always write the same files.
+
+Examples:
+    >>> fixtures = Fixtures("/tmp/gnsstools-benchmarks", hours=1, interval=30, satellites=30)
+    >>> fixtures.generate()
+    >>> df = rinex.load(fixtures.obs3)
+"""
+
+
+# Basic imports
+from datetime import datetime, timedelta
+import os
+import numpy as np
+
+# GNSS ToolBox
+from gnsstools.const import c, mu, omega_e
+
+
+__all__ = [
+    "Constellation",
+    "Fixtures",
+    "write_obs2",
+    "write_obs3",
+    "write_nav",
+    "write_sp3"
+]
+
+
+# Start of the synthetic sessions (friday of the 2022nd GPS week).
+START = datetime(2018, 10, 12)
+GPS_EPOCH = datetime(1980, 1, 6)
+
+# Approximate position of the receptor (ENSG, Marne-la-Vallée), in meters.
+RECEPTOR = np.array([4253804.4427, -224255.7080, 4731475.5125])
+
+# Constellations as ``(system, number of satellites, sqrt(a), inclination in degrees, number of planes)``.
+CONSTELLATIONS = [
+    ("G", 32, 5153.6, 55.0, 6),
+    ("R", 24, 5050.7, 64.8, 3),
+    ("E", 36, 5440.6, 56.0, 3),
+    ("C", 28, 5282.6, 55.0, 3)
+]
+
+# Observations written for each system in `RINEX3` files, and in `RINEX2` files (all systems).
+OBS_TYPES = {
+    "G": ["C1C", "L1C", "D1C", "S1C", "C2W", "L2W"],
+    "R": ["C1C", "L1C", "D1C", "S1C", "C2P", "L2P"],
+    "E": ["C1C", "L1C", "D1C", "S1C", "C5Q", "L5Q"],
+    "C": ["C2I", "L2I", "D2I", "S2I", "C7I", "L7I"]
+}
+OBS2_TYPES = ["C1", "L1", "D1", "S1", "P2", "L2"]
+
+# Wavelengths of the two frequencies, in meters.
+WAVELENGTHS = (c / 1575.42e6, c / 1227.60e6)
+
+# Interval between two SP3 epochs and two navigation messages (GLONASS: 30 minutes), in seconds.
+SP3_INTERVAL = 900
+NAV_INTERVAL = 7200
+GLONASS_NAV_INTERVAL = 1800
+# Margin added before and after the session to the navigation and SP3 files (for the interpolations), in seconds.
+MARGIN = 7200
+
+
+def _gps_time(date):
+    """GPS week and seconds of week of a date."""
+    seconds = (date - GPS_EPOCH).total_seconds()
+    return int(seconds // 604800), seconds % 604800
+
+
+def _header_line(content, label):
+    return f"{content:<60}{label}\n"
+
+
+class Constellation(object):
+    r"""
+    Satellites on Keplerian orbits, without perturbations.
+    The satellites are taken in turn from each system, e.g. ``G01, R01, E01, C01, G02...``.
+
+    * :attr:`satellites` (list): Name of the satellites (e.g. ``"G01"``).
+
+    * :attr:`sqrt_a`, :attr:`e`, :attr:`i0`, :attr:`omega0`, :attr:`omega`, :attr:`m0` (numpy.ndarray):
+        Orbital parameters of each satellite. The mean anomalies ``m0`` are given at the week :attr:`week` start.
+
+    * :attr:`clock_bias`, :attr:`clock_drift` (numpy.ndarray): Clocks of each satellite, in seconds and seconds per second.
+
+    Examples:
+        >>> constellation = Constellation(60)
+        >>> positions = constellation.positions(np.arange(432000, 435600))
+    """
+
+    def __init__(self, satellites, seed=0):
+        super().__init__()
+        total = sum(num for _, num, _, _, _ in CONSTELLATIONS)
+        assert 0 < satellites <= total, f"The number of satellites must be between 1 and {total}. Got {satellites}."
+        rng = np.random.default_rng(seed)
+        self.week, _ = _gps_time(START)
+
+        # Take the satellites in turn from each constellation.
+        slots = []
+        for rank in range(max(num for _, num, _, _, _ in CONSTELLATIONS)):
+            for system, num, sqrt_a, inclination, planes in CONSTELLATIONS:
+                if rank < num:
+                    slots.append((system, rank + 1, sqrt_a, inclination, planes, num))
+        slots = slots[:satellites]
+
+        self.satellites = [f"{system}{prn:02d}" for system, prn, _, _, _, _ in slots]
+        self.sqrt_a = np.array([slot[2] for slot in slots]) + rng.uniform(-1, 1, satellites)
+        self.e = rng.uniform(1e-3, 2e-2, satellites)
+        self.i0 = np.radians([slot[3] for slot in slots]) + rng.uniform(-1e-2, 1e-2, satellites)
+        planes = np.array([(prn - 1) % num_planes for _, prn, _, _, num_planes, _ in slots])
+        self.omega0 = 2 * np.pi * planes / np.array([slot[4] for slot in slots])
+        self.omega = rng.uniform(0, 2 * np.pi, satellites)
+        # The satellites are spread along their plane.
+        self.m0 = 2 * np.pi * np.array([(prn - 1) / num for _, prn, _, _, _, num in slots]) + rng.uniform(0, 0.1, satellites)
+        self.clock_bias = rng.uniform(-5e-4, 5e-4, satellites)
+        self.clock_drift = rng.uniform(-1e-11, 1e-11, satellites)
+
+    @property
+    def n(self):
+        """Mean motion of the satellites, in radians per second."""
+        return np.sqrt(mu / self.sqrt_a ** 6)
+
+    def anomalies(self, seconds):
+        """Mean anomalies of the satellites at some seconds of week, of shape ``(T, S)``."""
+        return self.m0 + self.n * np.asarray(seconds, dtype=np.float64)[:, None]
+
+    def positions(self, seconds):
+        """ECEF positions of the satellites.
+
+        Args:
+            seconds (numpy.ndarray): Seconds of week, of shape ``(T,)``.
+
+        Returns:
+            numpy.ndarray: Positions of shape ``(T, S, 3)``, in meters.
+        """
+        seconds = np.asarray(seconds, dtype=np.float64)
+        M = self.anomalies(seconds)
+        E = M
+        for _ in range(10):
+            E = M + self.e * np.sin(E)
+        v = 2 * np.arctan(np.sqrt((1 + self.e) / (1 - self.e)) * np.tan(E / 2))
+        r = self.sqrt_a ** 2 * (1 - self.e * np.cos(E))
+        phi = self.omega + v
+        x, y = r * np.cos(phi), r * np.sin(phi)
+        # The ascending node is fixed in inertial space, the Earth rotates below it.
+        Omega = self.omega0 + omega_e * seconds[:, None]
+        cos_i, sin_i = np.cos(self.i0), np.sin(self.i0)
+        return np.stack([x * np.cos(Omega) - y * cos_i * np.sin(Omega),
+                         x * np.sin(Omega) + y * cos_i * np.cos(Omega),
+                         y * sin_i], axis=-1)
+
+    def velocities(self, seconds, step=0.5):
+        """ECEF velocities of the satellites (central differences), of shape ``(T, S, 3)`` in meters per second."""
+        seconds = np.asarray(seconds, dtype=np.float64)
+        return (self.positions(seconds + step) - self.positions(seconds - step)) / (2 * step)
+
+    def clocks(self, seconds):
+        """Clock offsets of the satellites, of shape ``(T, S)`` in seconds."""
+        return self.clock_bias + self.clock_drift * np.asarray(seconds, dtype=np.float64)[:, None]
+
+
+def _epochs(start, duration, interval):
+    """Dates and seconds of week of the epochs ``start, start + interval, ...`` (``duration`` excluded)."""
+    num_epochs = int(np.ceil(duration / interval))
+    dates = [start + timedelta(seconds=i * interval) for i in range(num_epochs)]
+    _, sow = _gps_time(start)
+    return dates, sow + interval * np.arange(num_epochs, dtype=np.float64)
+
+
+def _observations(constellation, seconds, rng, noise=1.):
+    """Observations of the receptor (in the order of ``OBS_TYPES``), of shape ``(T, S, 6)``."""
+    positions = constellation.positions(seconds)
+    diff = positions - RECEPTOR
+    distances = np.linalg.norm(diff, axis=-1)
+    rates = np.sum(constellation.velocities(seconds) * diff, axis=-1) / distances
+    # Receptor clock: 1 ms, drifting by 10 ns/s.
+    cdt_receptor = c * (1e-3 + 1e-8 * (seconds - seconds[0]))[:, None]
+    ranges = distances + cdt_receptor - c * constellation.clocks(seconds)
+    shape = distances.shape
+    return np.stack([
+        ranges + rng.normal(0, noise, shape),
+        ranges / WAVELENGTHS[0] + rng.normal(0, 0.01, shape),
+        -rates / WAVELENGTHS[0],
+        rng.uniform(30, 50, shape),
+        ranges + rng.normal(0, noise, shape),
+        ranges / WAVELENGTHS[1] + rng.normal(0, 0.01, shape),
+    ], axis=-1)
+
+
+def _obs_blocks(constellation, hours, interval, seed, block_size=600):
+    """Yield the dates and observations of the session, by blocks of epochs (to bound the memory)."""
+    rng = np.random.default_rng(seed)
+    dates, seconds = _epochs(START, hours * 3600, interval)
+    for start in range(0, len(dates), block_size):
+        stop = start + block_size
+        yield dates[start:stop], _observations(constellation, seconds[start:stop], rng)
+
+
+def _obs_header(version, constellation, interval, fields):
+    lines = [_header_line(f"{version:9.2f}{'':11}{'OBSERVATION DATA':<20}{'M (MIXED)':<20}", "RINEX VERSION / TYPE"),
+             _header_line(f"{'gnsstools':<20}{'benchmarks':<20}{START:%Y%m%d %H%M%S} GPS", "PGM / RUN BY / DATE"),
+             _header_line("SYNT", "MARKER NAME"),
+             _header_line("".join(f"{value:14.4f}" for value in RECEPTOR), "APPROX POSITION XYZ")]
+    lines.extend(fields)
+    lines.append(_header_line(f"{interval:10.3f}", "INTERVAL"))
+    lines.append(_header_line(f"{START:  %Y    %m    %d    %H    %M   %S}.0000000     GPS", "TIME OF FIRST OBS"))
+    lines.append(_header_line("", "END OF HEADER"))
+    return lines
+
+
+def write_obs2(filename, constellation, hours=1, interval=30, seed=0):
+    """Write a `RINEX2` observation file.
+
+    Args:
+        filename (str): Path of the file to write.
+        constellation (Constellation): Satellites observed, at all the epochs.
+        hours (float, optional): Duration of the session, in hours. Defaults to ``1``.
+        interval (float, optional): Interval between two epochs, in seconds. Defaults to ``30``.
+        seed (int, optional): Seed of the noise. Defaults to ``0``.
+
+    Returns:
+        int: Number of records written (epochs x satellites).
+    """
+    fields = [_header_line(f"{len(OBS2_TYPES):6d}" + "".join(f"{name:>6}" for name in OBS2_TYPES), "# / TYPES OF OBSERV")]
+    satellites = constellation.satellites
+    # There are 12 satellites per epoch line.
+    sat_lines = ["".join(satellites[i:i + 12]) for i in range(0, len(satellites), 12)]
+    sat_lines = sat_lines[0] + "\n" + "".join(f"{'':32}{line}\n" for line in sat_lines[1:])
+
+    records = 0
+    with open(filename, "w") as file:
+        file.writelines(_obs_header(2.11, constellation, interval, fields))
+        for dates, observations in _obs_blocks(constellation, hours, interval, seed):
+            for date, values in zip(dates, observations):
+                second = date.second + date.microsecond * 1e-6
+                lines = [f" {date:%y} {date.month:2d} {date.day:2d} {date.hour:2d} {date.minute:2d}{second:11.7f}"
+                         f"  0{len(satellites):3d}{sat_lines}"]
+                for row in values:
+                    lines.append("".join(f"{value:14.3f}  " for value in row[:5]).rstrip() + "\n")
+                    lines.append(f"{row[5]:14.3f}\n")
+                file.writelines(lines)
+                records += len(values)
+    return records
+
+
+def write_obs3(filename, constellation, hours=1, interval=30, seed=0):
+    """Write a `RINEX3` observation file. See :func:`write_obs2` for the arguments.
+
+    Returns:
+        int: Number of records written (epochs x satellites).
+    """
+    systems = sorted(set(satellite[0] for satellite in constellation.satellites))
+    fields = [_header_line(f"{system}{len(OBS_TYPES[system]):5d}" + "".join(f" {name}" for name in OBS_TYPES[system]),
+                           "SYS / # / OBS TYPES")
+              for system in systems]
+    satellites = constellation.satellites
+
+    records = 0
+    with open(filename, "w") as file:
+        file.writelines(_obs_header(3.04, constellation, interval, fields))
+        for dates, observations in _obs_blocks(constellation, hours, interval, seed):
+            for date, values in zip(dates, observations):
+                second = date.second + date.microsecond * 1e-6
+                lines = [f"> {date:%Y %m %d %H %M}{second:11.7f}  0{len(satellites):3d}\n"]
+                for satellite, row in zip(satellites, values):
+                    lines.append(satellite + "".join(f"{value:14.3f}  " for value in row).rstrip() + "\n")
+                file.writelines(lines)
+                records += len(values)
+    return records
+
+
+def _nav_values(row):
+    return "".join(f"{value:19.12E}" for value in row)
+
+
+def _nav_record(satellite, date, rows):
+    """Lines of a `RINEX3` navigation message: the satellite, its epoch and 4 values per row (3 on the first one)."""
+    lines = [f"{satellite} {date:%Y %m %d %H %M %S}{_nav_values(rows[0])}\n"]
+    lines.extend(f"    {_nav_values(row)}\n" for row in rows[1:])
+    return lines
+
+
+def write_nav(filename, constellation, hours=1, seed=0):
+    """Write a `RINEX3` navigation file, with the GPS, GLONASS and Galileo messages of the session
+    (and 2 hours before and after). BeiDou satellites have no message.
+
+    Args:
+        filename (str): Path of the file to write.
+        constellation (Constellation): Satellites of the messages.
+        hours (float, optional): Duration of the session, in hours. Defaults to ``1``.
+        seed (int, optional): Seed of the parameters left to noise (e.g. the ``IODE``). Defaults to ``0``.
+
+    Returns:
+        int: Number of messages written.
+    """
+    rng = np.random.default_rng(seed)
+    start = START - timedelta(seconds=MARGIN)
+    lines = [_header_line(f"{3.04:9.2f}{'':11}{'N: GNSS NAV DATA':<20}{'M: MIXED':<20}", "RINEX VERSION / TYPE"),
+             _header_line(f"{'gnsstools':<20}{'benchmarks':<20}{START:%Y%m%d %H%M%S} GPS", "PGM / RUN BY / DATE"),
+             _header_line(f"{18:6d}", "LEAP SECONDS"),
+             _header_line("", "END OF HEADER")]
+
+    records = 0
+    for system, interval in [("G", NAV_INTERVAL), ("R", GLONASS_NAV_INTERVAL), ("E", NAV_INTERVAL)]:
+        indexes = [i for i, satellite in enumerate(constellation.satellites) if satellite[0] == system]
+        if len(indexes) == 0:
+            continue
+        dates, seconds = _epochs(start, hours * 3600 + 2 * MARGIN, interval)
+        week = np.array([_gps_time(date)[0] for date in dates])
+        # Seconds of week of the message, from the week of the constellation.
+        toe = seconds + (_gps_time(start)[0] - constellation.week) * 604800
+        M = constellation.anomalies(toe)
+        positions, velocities = constellation.positions(toe) / 1e3, constellation.velocities(toe) / 1e3
+        clocks = constellation.clocks(toe)
+        for t, date in enumerate(dates):
+            for i in indexes:
+                satellite, toe_week = constellation.satellites[i], seconds[t] % 604800
+                if system == "R":
+                    x, y, z = positions[t, i]
+                    vx, vy, vz = velocities[t, i]
+                    rows = [(clocks[t, i], 0., toe_week % 86400),
+                            (x, vx, 0., 0.), (y, vy, 0., float(i % 14 - 7)), (z, vz, 0., 0.)]
+                else:
+                    iode = float(rng.integers(0, 1024))
+                    rows = [(clocks[t, i], constellation.clock_drift[i], 0.),
+                            (iode, 0., 0., M[t, i] % (2 * np.pi)),
+                            (0., constellation.e[i], 0., constellation.sqrt_a[i]),
+                            (toe_week, 0., constellation.omega0[i], 0.),
+                            (constellation.i0[i], 0., constellation.omega[i], 0.),
+                            (0., 1., float(week[t]), 0.) if system == "G" else (0., float(week[t]), float(week[t]), 0.),
+                            (2., 0., 0., iode),
+                            (toe_week - 30, 4.)]
+                lines.extend(_nav_record(satellite, date, rows))
+                records += 1
+
+    with open(filename, "w") as file:
+        file.writelines(lines)
+    return records
+
+
+def write_sp3(filename, constellation, hours=1):
+    """Write an ``SP3-c`` file, with the positions and clocks every 15 minutes during the session
+    (and 2 hours before and after).
+
+    Args:
+        filename (str): Path of the file to write.
+        constellation (Constellation): Satellites of the file.
+        hours (float, optional): Duration of the session, in hours. Defaults to ``1``.
+
+    Returns:
+        int: Number of records written (epochs x satellites).
+    """
+    start = START - timedelta(seconds=MARGIN)
+    dates, seconds = _epochs(start, hours * 3600 + 2 * MARGIN, SP3_INTERVAL)
+    seconds = seconds + (_gps_time(start)[0] - constellation.week) * 604800
+    positions = constellation.positions(seconds) / 1e3
+    clocks = constellation.clocks(seconds) * 1e6
+    satellites = constellation.satellites
+    week, sow = _gps_time(start)
+    mjd = (start - datetime(1858, 11, 17)).days
+
+    # The satellites are listed by 17 on (at least) 5 lines, with their accuracy on the following ones.
+    sat_rows = [satellites[i:i + 17] for i in range(0, max(len(satellites), 5 * 17), 17)]
+    lines = [f"#cP{start:%Y %m %d %H %M} {start.second:11.8f} {len(dates):7d} d     IGS14 FIT     \n",
+             f"## {week:4d} {sow:15.8f} {SP3_INTERVAL:14.8f} {mjd:5d} 0.0000000000000\n"]
+    lines.append(f"+  {len(satellites):3d}   {''.join(sat_rows[0]):<51}\n")
+    lines.extend(f"+        {''.join(row):<51}\n" for row in sat_rows[1:])
+    lines.extend(f"++       {'  0' * 17}\n" for _ in sat_rows)
+    lines.extend(["%c M  cc GPS ccc cccc cccc cccc cccc ccccc ccccc ccccc ccccc\n"] * 2)
+    lines.extend(["%f  1.2500000  1.025000000  0.00000000000  0.000000000000000\n"] * 2)
+    lines.extend(["%i    0    0    0    0      0      0      0      0         0\n"] * 2)
+    lines.append("/* gnsstools synthetic orbits\n")
+    for t, date in enumerate(dates):
+        lines.append(f"*  {date:%Y %m %d %H %M} {date.second:11.8f}\n")
+        lines.extend(f"P{satellite}{x:14.6f}{y:14.6f}{z:14.6f}{clock:14.6f}\n"
+                     for satellite, (x, y, z), clock in zip(satellites, positions[t], clocks[t]))
+    lines.append("EOF\n")
+
+    with open(filename, "w") as file:
+        file.writelines(lines)
+    return len(dates) * len(satellites)
+
+
+class Fixtures(object):
+    r"""
+    Synthetic files of a session, written once in a directory and reused afterward.
+    The names of the files contain their parameters.
+
+    * :attr:`directory` (str): Directory of the files.
+
+    * :attr:`hours` (float): Duration of the session, in hours.
+
+    * :attr:`interval` (float): Interval between two observation epochs, in seconds.
+
+    * :attr:`satellites` (int): Number of satellites (from 1 to 120).
+
+    * :attr:`seed` (int): Seed of the orbits and noise.
+    """
+
+    def __init__(self, directory, hours=1, interval=30, satellites=30, seed=0):
+        super().__init__()
+        self.directory = directory
+        self.hours = hours
+        self.interval = interval
+        self.satellites = satellites
+        self.seed = seed
+
+    @property
+    def constellation(self):
+        return Constellation(self.satellites, seed=self.seed)
+
+    def _path(self, name, extension):
+        return os.path.join(self.directory, f"{name}_{self.hours:g}h_{self.interval:g}s_{self.satellites}sv_{self.seed}{extension}")
+
+    @property
+    def obs2(self):
+        return self._path("obs2", ".18o")
+
+    @property
+    def obs3(self):
+        return self._path("obs3", "_MO.rnx")
+
+    @property
+    def nav(self):
+        return self._path("nav", "_MN.rnx")
+
+    @property
+    def sp3(self):
+        return self._path("orbits", ".sp3")
+
+    def generate(self, force=False):
+        """Write the missing files.
+
+        Args:
+            force (bool, optional): If ``True``, write all the files again. Defaults to ``False``.
+
+        Returns:
+            list: Paths of the files written.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        constellation = self.constellation
+        writers = [(self.obs2, lambda path: write_obs2(path, constellation, self.hours, self.interval, self.seed)),
+                   (self.obs3, lambda path: write_obs3(path, constellation, self.hours, self.interval, self.seed)),
+                   (self.nav, lambda path: write_nav(path, constellation, self.hours, self.seed)),
+                   (self.sp3, lambda path: write_sp3(path, constellation, self.hours))]
+        written = []
+        for path, write in writers:
+            if force or not os.path.exists(path):
+                # Write in a temporary file first, so that an interrupted generation is not reused.
+                write(path + ".part")
+                os.replace(path + ".part", path)
+                written.append(path)
+        return written
@@ -5,12 +5,12 @@
 # Copyright (c) 2021 Arthur Dujardin
 
 # Basic imports
+import importlib
 import os
 
+# The submodule ``gnsstime`` has the same name as its class, so the class is imported eagerly:
+# otherwise importing ``gnsstools.gnsstime`` first would shadow it with the module.
 from .gnsstime import gnsstime
-from .orbits import Orbit
-from .trilateration import Trilateration
-from .process import GNSSProcess
 
 
 __all__ = [
@@ -18,9 +18,33 @@ __all__ = [
     "gnsstime",
     "Orbit",
     "Trilateration",
+    "KalmanFilter",
+    "RAIM",
     "GNSSProcess"
 ]
 
 
+# The other objects (and their dependencies, e.g. pandas or gnsstoolbox) are imported on first access.
+_LAZY_OBJECTS = {
+    "Orbit": ".orbits",
+    "Trilateration": ".trilateration",
+    "KalmanFilter": ".kalman",
+    "RAIM": ".raim",
+    "GNSSProcess": ".process",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_OBJECTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_OBJECTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_OBJECTS))
+
+
 ROOT = os.path.abspath(os.path.dirname(__file__))
 __version__ = open(os.path.join(ROOT, "VERSION.md")).read().strip()
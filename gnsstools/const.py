@@ -17,3 +17,14 @@ mu = 3.986005e14                # [m3/s2]
 F = -4.442807633e-10            # []
 omega_e = -7.2921151467e-5      # [rad/s]
 deg2rad = pi / 180.0            # [rad/deg]
+
+
+# GLONASS (PZ-90) constants
+# +-----------------------------+------------------+
+# | Values                      | Units            |
+# +-----------------------------+------------------+
+
+mu_glonass = 3.9860044e14       # [m3/s2]
+ae_glonass = 6378136.0          # [m]
+J2_glonass = 1.0826257e-3       # []
+omega_e_glonass = 7.292115e-5   # [rad/s]
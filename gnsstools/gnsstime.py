@@ -9,8 +9,7 @@
 from datetime import datetime, timedelta
 import calendar
 import math
-import numpy as np
-import pandas as pd
+# numpy is imported by the functions using it, to keep ``import gnsstools`` fast.
 
 
 __all__ = [
@@ -32,24 +31,58 @@ SESSIONS = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm',
 
 def to_gnsstime(element):
 
-    if isinstance(element, (datetime, gnsstime)):
-        pass
+    # ``pandas.Timestamp`` inherits from ``datetime``.
+    if not isinstance(element, (datetime, gnsstime)):
+        import numpy as np
 
-    elif isinstance(element, pd.Timestamp):
-        element = pd.to_datetime(element)
-    
-    elif isinstance(element, np.datetime64):
+        if not isinstance(element, np.datetime64):
+            raise ValueError(f"The element to be converted to gnsstime is unknown. Got type {type(element)}.")
         element = datetime.utcfromtimestamp(element.astype('O') / 1e9)
 
-    else:
-        raise ValueError(f"The element to be converted to gnsstime is unknown. Got type {type(element)}.")
-
     return gnsstime(year=element.year, month=element.month, day=element.day,
                     hour=element.hour, minute=element.minute, second=element.second,
                     microsecond=element.microsecond, tzinfo=element.tzinfo,
                     fold=element.fold)
     
 
+def to_datetime64(year, month, day, hour=0, minute=0, second=0):
+    r"""Convert arrays of dates to ``numpy.datetime64``, the vectorized counterpart of :class:`gnsstime`.
+    Two digit years are handled like in `RINEX` files, and missing dates are set to ``NaT``.
+
+    Args:
+        year (numpy.ndarray): Years, on two or four digits.
+        month (numpy.ndarray): Months.
+        day (numpy.ndarray): Days.
+        hour (numpy.ndarray, optional): Hours. Defaults to ``0``.
+        minute (numpy.ndarray, optional): Minutes. Defaults to ``0``.
+        second (numpy.ndarray, optional): Seconds, with their decimals (truncated to the microsecond). Defaults to ``0``.
+
+    Returns:
+        numpy.ndarray: Array of ``datetime64[ns]``.
+
+    Examples:
+        >>> to_datetime64([18, 2018], [10, 10], [12, 12], [0, 1], [40, 0], [15.5, 0])
+            array(['2018-10-12T00:40:15.500000000', '2018-10-12T01:00:00.000000000'], dtype='datetime64[ns]')
+    """
+    import numpy as np
+
+    values = np.broadcast_arrays(*[np.asarray(value, dtype=np.float64) for value in (year, month, day, hour, minute, second)])
+    year, month, day, hour, minute, second = values
+    valid = np.all([~np.isnan(value) for value in values], axis=0)
+    dates = np.full(year.shape, np.datetime64("NaT"), dtype="datetime64[ns]")
+
+    year = year[valid].astype(np.int64)
+    year = np.where(year < 80, year + 2000, np.where(year < 100, year + 1900, year))
+    days = (year - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (month[valid].astype(np.int64) - 1)
+    days = days.astype("datetime64[D]") + (day[valid].astype(np.int64) - 1)
+    # Split microsecond from second (i.e. second=1.9 -> second=1, microsecond=900000)
+    seconds = np.floor(second[valid])
+    microseconds = np.floor((second[valid] - seconds) * 1e6).astype(np.int64)
+    seconds = ((hour[valid] * 60 + minute[valid]) * 60 + seconds).astype(np.int64)
+    dates[valid] = days.astype("datetime64[ns]") + ((seconds * 1_000_000 + microseconds) * 1000).astype("timedelta64[ns]")
+    return dates
+
+
 class gnsstime(datetime):
     r"""Defines GNSS time, providing built-in functions to fasten date conversion.
 
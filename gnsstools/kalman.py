@@ -0,0 +1,185 @@
+# Encoding: UTF-8
+# File: kalman.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module handles the recursive positioning of a receptor, with an extended Kalman filter.
+
+The state is made of the receptor position and velocity (constant velocity model), its clock bias and drift
+(as time delay * celerity, in meters). Each epoch of pseudo-ranges updates the previous state instead of
+solving the position from scratch, so the cost of an epoch does not depend on the history.
+The state can be saved and loaded, to resume a long running process.
+"""
+
+
+# Basic imports
+import numpy as np
+
+# GNSS ToolBox
+from gnsstools.trilateration import Trilateration
+
+
+__all__ = [
+    "KalmanFilter"
+]
+
+
+class KalmanFilter(object):
+    r"""
+    Extended Kalman filter with position, velocity and clock states.
+
+    * :attr:`time` (numpy.datetime64): Date of the current state, ``NaT`` before the first epoch.
+
+    * :attr:`state` (numpy.ndarray): Position ``x, y, z``, velocity ``vx, vy, vz`` (in meters and meters per second),
+        clock bias and drift ``cdt, cdt_dot`` (in meters and meters per second), of shape ``(8,)``.
+
+    * :attr:`covariance` (numpy.ndarray): Covariance of the state, of shape ``(8, 8)``.
+
+    * :attr:`sigma` (float): Standard deviation of the pseudo-ranges, in meters.
+
+    * :attr:`accel_noise` (float): Spectral density of the receptor acceleration, in m2/s3.
+
+    * :attr:`clock_noise` (float): Spectral density of the clock bias, in m2/s.
+
+    * :attr:`drift_noise` (float): Spectral density of the clock drift, in m2/s3.
+
+    Examples:
+        >>> kalman = KalmanFilter(sigma=5)
+        >>> for time, sat_coords, distances in epochs:
+        ...     rec_coords, cdt = kalman.update(time, sat_coords, distances)
+        >>> kalman.save("receptor.npz")
+        >>> kalman = KalmanFilter.load("receptor.npz")
+    """
+
+    def __init__(self, sigma=5., accel_noise=1., clock_noise=100., drift_noise=10.):
+        super().__init__()
+        self.sigma = sigma
+        self.accel_noise = accel_noise
+        self.clock_noise = clock_noise
+        self.drift_noise = drift_noise
+        self.time = np.datetime64("NaT", "ns")
+        self.state = np.full(8, np.nan)
+        self.covariance = np.full((8, 8), np.nan)
+
+    @property
+    def rec_coords(self):
+        return self.state[:3]
+
+    @property
+    def velocity(self):
+        return self.state[3:6]
+
+    @property
+    def cdt(self):
+        return self.state[6]
+
+    def _initialize(self, time, sat_coords, distances, sigma):
+        """Initialize the state from a least squares solution of the first epoch (with at least 4 satellites)."""
+        rec_coords, cdt, _, _ = Trilateration.optimize_batch(sat_coords[None], distances[None], sigma=sigma[None])
+        if np.isnan(cdt[0]):
+            return
+        self.time = time
+        self.state = np.zeros(8)
+        self.state[:3], self.state[6] = rec_coords[0], cdt[0]
+        # The covariance of the solution is the a-priori one, inv(At.P.A): the a-posteriori variance factor
+        # is not defined with exactly 4 satellites, and the filter weights the next epochs with ``sigma`` anyway.
+        x0 = np.concatenate([rec_coords[0], cdt])[None]
+        A, _ = Trilateration._linearize(x0, sat_coords[None], distances[None], np.ones((1, len(distances)), dtype=bool))
+        N = (A[0].T / sigma ** 2) @ A[0]
+        # The velocity and clock drift are unknown.
+        self.covariance = np.diag([0., 0., 0., 1e4, 1e4, 1e4, 0., 1e6])
+        self.covariance[np.ix_([0, 1, 2, 6], [0, 1, 2, 6])] = np.linalg.pinv(N)
+
+    def predict(self, time):
+        """Propagate the state and its covariance to a date.
+
+        Args:
+            time (numpy.datetime64): Date of the prediction.
+        """
+        dt = (np.datetime64(time, "ns") - self.time).astype(np.int64) * 1e-9
+        F = np.eye(8)
+        F[[0, 1, 2, 6], [3, 4, 5, 7]] = dt
+        # White noise accelerations (position / velocity) and clock (bias / drift).
+        Q = np.zeros((8, 8))
+        for i, j, q in [(0, 3, self.accel_noise), (1, 4, self.accel_noise), (2, 5, self.accel_noise),
+                        (6, 7, self.drift_noise)]:
+            Q[i, i], Q[i, j], Q[j, i], Q[j, j] = q * dt ** 3 / 3, q * dt ** 2 / 2, q * dt ** 2 / 2, q * dt
+        Q[6, 6] += self.clock_noise * dt
+        self.state = F @ self.state
+        self.covariance = F @ self.covariance @ F.T + Q
+        self.time = np.datetime64(time, "ns")
+
+    def update(self, time, sat_coords, distances, sigma=None):
+        """Update the state with the pseudo-ranges of an epoch.
+
+        Args:
+            time (numpy.datetime64): Date of the epoch.
+            sat_coords (numpy.ndarray): Satellites positions of shape ``(S, 3)``, in meters.
+            distances (numpy.ndarray): Observed distances (satellites - receptor) of shape ``(S,)``, in meters.
+                Non finite distances are ignored.
+            sigma (float or numpy.ndarray, optional): Standard deviation of the distances.
+                Defaults to ``None`` (:attr:`sigma`).
+
+        Returns:
+            tuple: The receptor position of shape ``(3,)`` and its time delay * celerity (in meters).
+        """
+        time = np.datetime64(time, "ns")
+        sat_coords = np.asarray(sat_coords, dtype=np.float64).reshape(-1, 3)
+        distances = np.asarray(distances, dtype=np.float64).ravel()
+        sigma = np.broadcast_to(self.sigma if sigma is None else sigma, distances.shape)
+        valid = np.isfinite(distances) & np.all(np.isfinite(sat_coords), axis=-1)
+        sat_coords, distances, sigma = sat_coords[valid], distances[valid], sigma[valid]
+
+        if np.isnat(self.time):
+            self._initialize(time, sat_coords, distances, sigma)
+            return self.rec_coords, self.cdt
+        self.predict(time)
+        if len(distances) == 0:
+            return self.rec_coords, self.cdt
+
+        # Observation - Model, linearized at the predicted state.
+        diff = self.state[:3] - sat_coords
+        distance = np.linalg.norm(diff, axis=-1)
+        H = np.zeros((len(distances), 8))
+        H[:, :3] = diff / distance[:, None]
+        H[:, 6] = 1
+        innovation = distances - (distance + self.state[6])
+
+        # Kalman gain, and Joseph form of the covariance update (numerically stable).
+        R = np.diag(sigma ** 2)
+        S = H @ self.covariance @ H.T + R
+        K = np.linalg.solve(S, H @ self.covariance).T
+        self.state = self.state + K @ innovation
+        I_KH = np.eye(8) - K @ H
+        self.covariance = I_KH @ self.covariance @ I_KH.T + K @ R @ K.T
+        return self.rec_coords, self.cdt
+
+    def save(self, filename):
+        """Save the state of the filter (checkpoint) in a binary ``.npz`` archive.
+
+        Args:
+            filename (str): Path to the archive.
+        """
+        np.savez(filename, time=self.time.astype(np.int64), state=self.state, covariance=self.covariance,
+                 parameters=np.array([self.sigma, self.accel_noise, self.clock_noise, self.drift_noise]))
+
+    @classmethod
+    def load(cls, filename):
+        """Load a filter saved with :meth:`save`, to resume the processing.
+
+        Args:
+            filename (str): Path to the archive.
+
+        Returns:
+            KalmanFilter
+        """
+        with np.load(filename) as archive:
+            kalman = cls(*archive["parameters"])
+            kalman.time = np.datetime64(int(archive["time"]), "ns")
+            kalman.state = archive["state"]
+            kalman.covariance = archive["covariance"]
+        return kalman
@@ -8,17 +8,136 @@
 r"""
 This module handles logs using the ``logging`` package.
 
+As a library, ``gnsstools`` does not configure any handler: the application decides where the logs go
+(or use :func:`log_to_file`). The messages are formatted lazily, only if they are emitted.
+
+The hot paths (reading files, computing orbits, processing epochs) report to trace points, grouped per subsystem
+(``"rinex"``, ``"orbits"`` and ``"process"``). They are disabled by default, and then only cost an attribute lookup.
+They can be switched on and off at runtime:
+
+.. code-block:: python
+
+    import logging
+    from gnsstools.logger import enable_tracing, disable_tracing
+
+    logging.basicConfig()
+    enable_tracing("orbits")
+    ...
+    disable_tracing()
 """
 
 # Basic imports
 import logging
 
 
-logging.basicConfig(
-    filename="gnss_toolbox.log",
-    filemode="a",
-    format="%(asctime)s :: %(name)-20s :: [%(filename)-10s:%(lineno)-3s - %(funcName)20s()] :: [%(levelname)-7s] :: %(message)s",
-    level=logging.DEBUG
-)
+__all__ = [
+    "logger",
+    "Tracer",
+    "get_tracer",
+    "enable_tracing",
+    "disable_tracing",
+    "log_to_file"
+]
+
+
+LOGGER_NAME = "gnss_toolbox"
+SUBSYSTEMS = ("rinex", "orbits", "process")
+LOG_FORMAT = "%(asctime)s :: %(name)-20s :: [%(filename)-10s:%(lineno)-3s - %(funcName)20s()] :: [%(levelname)-7s] :: %(message)s"
+
+
+logger = logging.getLogger(LOGGER_NAME)
+logger.addHandler(logging.NullHandler())
+
+
+class Tracer(object):
+    r"""
+    Trace points of a subsystem, logged at the ``DEBUG`` level by the ``gnss_toolbox.<subsystem>`` logger.
+    In the hot paths, the arguments should only be computed if the tracer is enabled:
+
+    .. code-block:: python
+
+        if trace.enabled:
+            trace("kepler", "E=%s, steps=%s", E, steps)
+
+    * :attr:`subsystem` (str): Name of the subsystem.
+
+    * :attr:`enabled` (bool): If ``True``, the trace points are logged.
+
+    * :attr:`logger` (logging.Logger): Logger of the subsystem.
+    """
+
+    def __init__(self, subsystem):
+        super().__init__()
+        self.subsystem = subsystem
+        self.enabled = False
+        self.logger = logger.getChild(subsystem)
+
+    def __call__(self, point, message, *args):
+        """Log a trace point, if the tracer is enabled.
+
+        Args:
+            point (str): Name of the trace point.
+            message (str): Message, formatted with ``args`` (``%`` style) only if it is emitted.
+            args (tuple): Arguments of the message.
+        """
+        if self.enabled:
+            self.logger.debug("%s: " + message, point, *args, stacklevel=2)
+
+
+_TRACERS = {subsystem: Tracer(subsystem) for subsystem in SUBSYSTEMS}
+
+
+def get_tracer(subsystem):
+    """Tracer of a subsystem.
+
+    Args:
+        subsystem (str): Name of the subsystem, either ``"rinex"``, ``"orbits"`` or ``"process"``.
+
+    Returns:
+        Tracer
+    """
+    if subsystem not in _TRACERS:
+        raise KeyError(f"Unknown subsystem {subsystem}. Available subsystems are {', '.join(SUBSYSTEMS)}.")
+    return _TRACERS[subsystem]
+
+
+def enable_tracing(*subsystems):
+    """Enable the trace points of some subsystems (all of them if none is provided).
+    Their loggers are set to the ``DEBUG`` level, the handlers are left to the application.
+
+    Args:
+        subsystems (str): Names of the subsystems.
+    """
+    for subsystem in subsystems or SUBSYSTEMS:
+        tracer = get_tracer(subsystem)
+        tracer.logger.setLevel(logging.DEBUG)
+        tracer.enabled = True
+
+
+def disable_tracing(*subsystems):
+    """Disable the trace points of some subsystems (all of them if none is provided).
+
+    Args:
+        subsystems (str): Names of the subsystems.
+    """
+    for subsystem in subsystems or SUBSYSTEMS:
+        tracer = get_tracer(subsystem)
+        tracer.enabled = False
+        tracer.logger.setLevel(logging.NOTSET)
+
+
+def log_to_file(filename="gnss_toolbox.log", level=logging.DEBUG):
+    """Write the logs of ``gnsstools`` in a file, with the detailed format used by the previous versions.
+
+    Args:
+        filename (str, optional): Path to the log file, opened in append mode. Defaults to ``"gnss_toolbox.log"``.
+        level (int, optional): Level of the logs. Defaults to ``logging.DEBUG``.
 
-logger = logging.getLogger("gnss_toolbox")
\ No newline at end of file
+    Returns:
+        logging.FileHandler: The handler added, to be removed with ``logger.removeHandler``.
+    """
+    handler = logging.FileHandler(filename, mode="a")
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return handler
@@ -0,0 +1,260 @@
+# Encoding: UTF-8
+# File: metrics.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module handles performance metrics, to see where the time goes without a profiler.
+
+The readers, orbit computations and processes report into a registry:
+
+* **stages** (e.g. ``"rinex.nav"`` or ``"process.spp"``): number of calls, wall and CPU time, and optionally
+  the peak memory allocated during a call (with ``tracemalloc``),
+
+* **counters** (e.g. ``"rinex.nav.records"``, ``"orbits.kepler.iterations"`` or ``"rinex.cache.hits"``).
+
+The counters named after a stage (e.g. ``"rinex.nav.bytes"``) are also reported per second of that stage.
+Only aggregates are kept. The registry is disabled by default: until :func:`enable` is called,
+the reports return immediately and the instrumented functions only pay for a flag check.
+
+.. note::
+    The CPU time is the one of the whole process (``time.process_time``), not of the calling thread:
+    with stages running concurrently in threads (e.g. ``load_many(backend="thread")``), each stage also counts
+    the CPU time of the other threads. The metrics of worker processes (e.g. ``n_jobs > 1``) are not collected.
+
+Examples:
+    >>> from gnsstools import metrics, rinex
+    >>> metrics.enable()
+    >>> with metrics.stage("load", memory=True):
+    ...     df = rinex.load("BRDC00IGS_R_20182850000_01D_MN.rnx")
+    >>> metrics.snapshot()["stages"]["rinex.nav"]
+        {'calls': 1, 'wall_time': 0.12, 'cpu_time': 0.12, 'peak_memory': None,
+         'records_per_second': 62000.0, 'bytes_per_second': 13000000.0}
+    >>> print(metrics.to_prometheus())
+"""
+
+
+# Basic imports
+from contextlib import contextmanager
+import functools
+import re
+import threading
+import time
+import tracemalloc
+
+
+__all__ = [
+    "MetricsRegistry",
+    "registry",
+    "enable",
+    "disable",
+    "count",
+    "stage",
+    "measure",
+    "snapshot",
+    "to_prometheus",
+    "reset"
+]
+
+
+class MetricsRegistry(object):
+    r"""
+    Registry of counters and timed stages.
+
+    * :attr:`enabled` (bool): If ``False``, nothing is recorded.
+
+    Examples:
+        >>> registry = MetricsRegistry(enabled=True)
+        >>> with registry.stage("parse"):
+        ...     registry.count("parse.records", 1000)
+        >>> registry.snapshot()
+    """
+
+    def __init__(self, enabled=False):
+        super().__init__()
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters = {}
+        # Per stage: number of calls, wall time, CPU time and peak memory (maximum over the calls).
+        self._stages = {}
+        # Baseline and peak of the nested stages measuring the memory.
+        self._memory_frames = []
+
+    def enable(self):
+        """Start recording the metrics."""
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording the metrics. The ones already recorded are kept."""
+        self.enabled = False
+
+    def count(self, name, value=1):
+        """Increment a counter.
+
+        Args:
+            name (str): Name of the counter.
+            value (int or float, optional): Increment. Defaults to ``1``.
+        """
+        if not self.enabled:
+            return
+        # Numpy scalars are stored as Python numbers, to be exported as is.
+        if not isinstance(value, (int, float)):
+            value = value.item()
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def _record(self, name, wall_time, cpu_time, peak_memory=None):
+        with self._lock:
+            stats = self._stages.setdefault(name, [0, 0., 0., None])
+            stats[0] += 1
+            stats[1] += wall_time
+            stats[2] += cpu_time
+            if peak_memory is not None:
+                stats[3] = max(stats[3] or 0, peak_memory)
+
+    def _start_memory(self):
+        """Start measuring the peak memory of a stage, and return its frame ``[baseline, peak]``."""
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak is reset for the new stage, so the enclosing stages keep the peak reached so far.
+            for frame in self._memory_frames:
+                frame[1] = max(frame[1], peak)
+            tracemalloc.reset_peak()
+            frame = [current, current]
+            self._memory_frames.append(frame)
+        return frame
+
+    def _stop_memory(self, frame):
+        """Stop measuring the memory of a stage, and return its peak in bytes."""
+        with self._lock:
+            _, peak = tracemalloc.get_traced_memory()
+            self._memory_frames.remove(frame)
+            frame[1] = max(frame[1], peak)
+            for outer in self._memory_frames:
+                outer[1] = max(outer[1], frame[1])
+        return frame[1] - frame[0]
+
+    @contextmanager
+    def stage(self, name, memory=False):
+        """Measure a block of code, as a call of a stage.
+
+        Args:
+            name (str): Name of the stage.
+            memory (bool, optional): If ``True``, also measure the peak memory allocated in the block,
+                with ``tracemalloc`` (started if needed). This slows down the allocations. Defaults to ``False``.
+        """
+        if not self.enabled:
+            yield
+            return
+        started, frame = False, None
+        if memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started = True
+            frame = self._start_memory()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall_time, cpu_time = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            peak_memory = None
+            if frame is not None:
+                peak_memory = self._stop_memory(frame)
+                if started:
+                    tracemalloc.stop()
+            self._record(name, wall_time, cpu_time, peak_memory)
+
+    def measure(self, name):
+        """Decorator measuring each call of a function as a stage.
+
+        Args:
+            name (str): Name of the stage.
+
+        Returns:
+            callable
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self.stage(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Copy of the metrics.
+
+        Returns:
+            dict: The ``"counters"`` values, and the ``"stages"`` statistics (``calls``, ``wall_time`` and ``cpu_time``
+                of the whole process in seconds, ``peak_memory`` in bytes or ``None``, and ``<counter>_per_second``
+                for their counters).
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            stages = {name: list(stats) for name, stats in self._stages.items()}
+        results = {"counters": counters, "stages": {}}
+        for name, (calls, wall_time, cpu_time, peak_memory) in sorted(stages.items()):
+            stats = {"calls": calls, "wall_time": wall_time, "cpu_time": cpu_time, "peak_memory": peak_memory}
+            prefix = name + "."
+            for counter, value in sorted(counters.items()):
+                suffix = counter[len(prefix):]
+                if counter.startswith(prefix) and "." not in suffix and wall_time > 0:
+                    stats[f"{suffix}_per_second"] = value / wall_time
+            results["stages"][name] = stats
+        return results
+
+    def to_prometheus(self, prefix="gnsstools"):
+        """Export the metrics in the Prometheus text format.
+
+        Args:
+            prefix (str, optional): Prefix of the metrics names. Defaults to ``"gnsstools"``.
+
+        Returns:
+            str
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{prefix}_{_sanitize(name)}_total"
+            lines.extend([f"# TYPE {metric} counter", f"{metric} {value}"])
+
+        stages = snapshot["stages"]
+        for key, metric, kind in [("calls", "stage_calls_total", "counter"),
+                                  ("wall_time", "stage_wall_seconds_total", "counter"),
+                                  ("cpu_time", "stage_cpu_seconds_total", "counter"),
+                                  ("peak_memory", "stage_peak_memory_bytes", "gauge")]:
+            samples = [(name, stats[key]) for name, stats in stages.items() if stats[key] is not None]
+            if len(samples) == 0:
+                continue
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            lines.extend([f'{prefix}_{metric}{{stage="{name}"}} {value}' for name, value in samples])
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Remove all the metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._stages.clear()
+
+
+def _sanitize(name):
+    """Convert a metric name to the Prometheus charset (e.g. ``"rinex.nav"`` to ``"rinex_nav"``)."""
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+# Registry used by gnsstools, disabled until ``enable()`` is called.
+registry = MetricsRegistry()
+
+enable = registry.enable
+disable = registry.disable
+count = registry.count
+stage = registry.stage
+measure = registry.measure
+snapshot = registry.snapshot
+to_prometheus = registry.to_prometheus
+reset = registry.reset
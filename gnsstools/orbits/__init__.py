@@ -5,4 +5,27 @@
 # Copyright (c) 2021 Arthur Dujardin
 
 
-from .orbit import Orbit
\ No newline at end of file
+# Basic imports
+import importlib
+
+
+# ``Orbit`` depends on gpstime and gnsstoolbox, which are slow to import: the objects are imported on first access.
+_LAZY_OBJECTS = {
+    "Orbit": ".orbit",
+    "SP3Interpolator": ".interpolation",
+    "interpolate_lagrange": ".interpolation",
+    "sp3_arcs": ".interpolation",
+    "ChebyshevOrbit": ".chebyshev",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_OBJECTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_OBJECTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_OBJECTS))
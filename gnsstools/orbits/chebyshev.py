@@ -0,0 +1,227 @@
+# Encoding: UTF-8
+# File: chebyshev.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module handles a compact representation of precise orbits (``SP3`` files), for repeated evaluations.
+
+The positions and clocks of each satellite are fitted once with piecewise Chebyshev polynomials,
+on segments of fixed length (e.g. 2 hours). Each segment is fitted on the tabulated epochs it contains,
+plus a margin on both sides to avoid the edge effects. Evaluating a date only requires its segment
+(found by a division) and the polynomial coefficients.
+"""
+
+
+# Basic imports
+import numpy as np
+import pandas as pd
+from numpy.polynomial import chebyshev
+
+# GNSS Tools
+from gnsstools import metrics
+from .interpolation import sp3_arcs
+
+
+__all__ = [
+    "ChebyshevOrbit"
+]
+
+
+class ChebyshevOrbit(object):
+    r"""
+    Precise orbits fitted with piecewise Chebyshev polynomials. Use :meth:`fit` to create one from a ``SP3`` file.
+
+    * :attr:`origin` (numpy.datetime64): Start of the first segment.
+
+    * :attr:`segment` (float): Length of the segments, in seconds.
+
+    * :attr:`degree` (int): Degree of the polynomials.
+
+    * :attr:`satellites` (list): Satellites ``(system, prn)`` available.
+
+    * :attr:`unfitted` (list): Satellites ``(system, prn)`` with too few epochs to be fitted. Their positions
+        and clocks are evaluated as ``NaN``.
+
+    * :attr:`residuals` (pandas.DataFrame): RMS and maximum of the fit residuals on the tabulated epochs, per satellite.
+        The positions residuals (norm of the 3D error) are in meters, the clocks residuals in seconds.
+
+    Examples:
+        >>> df = rinex.load("COM20225_15M.SP3")
+        >>> orbit = ChebyshevOrbit.fit(df)
+        >>> orbit.save("COM20225_15M.npz")
+        >>> orbit = ChebyshevOrbit.load("COM20225_15M.npz")
+        >>> times = np.datetime64("2018-10-12T00:30:00") + np.arange(3600).astype("timedelta64[s]")
+        >>> positions, clocks = orbit.evaluate("G", 2, times)
+    """
+
+    def __init__(self, origin, segment, systems, prns, bounds, starts, spans, coefficients, residuals):
+        super().__init__()
+        self.origin = np.datetime64(origin, "ns")
+        self.segment = float(segment)
+        self._keys = {(str(system), int(prn)): index for index, (system, prn) in enumerate(zip(systems, prns))}
+        # Per satellite: first and last tabulated epochs, in seconds from the origin.
+        self._bounds = np.asarray(bounds, dtype=np.float64)
+        # Per satellite and segment: start and length of the fitted window (in seconds from the origin),
+        # and the coefficients of shape ``(degree + 1, 4)`` for the positions and clock.
+        self._starts = np.asarray(starts, dtype=np.float64)
+        self._spans = np.asarray(spans, dtype=np.float64)
+        self._coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.residuals = pd.DataFrame(np.asarray(residuals, dtype=np.float64).reshape(-1, 4),
+                                      index=pd.MultiIndex.from_tuples(list(self._keys), names=["System", "PRN"]),
+                                      columns=["PositionRMS", "PositionMax", "ClockRMS", "ClockMax"])
+
+    @property
+    def degree(self):
+        return self._coefficients.shape[2] - 1
+
+    @property
+    def satellites(self):
+        return list(self._keys.keys())
+
+    @property
+    def unfitted(self):
+        return [key for key, isat in self._keys.items() if np.isnan(self._bounds[isat, 0])]
+
+    @classmethod
+    def fit(cls, df, segment=7200., margin=1800., degree=10):
+        r"""Fit the positions and clocks of the satellites.
+
+        Args:
+            df (PositionDataFrame): Positions and clocks, e.g. from a ``SP3`` file.
+            segment (float, optional): Length of the segments, in seconds. Defaults to ``7200``.
+            margin (float, optional): Duration of the epochs fitted before and after each segment, in seconds.
+                Defaults to ``1800``.
+            degree (int, optional): Degree of the polynomials. A segment and its margins should contain
+                more than ``degree`` epochs. The satellites with fewer epochs are not fitted (see :attr:`unfitted`).
+                Defaults to ``10``.
+
+        Returns:
+            ChebyshevOrbit
+        """
+        arcs = list(sp3_arcs(df))
+        if len(arcs) == 0:
+            raise ValueError("There is no position to fit.")
+        origin = min([dates[0] for _, _, dates, _ in arcs])
+        end = max([dates[-1] for _, _, dates, _ in arcs])
+        num_segments = max(int(np.ceil((end - origin).astype(np.int64) * 1e-9 / segment)), 1)
+
+        num_satellites = len(arcs)
+        bounds = np.full((num_satellites, 2), np.nan)
+        starts = np.full((num_satellites, num_segments), np.nan)
+        spans = np.full((num_satellites, num_segments), np.nan)
+        coefficients = np.full((num_satellites, num_segments, degree + 1, 4), np.nan)
+        residuals = np.full((num_satellites, 4), np.nan)
+        for isat, (_, _, dates, values) in enumerate(arcs):
+            seconds = (dates - origin).astype(np.int64) * 1e-9
+            first, last = seconds[0], seconds[-1]
+            if len(seconds) <= degree or last == first:
+                continue
+            bounds[isat] = first, last
+            # The windows are shifted at the edges of the arc, to keep the same number of epochs.
+            span = min(segment + 2 * margin, last - first)
+            errors = np.full(values.shape, np.nan)
+            for k in range(int(first // segment), min(int(last // segment) + 1, num_segments)):
+                start = max(min(k * segment - margin, last - span), first)
+                window = (seconds >= start) & (seconds <= start + span)
+                starts[isat, k], spans[isat, k] = start, span
+                # The positions and clocks are fitted separately, as the clocks can be missing.
+                for columns in (slice(0, 3), slice(3, 4)):
+                    valid = window & np.all(~np.isnan(values[:, columns]), axis=-1)
+                    if np.sum(valid) <= degree:
+                        continue
+                    x = 2 * (seconds[valid] - start) / span - 1
+                    coefficients[isat, k, :, columns] = chebyshev.chebfit(x, values[valid, columns], degree)
+
+                # Residuals on the epochs of the segment (the last one includes the last epoch).
+                inside = (seconds >= k * segment) & ((seconds < (k + 1) * segment) | (k == num_segments - 1))
+                x = 2 * (seconds[inside] - start) / span - 1
+                errors[inside] = chebyshev.chebval(x, coefficients[isat, k]).T - values[inside]
+
+            distances = np.linalg.norm(errors[:, :3], axis=-1)
+            clocks = np.abs(errors[:, 3])
+            for i, error in enumerate((distances, clocks)):
+                error = error[~np.isnan(error)]
+                if len(error) > 0:
+                    residuals[isat, 2 * i:2 * i + 2] = np.sqrt(np.mean(error ** 2)), np.max(error)
+
+        systems = [system for system, _, _, _ in arcs]
+        prns = [prn for _, prn, _, _ in arcs]
+        return cls(origin, segment, systems, prns, bounds, starts, spans, coefficients, residuals)
+
+    @metrics.measure("orbits.chebyshev")
+    def evaluate(self, system, prn, times):
+        r"""Evaluate the position and clock offset of a satellite.
+
+        Args:
+            system (str): System of the satellite (e.g. ``"G"``).
+            prn (int): PRN of the satellite.
+            times (numpy.ndarray): Dates, as ``datetime64`` (or a single ``gnsstime``).
+
+        Returns:
+            tuple: The ECEF positions of shape ``(N, 3)`` in meters, and the clock offsets of shape ``(N,)`` in seconds.
+                Dates outside of the fitted epochs are set to ``NaN``.
+        """
+        scalar = np.ndim(times) == 0
+        times = np.atleast_1d(np.asarray(times).astype("datetime64[ns]"))
+        if (system, prn) not in self._keys:
+            raise KeyError(f"Satellite {system}{prn:02d} is not available.")
+        isat = self._keys[(system, prn)]
+        seconds = (times - self.origin).astype(np.int64) * 1e-9
+        first, last = self._bounds[isat]
+        inside = ~np.isnat(times) & (seconds >= first) & (seconds <= last)
+
+        # The segment of a date is found directly, from its offset to the origin.
+        results = np.full((len(times), 4), np.nan)
+        seconds = seconds[inside]
+        segments = np.minimum((seconds // self.segment).astype(np.int64), self._starts.shape[1] - 1)
+        x = 2 * (seconds - self._starts[isat, segments]) / self._spans[isat, segments] - 1
+        # Chebyshev polynomials of the dates, then one matrix product per segment.
+        basis = chebyshev.chebvander(x, self.degree)
+        values = np.empty((len(x), 4))
+        order = np.argsort(segments, kind="stable")
+        splits = np.flatnonzero(np.diff(segments[order])) + 1
+        for indexes in np.split(order, splits):
+            if len(indexes) > 0:
+                values[indexes] = basis[indexes] @ self._coefficients[isat, segments[indexes[0]]]
+        results[inside] = values
+        metrics.count("orbits.chebyshev.records", len(times))
+        if scalar:
+            return results[0, :3], results[0, 3]
+        return results[:, :3], results[:, 3]
+
+    def save(self, filename):
+        r"""Save the fitted coefficients in a binary ``.npz`` archive.
+
+        Args:
+            filename (str): Path to the archive.
+        """
+        systems, prns = zip(*self.satellites)
+        np.savez_compressed(filename,
+                            origin=self.origin.astype(np.int64),
+                            segment=self.segment,
+                            systems=np.array(systems, dtype=str),
+                            prns=np.array(prns, dtype=np.int64),
+                            bounds=self._bounds,
+                            starts=self._starts,
+                            spans=self._spans,
+                            coefficients=self._coefficients,
+                            residuals=self.residuals.to_numpy())
+
+    @classmethod
+    def load(cls, filename):
+        r"""Load fitted coefficients saved with :meth:`save`.
+
+        Args:
+            filename (str): Path to the archive.
+
+        Returns:
+            ChebyshevOrbit
+        """
+        with np.load(filename) as archive:
+            return cls(archive["origin"].astype("datetime64[ns]"), archive["segment"], archive["systems"],
+                       archive["prns"], archive["bounds"], archive["starts"], archive["spans"],
+                       archive["coefficients"], archive["residuals"])
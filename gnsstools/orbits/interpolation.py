@@ -0,0 +1,192 @@
+# Encoding: UTF-8
+# File: interpolation.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module handles the interpolation of precise orbits (``SP3`` files).
+
+The positions and clocks of a satellite are interpolated with Lagrange polynomials, in their barycentric form.
+The weights only depend on the nodes, and are the same for every window of a regular grid (e.g. 15 minutes):
+they are computed once, and only the windows around data gaps need their own weights.
+"""
+
+
+# Basic imports
+from functools import lru_cache
+import math
+import numpy as np
+
+# GNSS Tools
+from gnsstools import metrics
+
+
+__all__ = [
+    "sp3_arcs",
+    "interpolate_lagrange",
+    "SP3Interpolator"
+]
+
+
+# Missing values of SP3 files.
+_BAD_POSITION = 0.0
+_BAD_CLOCK = 999999.
+
+
+@lru_cache(maxsize=None)
+def _regular_weights(order):
+    r"""Barycentric weights of ``order + 1`` equally spaced nodes (the spacing cancels out)."""
+    return np.array([(-1.0) ** j * math.comb(order, j) for j in range(order + 1)])
+
+
+def _weights(nodes):
+    r"""Barycentric weights of arbitrary nodes of shape ``(..., n)``."""
+    n = nodes.shape[-1]
+    diffs = nodes[..., :, None] - nodes[..., None, :] + np.eye(n)
+    return 1 / np.prod(diffs, axis=-1)
+
+
+def sp3_arcs(df):
+    r"""Split the epochs of a ``PositionDataFrame`` (e.g. from a ``SP3`` file) per satellite.
+
+    Args:
+        df (PositionDataFrame): Positions (km) and clocks (microseconds), indexed by ``System``, ``PRN`` and ``Date``.
+
+    Yields:
+        tuple: The system, PRN, sorted dates (as ``datetime64``) of a satellite, and its positions and clocks
+            of shape ``(T, 4)`` in meters and seconds. Missing values are set to ``NaN``.
+    """
+    # Only the epochs with a position record are kept.
+    df = df[df[["X", "Y", "Z"]].notna().all(axis=1)]
+    systems = df.index.get_level_values("System").to_numpy()
+    prns = df.index.get_level_values("PRN").to_numpy()
+    dates = df.index.get_level_values("Date").to_numpy().astype("datetime64[ns]")
+
+    # Positions in meters and clocks in seconds, missing values set to NaN.
+    coords = df[["X", "Y", "Z"]].to_numpy(dtype=np.float64, copy=True)
+    coords[np.all(coords == _BAD_POSITION, axis=-1)] = np.nan
+    clocks = df["Clock"].to_numpy(dtype=np.float64, copy=True)
+    clocks[clocks >= _BAD_CLOCK] = np.nan
+    values = np.column_stack([coords * 1e3, clocks * 1e-6])
+
+    indexes = np.lexsort((dates, prns, systems))
+    systems, prns, dates, values = systems[indexes], prns[indexes], dates[indexes], values[indexes]
+    keys = np.flatnonzero((systems[1:] != systems[:-1]) | (prns[1:] != prns[:-1])) + 1
+    for start, end in zip(np.concatenate(([0], keys)), np.concatenate((keys, [len(dates)]))):
+        if start < end:
+            yield systems[start], int(prns[start]), dates[start:end], np.ascontiguousarray(values[start:end])
+
+
+def interpolate_lagrange(nodes, values, queries, order=9):
+    r"""Interpolate values sampled on sorted nodes, with Lagrange polynomials of degree ``order``.
+
+    Each query is interpolated on the ``order + 1`` nodes centered around it (shifted at the edges of the nodes).
+    The queries outside of the nodes are not extrapolated, and set to ``NaN``.
+
+    Args:
+        nodes (numpy.ndarray): Sorted nodes of shape ``(T,)``.
+        values (numpy.ndarray): Values of shape ``(T, K)`` or ``(T,)``.
+        queries (numpy.ndarray): Points of shape ``(Q,)`` where to interpolate the values.
+        order (int, optional): Degree of the polynomials. Defaults to ``9``.
+
+    Returns:
+        numpy.ndarray: Interpolated values of shape ``(Q, K)`` or ``(Q,)``.
+
+    Examples:
+        >>> nodes = np.arange(0, 3600, 900.)
+        >>> interpolate_lagrange(nodes, nodes ** 2, [450., 1000.], order=3)
+            array([ 202500., 1000000.])
+    """
+    nodes = np.asarray(nodes, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    queries = np.asarray(queries, dtype=np.float64)
+    num_nodes, num_points = len(nodes), order + 1
+    results = np.full((len(queries),) + values.shape[1:], np.nan)
+    if num_nodes < num_points:
+        return results
+    inside = (queries >= nodes[0]) & (queries <= nodes[-1])
+    queries = queries[inside]
+
+    # Windows of nodes centered around the queries.
+    starts = np.clip(np.searchsorted(nodes, queries) - num_points // 2, 0, num_nodes - num_points)
+    windows = starts[:, None] + np.arange(num_points)
+    window_nodes = nodes[windows]
+
+    # The regular windows share the same weights, the others (e.g. around data gaps) have their own.
+    steps = np.diff(window_nodes, axis=-1)
+    regular = np.all(np.isclose(steps, steps[:, :1], rtol=1e-6, atol=0), axis=-1)
+    weights = np.broadcast_to(_regular_weights(order), window_nodes.shape).copy()
+    if not np.all(regular):
+        irregular = window_nodes[~regular]
+        weights[~regular] = _weights(irregular - irregular[:, :1])
+
+    # Barycentric formula. The queries matching a node take its value.
+    deltas = queries[:, None] - window_nodes
+    exact = deltas == 0
+    terms = weights / np.where(exact, 1, deltas)
+    hits = np.any(exact, axis=-1)
+    terms[hits] = exact[hits]
+    terms /= np.sum(terms, axis=-1, keepdims=True)
+    results[inside] = np.einsum("qn,qn...->q...", terms, values[windows])
+    return results
+
+
+class SP3Interpolator(object):
+    r"""
+    Interpolate the precise positions and clocks of the satellites of an ``SP3`` file, at any date.
+
+    The epochs, positions and clocks are kept as contiguous arrays per satellite,
+    so that thousands of dates are interpolated in one call.
+
+    * :attr:`order` (int): Degree of the Lagrange polynomials.
+
+    * :attr:`satellites` (list): Satellites ``(system, prn)`` available.
+
+    Examples:
+        >>> df = rinex.load("COM20225_15M.SP3")
+        >>> interpolator = SP3Interpolator(df, order=9)
+        >>> times = np.datetime64("2018-10-12T00:30:00") + np.arange(3600).astype("timedelta64[s]")
+        >>> positions, clocks = interpolator.interpolate("G", 2, times)
+    """
+
+    def __init__(self, df, order=9):
+        super().__init__()
+        self.order = order
+        self._arcs = {}
+        for system, prn, dates, values in sp3_arcs(df):
+            # Keep the dates as seconds from the first epoch, to interpolate floats.
+            seconds = (dates - dates[0]).astype(np.int64) * 1e-9
+            self._arcs[(system, prn)] = (dates[0], seconds, values)
+
+    @property
+    def satellites(self):
+        return list(self._arcs.keys())
+
+    @metrics.measure("orbits.sp3")
+    def interpolate(self, system, prn, times):
+        r"""Interpolate the position and clock offset of a satellite.
+
+        Args:
+            system (str): System of the satellite (e.g. ``"G"``).
+            prn (int): PRN of the satellite.
+            times (numpy.ndarray): Dates, as ``datetime64`` (or a single ``gnsstime``).
+
+        Returns:
+            tuple: The ECEF positions of shape ``(N, 3)`` in meters, and the clock offsets of shape ``(N,)`` in seconds.
+                Dates outside of the file are set to ``NaN``.
+        """
+        scalar = np.ndim(times) == 0
+        times = np.atleast_1d(np.asarray(times).astype("datetime64[ns]"))
+        if (system, prn) not in self._arcs:
+            raise KeyError(f"Satellite {system}{prn:02d} is not available.")
+        origin, seconds, values = self._arcs[(system, prn)]
+        queries = (times - origin).astype(np.int64) * 1e-9
+        queries[np.isnat(times)] = np.nan
+        results = interpolate_lagrange(seconds, values, queries, order=self.order)
+        metrics.count("orbits.sp3.records", len(queries))
+        if scalar:
+            return results[0, :3], results[0, 3]
+        return results[:, :3], results[:, 3]
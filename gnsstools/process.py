@@ -8,13 +8,44 @@
 # Basic imports
 import re
 import numpy as np
-from gnsstoolbox.gnss_process import TrilatGps
+import pandas as pd
 
 
 # GNSS ToolBox
+from gnsstools import metrics
 from gnsstools import Trilateration
-from gnsstools.const import c
-from gnsstools.logger import logger
+from gnsstools.kalman import KalmanFilter
+from gnsstools.const import c, omega_e
+from gnsstools.logger import logger, get_tracer
+from gnsstools.satellites.funtional import get_satellites_position, get_satellites_clock
+
+
+trace = get_tracer("process")
+
+
+def _pad_epochs(dates, *arrays):
+    r"""Group the observations per epoch, in arrays of shape ``(E, S, ...)`` padded with ``NaN``.
+
+    Args:
+        dates (numpy.ndarray): Date of each observation.
+        arrays (numpy.ndarray): Arrays of the observations, of shape ``(N, ...)``.
+
+    Returns:
+        tuple: The ``E`` sorted epochs, the mask of shape ``(E, S)`` of the actual observations, and the padded arrays.
+    """
+    epochs, inverse = np.unique(dates, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    counts = np.bincount(inverse, minlength=len(epochs))
+    # Position of each observation in its epoch.
+    slots = np.arange(len(dates)) - np.repeat(np.cumsum(counts) - counts, counts)
+    mask = np.zeros((len(epochs), counts.max(initial=0)), dtype=bool)
+    mask[inverse[order], slots] = True
+    padded = []
+    for array in arrays:
+        values = np.full(mask.shape + array.shape[1:], np.nan)
+        values[inverse[order], slots] = array[order]
+        padded.append(values)
+    return (epochs, mask, *padded)
 
 
 class GNSSProcess:
@@ -23,6 +54,7 @@ class GNSSProcess:
     def __init__(self):
         pass
 
+    @metrics.measure("process.spp")
     def spp(self, epoch, orbit):
         """Process epoch using spp.
 
@@ -41,26 +73,23 @@ class GNSSProcess:
         mjd = epoch.tgps.mjd
         for satellite in epoch.satellites:
 
-            logger.debug("Test if the satellite is part of the constellation.")
+            # Test if the satellite is part of the constellation.
             if not(re.search(satellite.const, "GRE")):
                 continue
 
             observable = 'C1'
             satellite.PR = satellite.obs.get(observable)
 
-            logger.debug("Test if observation is coherent.")
+            # Test if observation is coherent.
             if satellite.PR < 15e6:
                 continue
 
-            logger.debug("Test if satellite's navigation message is available.")
+            # Test if satellite's navigation message is available.
             eph = orbit.get_ephemeris(satellite.const, satellite.PRN, mjd)
             if not(hasattr(eph, 'mjd')):
-                logger.warning(f"No orbit for satellite const={satellite.const}, PRN={satellite.PRN}")
+                logger.warning("No orbit for satellite const=%s, PRN=%s", satellite.const, satellite.PRN)
                 continue
 
-            logger.debug(f"Current satellite: const={satellite.const}, PRN={satellite.PRN}")
-            logger.debug(f"mjd={epoch.tgps.mjd}, observable={satellite.obs.get(observable)}")
-
             #! ------------------------------------------------------------------------ #
             #! TODO (TP10)                                                              #
             #!                                                                          #
@@ -68,43 +97,185 @@ class GNSSProcess:
             #! message for a satellite `sat` at a specified epoch.                      #
             #! ------------------------------------------------------------------------ #
 
-            logger.debug(f"Compute time reception.")
+            # Compute time reception.
             tr = epoch.tgps.mjd
             dt = (mjd - eph.mjd) * 86_400
-            logger.debug(f"tr={tr} [mjd]")
-            logger.debug(f"dt={dt} [s]")
 
-            logger.debug(f"Compute travel time and emitted time.")
+            # Compute travel time and emitted time.
             travel_time = satellite.PR / c
             te = tr - travel_time / 86_400
-            logger.debug(f"te={te} [mjd]")
 
-            logger.debug(f"Compute clock drift.")
+            # Compute clock drift.
             dte = eph.alpha0 + eph.alpha1 * (tr - eph.TOC) + eph.alpha2 * (tr - eph.TOC) ** 2
             dte /= 86_400
-            logger.debug(f"dte={dte} [mjd]")
 
-            logger.debug("Correct emitted time from clock drift.")
+            # Correct emitted time from clock drift.
             te = te - dte
-            logger.debug(f"te={te} [mjd]")
 
-            logger.debug("Computing satellite coordinates.")
+            # Computing satellite coordinates.
             (Xs, Ys, Zs), dts = orbit.get_sat_coords(satellite.const, satellite.PRN, te)
-            logger.debug(f"Xs={Xs}, Ys={Ys}, Zs={Zs}, dte={dts}")
+            if trace.enabled:
+                trace("satellite", "const=%s, PRN=%s, tr=%s [mjd], te=%s [mjd], dte=%s [mjd], Xs=%s, Ys=%s, Zs=%s, dts=%s",
+                      satellite.const, satellite.PRN, tr, te, dte, Xs, Ys, Zs, dts)
 
-            logger.debug("Computing observed distances (satellite - receptor).")
+            # Computing observed distances (satellite - receptor).
             dist = satellite.PR + c * (dts)
 
-            logger.debug("Adding observations.")
+            # Adding observations.
             obs_dist.append(dist)
             sat_coords.append([Xs, Ys, Zs])
 
         obs_dist = np.array(obs_dist)
         sat_coords = np.array(sat_coords)
 
-        logger.debug("Compute receptor coordinates using trilateration.")
+        # Compute receptor coordinates using trilateration.
+        # Imported here, as gnsstoolbox is slow to import and only used by this legacy process.
+        from gnsstoolbox.gnss_process import TrilatGps
         # trilat = Trilateration(sat_coords, obs_dist)
         Xr, Yr, Zr, cdtr, sigma0_2, V, SigmaX = TrilatGps(sat_coords, obs_dist, np.zeros((4, 1)))
-        logger.debug(f"Xr={Xr}, Yr={Yr}, Zr={Zr}, cdtr={cdtr}")
+        trace("receptor", "Xr=%s, Yr=%s, Zr=%s, cdtr=%s", Xr, Yr, Zr, cdtr)
 
         return Xr, Yr, Zr, cdtr
+
+    def _measurements(self, observations, navigation, observable=None, systems="GE"):
+        """Compute the satellites positions and corrected pseudo-ranges of all the observations.
+        See :meth:`spp_batch` for the arguments.
+
+        Returns:
+            tuple: The reception dates ``(N,)``, the satellites names ``(N,)`` (e.g. ``"G05"``),
+                the satellites positions ``(N, 3)`` and the distances ``(N,)``,
+                for the observations with a valid navigation message.
+        """
+        if observable is None:
+            observable = "C1C" if "C1C" in observations.columns else "C1"
+
+        # Keep the coherent observations of the satellites part of the constellations.
+        pseudo_ranges = observations[observable].to_numpy(dtype=np.float64)
+        obs_systems = observations.index.get_level_values("System").to_numpy()
+        keep = np.isin(obs_systems, list(systems)) & (pseudo_ranges >= 15e6)
+        pseudo_ranges, obs_systems = pseudo_ranges[keep], obs_systems[keep]
+        obs_prns = observations.index.get_level_values("PRN").to_numpy()[keep]
+        tr = observations.index.get_level_values("Date").to_numpy().astype("datetime64[ns]")[keep]
+
+        # Compute the emission times, corrected from the satellites clock offsets.
+        travel_time = pseudo_ranges / c
+        te = tr - (travel_time * 1e9).astype("timedelta64[ns]")
+        ephemerides = navigation.select_many(obs_systems, obs_prns, te)
+        dte = get_satellites_clock(ephemerides, te)
+        te = te - (dte * 1e9).astype("timedelta64[ns]")
+
+        # Compute the satellites coordinates, rotated by the Earth rotation during the travel time.
+        sat_coords, dts = get_satellites_position(ephemerides, te)
+        cos, sin = np.cos(omega_e * travel_time), np.sin(omega_e * travel_time)
+        x_sat, y_sat = sat_coords[:, 0].copy(), sat_coords[:, 1].copy()
+        sat_coords[:, 0], sat_coords[:, 1] = cos * x_sat - sin * y_sat, sin * x_sat + cos * y_sat
+        distances = pseudo_ranges + c * dts
+
+        valid = ephemerides["valid"] & np.all(np.isfinite(sat_coords), axis=-1) & np.isfinite(distances)
+        trace("measurements", "%d observations, %d kept, %d with a valid navigation message",
+              len(keep), len(valid), np.count_nonzero(valid))
+        satellites = np.char.add(obs_systems.astype(str), np.char.zfill(obs_prns.astype(str), 2))
+        return tr[valid], satellites[valid], sat_coords[valid], distances[valid]
+
+    @metrics.measure("process.spp_batch")
+    def spp_batch(self, observations, navigation, observable=None, systems="GE", max_steps=10, epsilon=1e-4,
+                  raim=None):
+        """Process all the epochs of an observation file using spp.
+        The emission times, satellites positions and clocks are computed for all the observations at once.
+
+        .. note::
+            Only `GPS` and `Galileo` satellites are supported, as the solution has a single receiver clock bias.
+
+        Args:
+            observations (ObservationDataFrame): Observations, indexed by ``System``, ``PRN`` and ``Date``.
+            navigation (NavigationDataFrame): Navigation messages.
+            observable (str, optional): Pseudo-range to use. If ``None``, ``"C1C"`` (`RINEX3`) or ``"C1"`` (`RINEX2`).
+                Defaults to ``None``.
+            systems (str, optional): Systems of the satellites to use. Defaults to ``"GE"``.
+            max_steps (int, optional): Maximum number of least squares iterations. Defaults to ``10``.
+            epsilon (float, optional): Convergence threshold of the corrections, in meters. Defaults to ``1e-4``.
+            raim (RAIM, optional): If provided, the faulty satellites are detected and excluded before the
+                final trilateration. Defaults to ``None``.
+
+        Returns:
+            pandas.DataFrame: Receptor coordinates ``X``, ``Y``, ``Z`` and clock bias ``ClockBias`` (in meters),
+                the variance factor ``Sigma0_2`` and the number of satellites ``NumSat`` used, indexed by ``Date``.
+                With ``raim``, the satellites excluded ``Excluded`` (as a list of names) and the epochs
+                whose fault could not be excluded ``Fault`` are added.
+
+        Examples:
+            >>> observations = rinex.load("edf1285b.18o")
+            >>> navigation = rinex.load("BRDC00IGS_R_20182850000_01D_MN.rnx")
+            >>> solutions = GNSSProcess().spp_batch(observations, navigation)
+            >>> solutions = GNSSProcess().spp_batch(observations, navigation, raim=RAIM(sigma=5))
+        """
+        tr, satellites, sat_coords, distances = self._measurements(observations, navigation, observable, systems)
+        names, satellites = np.unique(satellites, return_inverse=True)
+        epochs, mask, satellites, sat_coords, distances = _pad_epochs(tr, satellites, sat_coords, distances)
+
+        rec_coords, cdtr = None, 0
+        if raim is not None:
+            # Detect and exclude the faulty satellites, for all the epochs at once.
+            rec_coords, cdtr, excluded, fault = raim.optimize(sat_coords, distances, mask)
+            mask = mask & ~excluded
+            trace("raim", "%d satellites excluded, %d faulty epochs", np.count_nonzero(excluded), np.count_nonzero(fault))
+
+        # Compute receptor coordinates using trilateration, for all the epochs at once.
+        rec_coords, cdtr, sigma0_2, _ = Trilateration.optimize_batch(sat_coords, distances, mask,
+                                                                      rec_coords=rec_coords, cdt=cdtr,
+                                                                      max_steps=max_steps, epsilon=epsilon)
+        df = pd.DataFrame(rec_coords, columns=["X", "Y", "Z"], index=pd.Index(epochs, name="Date"))
+        df["ClockBias"] = cdtr
+        df["Sigma0_2"] = sigma0_2
+        df["NumSat"] = mask.sum(axis=-1)
+        if raim is not None:
+            epoch_indexes, slot_indexes = np.nonzero(excluded)
+            names_excluded = names[satellites[epoch_indexes, slot_indexes].astype(np.int64)]
+            splits = np.cumsum(excluded.sum(axis=-1))[:-1]
+            df["Excluded"] = [list(names) for names in np.split(names_excluded, splits)]
+            df["Fault"] = fault
+        # Make it pretty
+        columns = sorted([col for col in df.columns])
+        df = df.reindex(columns, axis=1)
+        metrics.count("process.spp_batch.records", len(df))
+        return df
+
+    @metrics.measure("process.ekf")
+    def ekf(self, observations, navigation, kalman=None, observable=None, systems="GE"):
+        """Process the epochs of an observation file one by one, with an extended Kalman filter.
+        The epochs already processed by ``kalman`` (i.e. before its date) are skipped, to resume from a checkpoint.
+
+        Args:
+            observations (ObservationDataFrame): Observations, indexed by ``System``, ``PRN`` and ``Date``.
+            navigation (NavigationDataFrame): Navigation messages.
+            kalman (KalmanFilter, optional): Filter to update. Defaults to ``None`` (a new filter).
+            observable (str, optional): Pseudo-range to use, see :meth:`spp_batch`. Defaults to ``None``.
+            systems (str, optional): Systems of the satellites to use. Defaults to ``"GE"``.
+
+        Returns:
+            pandas.DataFrame: Receptor coordinates ``X``, ``Y``, ``Z``, velocity ``VX``, ``VY``, ``VZ``,
+                clock bias and drift ``ClockBias``, ``ClockDrift`` (in meters and meters per second)
+                and the number of satellites ``NumSat`` used, indexed by ``Date``.
+
+        Examples:
+            >>> kalman = KalmanFilter()
+            >>> solutions = GNSSProcess().ekf(observations, navigation, kalman=kalman)
+            >>> kalman.save("receptor.npz")
+        """
+        kalman = kalman or KalmanFilter()
+        tr, _, sat_coords, distances = self._measurements(observations, navigation, observable, systems)
+        epochs, mask, sat_coords, distances = _pad_epochs(tr, sat_coords, distances)
+        start = 0 if np.isnat(kalman.time) else np.searchsorted(epochs, kalman.time, side="right")
+
+        states = np.full((len(epochs), 8), np.nan)
+        for epoch in range(start, len(epochs)):
+            kalman.update(epochs[epoch], sat_coords[epoch], distances[epoch])
+            states[epoch] = kalman.state
+        df = pd.DataFrame(states[start:], columns=["X", "Y", "Z", "VX", "VY", "VZ", "ClockBias", "ClockDrift"],
+                          index=pd.Index(epochs[start:], name="Date"))
+        df["NumSat"] = mask[start:].sum(axis=-1)
+        # Make it pretty
+        columns = sorted([col for col in df.columns])
+        df = df.reindex(columns, axis=1)
+        metrics.count("process.ekf.records", len(df))
+        return df
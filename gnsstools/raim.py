@@ -0,0 +1,155 @@
+# Encoding: UTF-8
+# File: raim.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module handles the Receiver Autonomous Integrity Monitoring (RAIM) of trilaterations,
+with fault detection and exclusion (FDE).
+
+A fault is detected when the weighted sum of squared residuals exceeds a chi-square threshold.
+The satellites are then left out one at a time, without solving the trilateration again:
+removing a satellite is a rank-one downdate of the normal matrix, so the residuals and the solution
+without each satellite follow from the leverages of the complete solution. All the epochs are processed at once.
+"""
+
+
+# Basic imports
+from statistics import NormalDist
+import numpy as np
+
+# GNSS ToolBox
+from gnsstools import metrics
+from gnsstools.trilateration import Trilateration
+
+
+__all__ = [
+    "RAIM"
+]
+
+
+class RAIM(object):
+    r"""
+    Trilateration of many epochs with fault detection and exclusion.
+
+    * :attr:`sigma` (float or numpy.ndarray): Standard deviation of the distances, in meters.
+
+    * :attr:`alpha` (float): Probability of false alarm of the test.
+
+    * :attr:`max_exclusions` (int): Maximum number of satellites excluded per epoch.
+
+    * :attr:`statistics` (numpy.ndarray): Test statistics (weighted sum of squared residuals) of the last epochs processed.
+
+    * :attr:`thresholds` (numpy.ndarray): Thresholds of the test statistics.
+
+    Examples:
+        >>> raim = RAIM(sigma=5, alpha=1e-3)
+        >>> rec_coords, cdt, excluded, fault = raim.optimize(sat_coords, distances, mask)
+    """
+
+    def __init__(self, sigma=5., alpha=1e-3, max_exclusions=1):
+        super().__init__()
+        self.sigma = sigma
+        self.alpha = alpha
+        self.max_exclusions = max_exclusions
+        self.statistics = None
+        self.thresholds = None
+
+    def threshold(self, dof):
+        """Quantile ``1 - alpha`` of the chi-square distribution (Wilson-Hilferty approximation).
+
+        Args:
+            dof (numpy.ndarray): Degrees of freedom (number of observations - 4).
+
+        Returns:
+            numpy.ndarray: Thresholds, ``NaN`` without degree of freedom.
+        """
+        dof = np.asarray(dof, dtype=np.float64)
+        z = NormalDist().inv_cdf(1 - self.alpha)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(dof > 0, dof * (1 - 2 / (9 * dof) + z * np.sqrt(2 / (9 * dof))) ** 3, np.nan)
+
+    def _test(self, x0, sat_coords, distances, mask, P):
+        """Residuals, leverages and test statistics of the solutions ``x0``."""
+        A, v = Trilateration._linearize(x0, sat_coords, distances, mask)
+        N = np.swapaxes(A * P[..., None], 1, 2) @ A
+        N_inv = np.linalg.pinv(N)
+        # Leverage of each satellite: its weight times the variance of its predicted distance.
+        h = P * np.einsum("esi,eij,esj->es", A, N_inv, A)
+        statistics = np.sum(P * v ** 2, axis=-1)
+        return A, v, N_inv, h, statistics
+
+    @metrics.measure("raim")
+    def optimize(self, sat_coords, distances, mask=None, max_steps=20, epsilon=1e-6):
+        """Trilateration of many epochs at once, excluding the faulty satellites.
+
+        Args:
+            sat_coords (numpy.ndarray): Satellites positions of shape ``(E, S, 3)``.
+            distances (numpy.ndarray): Observed distances (satellites - receptor) of shape ``(E, S)``.
+            mask (numpy.ndarray, optional): Satellites to use, of shape ``(E, S)``. Defaults to ``None``.
+            max_steps (int, optional): Maximum number of iterations. Defaults to ``20``.
+            epsilon (float, optional): Convergence threshold of the corrections. Defaults to ``1e-6``.
+
+        Returns:
+            tuple: Receptor positions ``(E, 3)``, time delays * celerity ``(E,)``, excluded satellites ``(E, S)``,
+                and the epochs ``(E,)`` whose fault could not be excluded.
+        """
+        sat_coords = np.asarray(sat_coords, dtype=np.float64)
+        distances = np.asarray(distances, dtype=np.float64)
+        valid = np.isfinite(distances) & np.all(np.isfinite(sat_coords), axis=-1)
+        mask = valid if mask is None else valid & np.asarray(mask, dtype=bool)
+        sat_coords = np.where(mask[..., None], sat_coords, 0)
+        distances = np.where(mask, distances, 0)
+        sigma = np.broadcast_to(np.asarray(self.sigma, dtype=np.float64), distances.shape)
+        P = 1 / sigma ** 2
+
+        rec_coords, cdt, _, _ = Trilateration.optimize_batch(sat_coords, distances, mask, sigma=sigma,
+                                                             max_steps=max_steps, epsilon=epsilon)
+        x0 = np.column_stack([rec_coords, cdt])
+        excluded = np.zeros(mask.shape, dtype=bool)
+        # Epochs without any satellite left to exclude are not tested again.
+        stuck = np.zeros(len(x0), dtype=bool)
+        solvable = ~np.isnan(cdt)
+        # The worst satellite of each failing epoch is excluded per round, even if the test still fails without it:
+        # the next rounds exclude the other faults. The epochs still failing after the last round are reported.
+        for _ in range(self.max_exclusions):
+            epochs = np.flatnonzero(solvable & ~stuck)
+            A, v, N_inv, h, statistics = self._test(x0[epochs], sat_coords[epochs], distances[epochs],
+                                                    mask[epochs], P[epochs] * mask[epochs])
+            dof = mask[epochs].sum(axis=-1) - 4
+            failing = statistics > self.threshold(dof)
+            if not np.any(failing):
+                break
+
+            # Decrease of the statistics without each satellite, from rank-one downdates of the normal matrices.
+            candidates = mask[epochs] & (h < 1 - 1e-9) & failing[:, None] & (dof[:, None] > 1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                reduction = np.where(candidates, P[epochs] * v ** 2 / (1 - h), -np.inf)
+            worst = np.argmax(reduction, axis=-1)
+            rows = np.arange(len(epochs))
+            exclude = failing & np.isfinite(reduction[rows, worst])
+            stuck[epochs[failing & ~exclude]] = True
+
+            # Leave-one-out solutions: x - N^-1 a p v / (1 - h).
+            rows, epochs, worst = rows[exclude], epochs[exclude], worst[exclude]
+            a = A[rows, worst]
+            scale = P[epochs, worst] * v[rows, worst] / (1 - h[rows, worst])
+            x0[epochs] -= (N_inv[rows] @ a[..., None])[..., 0] * scale[:, None]
+            mask[epochs, worst] = False
+            excluded[epochs, worst] = True
+            # A few iterations refine the linearized solutions.
+            rec_coords, cdt, _, _ = Trilateration.optimize_batch(sat_coords[epochs], distances[epochs], mask[epochs],
+                                                                 rec_coords=x0[epochs, :3], cdt=x0[epochs, 3],
+                                                                 sigma=sigma[epochs], max_steps=max_steps, epsilon=epsilon)
+            x0[epochs] = np.column_stack([rec_coords, cdt])
+
+        # Final tests, on all the epochs.
+        _, _, _, _, statistics = self._test(np.nan_to_num(x0), sat_coords, distances, mask, P * mask)
+        self.thresholds = self.threshold(mask.sum(axis=-1) - 4)
+        self.statistics = np.where(solvable, statistics, np.nan)
+        fault = self.statistics > self.thresholds
+        metrics.count("raim.exclusions", np.count_nonzero(excluded))
+        return x0[:, :3], x0[:, 3], excluded, fault
@@ -6,33 +6,77 @@
 
 
 # Basic imports
+import functools
+import importlib
+import os
 
 # GNSS Tools
-from gnsstools.logger import logger
-from .header import RinexHeaderReader
-from .nav import RinexNavReader
-from .obs2 import Rinex2ObsReader
-from .obs3 import Rinex3ObsReader
-from .sp3 import SP3Reader
-from .utils import convert_georinex
-
-
-try:
-    import georinex
-except:
-    logger.warning("The package 'georinex' was not found. Please install it to handles more files: pip install georinex.")
+from gnsstools import metrics
+from gnsstools.logger import logger, get_tracer
 
 
 __all__ = [
-    "load"
+    "load",
+    "load_many"
 ]
 
 
-def load(filename, *args, force=False, **kwargs):
-    """Load any `RINEX` files, from ``.SP3`` and ``.rnx`` to ``.*o`` extensions.
+trace = get_tracer("rinex")
+
+
+# The readers (and pandas with them) are only imported when they are first used,
+# e.g. ``from gnsstools.rinex import RinexNavReader`` does not import the observation readers.
+_LAZY_OBJECTS = {
+    "LineBuffer": ".buffer",
+    "RinexHeaderReader": ".header",
+    "RinexNavReader": ".nav",
+    "Rinex2ObsReader": ".obs2",
+    "Rinex3ObsReader": ".obs3",
+    "SP3Reader": ".sp3",
+    "CRXReader": ".crx",
+    "FileCache": ".cache",
+    "CACHE_SIZE": ".cache",
+    "convert_georinex": ".utils",
+    "CancellationToken": ".progress",
+    "ReadCancelled": ".progress",
+    "Progress": ".progress",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_OBJECTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_OBJECTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_OBJECTS))
+
+
+def load(filename, *args, force=False, cache_dir=None, cache_size=None, n_jobs=1,
+         progress=None, cancel=None, progress_interval=0.1, chunk_size=None, **kwargs):
+    """Load any `RINEX` files, from ``.SP3`` and ``.rnx`` to ``.*o`` and Compact `RINEX` (``.crx``, ``.*d``) extensions.
 
     Args:
         filename (str): Path to the file to open.
+        force (bool, optional): If ``True``, parse the file again even if it is cached. Defaults to ``False``.
+        cache_dir (str, optional): Directory where the parsed files are cached, see :class:`FileCache`.
+            The cache is disabled if ``None``. Defaults to ``None``.
+        cache_size (int, optional): Size limit of the cache, in bytes. Defaults to ``None`` (1 GiB).
+        n_jobs (int, optional): Maximum number of processes used to read the file, split on its epochs.
+            Only `RINEX3` observation and ``SP3`` files are split, with at most one process per CPU and per 8 MB
+            of data. Defaults to ``1``.
+        progress (callable, optional): Function called with the number of lines read and the total number of lines,
+            as ``progress(done, total)``. Nothing is reported on a cache hit. Defaults to ``None``.
+        cancel (CancellationToken, optional): Token stopping the reading, with a ``ReadCancelled`` error.
+            Defaults to ``None``.
+        progress_interval (float, optional): Minimum duration between two calls of ``progress``, in seconds.
+            Defaults to ``0.1``.
+        chunk_size (int, optional): Number of lines read between two updates of the progress (and checks of
+            the cancellation), for navigation, `RINEX3` observation and ``SP3`` files. `RINEX2` and Compact `RINEX`
+            files are updated after each epoch. Defaults to ``None`` (10 000 lines).
 
     Returns:
         pandas.DataFrame
@@ -47,52 +91,153 @@ def load(filename, *args, force=False, **kwargs):
         >>> df = rinex.load("edf1285b.18n")
         >>> # Load an Observation file
         >>> df = rinex.load("edf1285b.18o")
+        >>> # Load a Compact RINEX (Hatanaka) file
+        >>> df = rinex.load("edf1285b.18d")
         >>> # Load a SP3 file
         >>> df = rinex.load("COM20225_15M.SP3")
+        >>> # Cache the parsed file, for the next calls
+        >>> df = rinex.load("COM20225_15M.SP3", cache_dir="~/.cache/gnsstools")
+        >>> # Report the progress, and stop the reading from another thread with token.cancel()
+        >>> token = rinex.CancellationToken()
+        >>> df = rinex.load("edf1285b.18o", progress=lambda done, total: print(f"{done}/{total}"), cancel=token)
     """
-    with open(filename, "r") as f:
-        lines = f.read().split("\n")
+    from .buffer import LineBuffer
+    from .cache import FileCache, CACHE_SIZE
+
+    if cancel is not None:
+        cancel.check()
+    options = dict(n_jobs=n_jobs, progress=progress, cancel=cancel, progress_interval=progress_interval,
+                   chunk_size=chunk_size)
+    if cache_dir is None:
+        with LineBuffer.open(filename) as lines:
+            return _load(filename, lines, *args, **options, **kwargs)
+
+    cache = FileCache(cache_dir, max_size=cache_size or CACHE_SIZE)
+    key = cache.key(filename, *args, **kwargs)
+    df = None if force else cache.get(key)
+    metrics.count("rinex.cache.hits" if df is not None else "rinex.cache.misses")
+    if df is None:
+        df = load(filename, *args, **options, **kwargs)
+        cache.set(key, df)
+    return df
+
+
+def load_many(paths, n_jobs=None, backend="process", concat=False, level="File", **kwargs):
+    """Load several `RINEX` files in parallel, each one with :func:`load`.
+
+    Args:
+        paths (list): Paths to the files to open.
+        n_jobs (int, optional): Number of workers. Defaults to the number of CPUs.
+        backend (str, optional): Pool of workers, either ``"process"`` or ``"thread"``. Defaults to ``"process"``.
+        concat (bool, optional): If ``True``, concatenate the files into one DataFrame. Defaults to ``False``.
+        level (str, optional): Name of the index level added when concatenating, either ``"File"`` (name of the file)
+            or ``"Station"`` (marker name, or the first 4 characters of the file name). Defaults to ``"File"``.
+        kwargs (dict): Other arguments passed to :func:`load` (e.g. ``cache_dir``).
+
+    Returns:
+        dict or pandas.DataFrame: DataFrames per path, or the concatenated DataFrame.
+
+    Examples:
+        >>> from gnsstools import rinex
+        >>> dfs = rinex.load_many(["edf1285b.18o", "ENSG00FRA_R_20182850000_01D_30S_MO.rnx"], n_jobs=2)
+        >>> df = rinex.load_many(["edf1285b.18o", "ENSG00FRA_R_20182850000_01D_30S_MO.rnx"], concat=True, level="Station")
+    """
+    assert backend in ("process", "thread"), f"Unknown backend {backend}. Available backends are 'process' and 'thread'."
+    assert level in ("File", "Station"), f"Unknown level {level}. Available levels are 'File' and 'Station'."
+    paths = list(paths)
+    n_jobs = min(n_jobs or os.cpu_count() or 1, max(len(paths), 1))
+
+    load_path = functools.partial(load, **kwargs)
+    if n_jobs == 1:
+        dfs = list(map(load_path, paths))
+    else:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        executor = ProcessPoolExecutor if backend == "process" else ThreadPoolExecutor
+        with executor(max_workers=n_jobs) as pool:
+            dfs = list(pool.map(load_path, paths))
+    dfs = dict(zip(paths, dfs))
+    if not concat:
+        return dfs
+
+    import pandas as pd
+
+    keys = []
+    for path, df in dfs.items():
+        name = os.path.basename(path)
+        if level == "Station":
+            name = df.attrs.get("MarkerName", None) or name[:4].upper()
+        keys.append(name)
+    return pd.concat(dfs.values(), keys=keys, names=[level], sort=False)
+
+
+@metrics.measure("rinex.load")
+def _load(filename, lines, *args, n_jobs=1, progress=None, cancel=None, progress_interval=0.1, chunk_size=None,
+          **kwargs):
+    from .header import RinexHeaderReader
 
     reader = RinexHeaderReader(lines)
     header = reader.read()
     version = header.get("Version", 3.04)
     dtype = header.get("Type", None)
-    
-    print(header)
-    
+    trace("header", "%s: version=%s, type=%s", filename, version, dtype)
+
+    options = dict(progress=progress, cancel=cancel, progress_interval=progress_interval)
     df = None
-    # TODO: georinex is not optimized. Recreate its main functionalities (only 'SP3' and 'crx' reader are missing)
+    # TODO: georinex is not optimized. Recreate its main functionalities
     # Read Navigation data
     if dtype == "N":
+        from .nav import RinexNavReader
+
         system = None
         if filename.endswith("n"):
             system = "G"
         elif filename.endswith("g"):
             system = "R"
         reader = RinexNavReader(lines, system=system)
-        df = reader.read()
+        df = reader.read(chunk_size=chunk_size, **options)
         df.attrs = header
 
     # Read observation data
     elif dtype == "O":
-        if version < 3:
+        if header.get("CompactVersion", None) is not None:
+            from .crx import CRXReader
+
+            reader = CRXReader(lines)
+            df = reader.read(**options)
+            df.attrs = header
+        elif version < 3:
+            from .obs2 import Rinex2ObsReader
+
             reader = Rinex2ObsReader(lines)
-            df = reader.read()
+            df = reader.read(**options)
             df.attrs = header
         else:
+            from .obs3 import Rinex3ObsReader
+
             reader = Rinex3ObsReader(lines)
-            df = reader.read()
+            df = reader.read(n_jobs=n_jobs, chunk_size=chunk_size, **options)
             df.attrs = header
 
     # Read SP3 data
     elif filename.lower().endswith(".sp3"):
+        from .sp3 import SP3Reader
+
         reader = SP3Reader(lines)
-        df = reader.read()
+        df = reader.read(n_jobs=n_jobs, chunk_size=chunk_size, **options)
         df.attrs = header
     
     # Read with GeoRinex package
     else:
+        try:
+            import georinex
+        except ImportError:
+            logger.error("The package 'georinex' was not found. Please install it to handles more files: pip install georinex.")
+            raise
+        from .utils import convert_georinex
+
         ds = georinex.load(filename, *args, **kwargs)
         df = convert_georinex(ds)
 
+    trace("read", "%s: %d records", filename, len(df))
     return df
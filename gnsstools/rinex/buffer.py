@@ -0,0 +1,171 @@
+# Encoding: UTF-8
+# File: buffer.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module handles the input of `RINEX` files at the byte level.
+The file is memory-mapped and only the offsets of its lines are computed,
+so that the readers can slice their records without creating a string per line.
+"""
+
+
+# Basic imports
+from collections.abc import Sequence
+import mmap
+import numpy as np
+
+
+__all__ = [
+    "LineBuffer"
+]
+
+
+# Number of lines gathered at once when building a matrix of fixed-width records.
+CHUNK_SIZE = 65_536
+
+
+class LineBuffer(Sequence):
+    r"""Sequence of lines backed by a bytes-like buffer (e.g. a memory-mapped file).
+    It behaves like the list returned by ``f.read().split("\n")``, the lines being decoded on access.
+
+    * :attr:`starts` (numpy.ndarray): Offset of the first byte of each line.
+
+    * :attr:`ends` (numpy.ndarray): Offset of the end of each line (end of line characters excluded).
+
+    * :attr:`filename` (str): Path of the memory-mapped file, or ``None``.
+
+    * :attr:`offset` (int): Offset of the first byte of the buffer in the file.
+
+    Examples:
+        >>> with LineBuffer.open("edf1285b.18o") as lines:
+        ...     header = RinexHeaderReader(lines).read()
+    """
+
+    def __init__(self, buffer, start=0, end=None):
+        super().__init__()
+        self._mmap = None
+        self.filename = None
+        end = len(buffer) if end is None else min(end, len(buffer))
+        start = min(start, end)
+        self.offset = start
+        # A range of the buffer is viewed, not copied.
+        self._buffer = buffer if end - start == len(buffer) else memoryview(buffer)[start:end]
+        self._data = np.frombuffer(buffer, dtype=np.uint8, count=end - start, offset=start) if end > start \
+            else np.zeros(0, dtype=np.uint8)
+
+        # Locate the lines, like `str.split("\n")` would do.
+        newlines = np.flatnonzero(self._data == ord("\n"))
+        self.starts = np.concatenate(([0], newlines + 1))
+        self.ends = np.concatenate((newlines, [len(self._data)]))
+        # Remove the carriage returns of "\r\n" line endings.
+        carriage = np.zeros(len(self.ends), dtype=bool)
+        not_empty = self.ends > self.starts
+        carriage[not_empty] = self._data[self.ends[not_empty] - 1] == ord("\r")
+        self.ends[carriage] -= 1
+
+    @classmethod
+    def open(cls, filename, start=0, end=None):
+        """Memory-map a file in read-only mode.
+
+        Args:
+            filename (str): Path to the file to open.
+            start (int, optional): Offset of the first byte to read. Defaults to ``0``.
+            end (int, optional): Offset of the byte after the last one to read. Defaults to ``None`` (end of the file).
+
+        Returns:
+            LineBuffer
+        """
+        with open(filename, "rb") as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # Empty files can't be mapped.
+            except ValueError:
+                buffer = None
+        lines = cls(b"" if buffer is None else buffer, start, end)
+        lines._mmap = buffer
+        lines.filename = filename
+        return lines
+
+    def close(self):
+        """Release the memory-mapped file, if any."""
+        if isinstance(self._buffer, memoryview):
+            self._buffer.release()
+        self._data = None
+        self._buffer = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start, end = self.starts[index], self.ends[index]
+        return bytes(self._buffer[start:end]).decode("utf-8", "replace")
+
+    def __iter__(self):
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            yield bytes(self._buffer[start:end]).decode("utf-8", "replace")
+
+    def extract(self, start, end):
+        """Copy the lines ``start:end`` into a new, in-memory, buffer (e.g. to send them to another process).
+
+        Args:
+            start (int): Index of the first line.
+            end (int): Index of the line after the last one.
+
+        Returns:
+            LineBuffer
+        """
+        end = min(end, len(self))
+        if start >= end:
+            return LineBuffer(b"")
+        return LineBuffer(bytes(self._buffer[self.starts[start]:self.ends[end - 1]]))
+
+    def to_matrix(self, indexes, width):
+        r"""Gather lines into a ``(len(indexes), width)`` matrix of ASCII codes, without decoding them.
+        Shorter (or missing) lines are padded with blank spaces, longer ones are truncated.
+
+        Args:
+            indexes (numpy.ndarray): Index of the lines to gather.
+            width (int): Number of columns to keep.
+
+        Returns:
+            numpy.ndarray
+        """
+        indexes = np.asarray(indexes, dtype=np.int64)
+        matrix = np.full((len(indexes), width), ord(" "), dtype=np.uint8)
+        columns = np.arange(width)
+        # Each line is copied as a whole row of ``width`` bytes, from a view of all the rows starting at each byte.
+        # Only the lines closer than ``width`` bytes to the end of the buffer are gathered byte by byte.
+        windows = np.lib.stride_tricks.sliding_window_view(self._data, width) if len(self._data) >= width else None
+        for chunk in range(0, len(indexes), CHUNK_SIZE):
+            lines = indexes[chunk:chunk + CHUNK_SIZE]
+            exists = lines < len(self)
+            lines = np.where(exists, lines, 0)
+            starts = self.starts[lines]
+            lengths = np.where(exists, self.ends[lines] - starts, 0)
+            block = matrix[chunk:chunk + len(lines)]
+            rows = starts + width <= len(self._data)
+            if windows is not None:
+                block[rows] = windows[starts[rows]]
+            positions = starts[~rows, None] + columns
+            valid = columns < lengths[~rows, None]
+            tail = block[~rows]
+            tail[valid] = self._data[positions[valid]]
+            block[~rows] = tail
+            # Blank the bytes after the end of the lines.
+            block[columns >= lengths[:, None]] = ord(" ")
+        return matrix
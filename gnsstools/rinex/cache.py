@@ -0,0 +1,239 @@
+# Encoding: UTF-8
+# File: cache.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module handles a persistent cache of parsed `RINEX` files.
+
+Each parsed file is saved as a ``.npz`` archive (one array per column and index level, plus the header),
+keyed by the path, size, modification time and content hash of the file. The cache directory can be
+shared by several processes: the entries are written atomically, under a file lock,
+and the least recently used entries are evicted once the cache exceeds its size limit.
+
+The header and the names of the columns are saved as JSON, and the archives are loaded without pickle.
+DataFrames that cannot be saved this way (e.g. with columns of objects) are not cached.
+"""
+
+
+# Basic imports
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# GNSS Tools
+from .datasets import NavigationDataFrame, ObservationDataFrame, PositionDataFrame
+
+
+__all__ = [
+    "FileCache"
+]
+
+
+# Bump this version whenever the parsed DataFrames change, to invalidate the previous entries.
+CACHE_VERSION = 3
+# Default size limit of a cache directory, in bytes.
+CACHE_SIZE = 2 ** 30
+# Size of the blocks read while hashing a file.
+BLOCK_SIZE = 2 ** 20
+
+DATAFRAMES = {cls.__name__: cls for cls in (pd.DataFrame, NavigationDataFrame, ObservationDataFrame, PositionDataFrame)}
+
+
+def _to_array(values):
+    """Convert a column to an array that can be saved in a ``.npz`` archive, as strings rather than objects if possible."""
+    values = np.asarray(values)
+    if values.dtype == object and all(isinstance(value, str) for value in values):
+        return values.astype(str)
+    return values
+
+
+def _to_json(value):
+    """Convert the ``numpy`` values of a header to JSON."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FileCache(object):
+    r"""
+    Persistent cache of parsed files, saved in a directory.
+
+    * :attr:`cache_dir` (str): Directory of the cache.
+
+    * :attr:`max_size` (int): Size limit of the cache, in bytes.
+
+    Examples:
+        >>> cache = FileCache("~/.cache/gnsstools")
+        >>> key = cache.key("BRDC00IGS_R_20182850000_01D_MN.rnx")
+        >>> df = cache.get(key)
+        >>> if df is None:
+        ...     df = rinex.load("BRDC00IGS_R_20182850000_01D_MN.rnx")
+        ...     cache.set(key, df)
+    """
+
+    def __init__(self, cache_dir, max_size=CACHE_SIZE):
+        super().__init__()
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @contextmanager
+    def _lock(self, shared=False):
+        """Lock the cache directory. Readers share the lock, writers hold it exclusively."""
+        with open(os.path.join(self.cache_dir, ".lock"), "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    @staticmethod
+    def key(filename, *args, **kwargs):
+        """Compute the key of a file, from its path, size, modification time and content.
+        Additional arguments (e.g. the ones used to parse the file) are part of the key too.
+
+        Args:
+            filename (str): Path to the file.
+
+        Returns:
+            str
+        """
+        stat = os.stat(filename)
+        digest = hashlib.blake2b()
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+                digest.update(block)
+        identity = f"{CACHE_VERSION}|{os.path.abspath(filename)}|{stat.st_size}|{stat.st_mtime_ns}|" \
+                   f"{digest.hexdigest()}|{args!r}|{sorted(kwargs.items())!r}"
+        return hashlib.blake2b(identity.encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, key):
+        """Load a DataFrame from the cache.
+
+        Args:
+            key (str): Key of the entry, see :meth:`key`.
+
+        Returns:
+            pandas.DataFrame: The cached DataFrame (with its attributes), or ``None`` if it is not cached.
+        """
+        path = self._path(key)
+        with self._lock(shared=True):
+            if not os.path.exists(path):
+                return None
+            with np.load(path, allow_pickle=False) as archive:
+                data = {name: archive[name] for name in archive.files}
+        # Mark the entry as recently used.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        index_names = json.loads(str(data["index_names"]))
+        columns = json.loads(str(data["columns"]))
+        levels = [data[f"index_{i}"] for i in range(len(index_names))]
+        if len(levels) > 1:
+            index = pd.MultiIndex.from_arrays(levels, names=index_names)
+        else:
+            index = pd.Index(levels[0], name=index_names[0])
+        df = pd.DataFrame({i: data[f"column_{i}"] for i in range(len(columns))}, index=index)
+        df.columns = columns
+        df = DATAFRAMES.get(str(data["kind"]), pd.DataFrame)(df)
+        df.attrs = json.loads(str(data["attrs"]))
+        return df
+
+    def set(self, key, df):
+        """Save a DataFrame in the cache, then evict the least recently used entries if the cache is full.
+        The DataFrame is not saved if it cannot be saved without pickle, or if it alone exceeds :attr:`max_size`.
+
+        Args:
+            key (str): Key of the entry, see :meth:`key`.
+            df (pandas.DataFrame): DataFrame to save.
+
+        Returns:
+            bool: ``True`` if the DataFrame was saved.
+        """
+        try:
+            data = {
+                "kind": np.array(type(df).__name__),
+                "index_names": np.array(json.dumps(list(df.index.names), default=_to_json)),
+                "columns": np.array(json.dumps(list(df.columns), default=_to_json)),
+                "attrs": np.array(json.dumps(dict(df.attrs), default=_to_json))
+            }
+        except TypeError:
+            return False
+        for i in range(df.index.nlevels):
+            data[f"index_{i}"] = _to_array(df.index.get_level_values(i))
+        for i in range(df.shape[1]):
+            data[f"column_{i}"] = _to_array(df.iloc[:, i])
+        if any(array.dtype == object for array in data.values()):
+            return False
+
+        # Write to a temporary file first, so that readers never see a partial entry.
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+            try:
+                np.savez(f, **data)
+            except BaseException:
+                f.close()
+                os.remove(f.name)
+                raise
+        if os.path.getsize(f.name) > self.max_size:
+            os.remove(f.name)
+            return False
+        with self._lock():
+            os.replace(f.name, self._path(key))
+            self._evict(keep=self._path(key))
+        return True
+
+    def _evict(self, keep=None):
+        """Remove the least recently used entries until the cache fits in :attr:`max_size`.
+
+        Args:
+            keep (str, optional): Path of an entry that is never removed (e.g. the one just written).
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".npz") and entry.path != keep:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        size = sum([entry[1] for entry in entries])
+        if keep is not None and os.path.exists(keep):
+            size += os.path.getsize(keep)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            os.remove(path)
+            size -= entry_size
+
+    def clear(self):
+        """Remove all entries of the cache."""
+        with self._lock():
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".npz"):
+                    os.remove(entry.path)
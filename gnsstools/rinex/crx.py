@@ -0,0 +1,295 @@
+# Encoding: UTF-8
+# File: crx.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module handles reading Compact `RINEX` (Hatanaka) observation files,
+for version 1.0 (`RINEX2` observations) and 3.0 (`RINEX3` observations).
+
+The epochs are decompressed on the fly, straight into arrays of observations,
+without writing a temporary `RINEX` file.
+"""
+
+
+# Basic imports
+from collections import defaultdict
+import itertools
+import numpy as np
+import pandas as pd
+
+# GNSS Tools
+from .reader import ABCReader
+from .header import RinexHeaderReader, SYSTEMS
+from .obs2 import Rinex2ObsReader
+from .obs3 import Rinex3ObsReader
+from .datasets import ObservationDataFrame
+from .progress import Progress
+from gnsstools import metrics
+from gnsstools.gnsstime import to_datetime64
+
+
+__all__ = [
+    "CRXReader"
+]
+
+
+class CRXReader(ABCReader):
+    """
+    Handles reading Compact `RINEX` files (``.crx``, ``.YYd``).
+
+    * :attr:`lines` (list): List of lines to process.
+
+    * :attr:`version` (float): Version of the compact format (``1.0`` or ``3.0``).
+
+    """
+
+    def __init__(self, lines):
+        super().__init__(lines)
+        self.version = None
+        # Decompression state: the last epoch line, and the arcs of differences per satellite.
+        self._epoch = ""
+        self._arcs = {}
+
+    def _read_header(self):
+        """Read the compact version and the fields / observations of the embedded `RINEX` header.
+
+        Returns:
+            dict: Name of the fields / observations per system.
+        """
+        self._cursor = 0
+        self.version = float(self.lines[0][:20])
+        # The `RINEX` header is kept as is in compact files.
+        if self.version < 3:
+            fields_dict = dict.fromkeys(SYSTEMS, Rinex2ObsReader(self.lines)._read_header())
+        else:
+            fields_dict = Rinex3ObsReader(self.lines)._read_header()
+        self._skip_header()
+        return fields_dict
+
+    @staticmethod
+    def _repair(line, diff):
+        """Apply text differences to a line.
+        A blank space keeps the previous character, a ``"&"`` replaces it by a blank space.
+
+        Examples:
+            >>> CRXReader._repair(" 18 10 12  1  0 15.0000000", "                   30")
+                " 18 10 12  1  0 30.0000000"
+        """
+        line = line.ljust(len(diff))
+        chars = [old if new == " " else " " if new == "&" else new for old, new in zip(line, diff)]
+        return "".join(chars) + line[len(diff):]
+
+    @staticmethod
+    def _uncompress(arc, token):
+        """Restore a value from its differences.
+
+        An arc is initialized with ``"<order>&<value>"``. The next values are the differences of
+        increasing order (up to ``order``) with the previous ones.
+
+        Args:
+            arc (list): The order followed by the differences of the previous value. Updated inplace.
+            token (str): Compressed value.
+
+        Returns:
+            int: The restored value, or ``None`` if the arc was not initialized.
+        """
+        if "&" in token:
+            order, value = token.split("&")
+            arc[:] = [int(order), int(value)]
+            return arc[1]
+        if len(arc) == 0:
+            return None
+
+        order, diffs = arc[0], arc[1:]
+        degree = min(len(diffs), order)
+        values = [0] * (degree + 1)
+        values[degree] = int(token)
+        for i in range(degree - 1, -1, -1):
+            values[i] = values[i + 1] + diffs[i]
+        arc[1:] = values
+        return values[0]
+
+    def _read_obs(self, satellite, line, num_fields):
+        """Decompress the observations of a satellite.
+        The last token of the line (loss of lock and signal strength flags) is ignored.
+
+        Returns:
+            list: The observations, ``NaN`` if missing.
+        """
+        tokens = line.split(" ", num_fields)
+        tokens.extend([""] * (num_fields - len(tokens)))
+        arcs = self._arcs.setdefault(satellite, [[] for _ in range(num_fields)])
+        data = []
+        for i in range(num_fields):
+            # A blank field closes the arc.
+            if tokens[i] == "":
+                arcs[i] = []
+                data.append(np.nan)
+                continue
+            value = self._uncompress(arcs[i], tokens[i])
+            data.append(np.nan if value is None else value / 1000)
+        return data
+
+    def _decode_epochs(self, lines, fields_dict):
+        """Decompress the epochs from an iterator of lines.
+
+        Args:
+            lines (iterator): Lines following the header.
+            fields_dict (dict): Name of the fields / observations per system.
+
+        Yields:
+            tuple: The date (year, month, day, hour, minute and second strings), the satellites and their observations.
+        """
+        # Epoch lines are either initialized (starting with "&" or ">") or differenced from the previous one.
+        init, sat_column = ("&", 32) if self.version < 3 else (">", 41)
+        for line in lines:
+            if line.strip() == "":
+                continue
+            elif line[0] == init:
+                self._epoch = " " + line[1:] if self.version < 3 else line
+            else:
+                self._epoch = self._repair(self._epoch, line)
+            epoch = self._epoch
+
+            # Read the date and the satellites (all on the epoch line).
+            if self.version < 3:
+                year, month, day, hour, minute, second = epoch[0:3], epoch[3:6], epoch[6:9], epoch[9:12], epoch[12:15], epoch[15:26]
+                flag, sat_num = epoch[28:29], int(epoch[29:32])
+            else:
+                year, month, day, hour, minute, second = epoch[2:6], epoch[7:9], epoch[10:12], epoch[13:15], epoch[16:18], epoch[19:29]
+                flag, sat_num = epoch[31:32], int(epoch[32:35])
+            # Only observations are read (flag 0: OK, 1: power failure). Events records are skipped.
+            if flag not in (" ", "0", "1"):
+                for _ in range(sat_num):
+                    next(lines, None)
+                continue
+            # The receiver clock offset (next line) is not used.
+            next(lines, None)
+
+            date = (year, month, day, hour, minute, second)
+            satellites, observations = [], []
+            for isat in range(sat_num):
+                # Replace blank space by 0 (e.g. "G 2" -> "G02"). The default system is GPS.
+                satellite = epoch[sat_column + isat * 3:sat_column + (isat + 1) * 3].replace(" ", "0")
+                satellite = "G" + satellite[1:] if satellite[0] == "0" else satellite
+                fields = fields_dict[satellite[0]]
+                satellites.append(satellite)
+                observations.append(self._read_obs(satellite, next(lines, ""), len(fields)))
+            yield date, satellites, observations
+
+    def _read_data(self, epochs, fields_dict):
+        """Create an ``ObservationDataFrame`` from decompressed epochs.
+
+        Args:
+            epochs (iterable): Decompressed epochs, see :meth:`_decode_epochs`.
+            fields_dict (dict): Name of the fields / observations per system.
+
+        Returns:
+            ObservationDataFrame
+        """
+        records = defaultdict(lambda: defaultdict(list))
+        dates = []
+        for date, satellites, observations in epochs:
+            for satellite, data in zip(satellites, observations):
+                record = records[satellite[0]]
+                record["Epoch"].append(len(dates))
+                record["PRN"].append(int(satellite[1:3]))
+                record["Data"].append(data)
+            dates.append(date)
+        # The dates are decoded once per epoch.
+        dates = to_datetime64(*np.array(dates, dtype=np.float64).reshape(-1, 6).T)
+
+        # Create the DataFrame
+        df_data = []
+        for system, record in records.items():
+            df_system = pd.DataFrame(record["Data"], columns=fields_dict[system], dtype=float)
+            df_system["Date"] = dates[record["Epoch"]]
+            df_system["System"] = system
+            df_system["PRN"] = record["PRN"]
+            df_data.append(df_system)
+        df_data = df_data or [pd.DataFrame(columns=["Date", "System", "PRN"])]
+        df = ObservationDataFrame(pd.concat(df_data, ignore_index=True, sort=False))
+        df["Session"] = df.groupby(["System", "PRN"]).cumcount() + 1
+        # Make it pretty
+        df = df.set_index(["System", "PRN", "Date"])
+        columns = sorted([col for col in df.columns])
+        df = df.reindex(columns, axis=1)
+        df = df.sort_index()
+        return df
+
+    def _track_epochs(self, lines, fields_dict, progress):
+        """Decompress the epochs with :meth:`_decode_epochs`, and update the progress with the lines consumed."""
+        position = self._cursor
+
+        def count(lines):
+            nonlocal position
+            for position, line in enumerate(lines, self._cursor + 1):
+                yield line
+
+        progress.update(position)
+        for epoch in self._decode_epochs(count(lines), fields_dict):
+            progress.update(position)
+            yield epoch
+
+    @metrics.measure("rinex.crx")
+    def read(self, progress=None, cancel=None, progress_interval=0.1):
+        """Read the observations.
+
+        Args:
+            progress (callable, optional): Function called with the number of lines read and the total number of lines,
+                as ``progress(done, total)``. Defaults to ``None``.
+            cancel (CancellationToken, optional): Token stopping the reading, with a ``ReadCancelled`` error.
+                Defaults to ``None``.
+            progress_interval (float, optional): Minimum duration between two calls of ``progress``, in seconds.
+                Defaults to ``0.1``.
+
+        Returns:
+            ObservationDataFrame
+        """
+        tracker = Progress(len(self.lines), progress, cancel, progress_interval)
+        fields_dict = self._read_header()
+        self._cursor += 1
+        lines = itertools.islice(iter(self.lines), self._cursor, None)
+        if tracker.enabled:
+            epochs = self._track_epochs(lines, fields_dict, tracker)
+        else:
+            epochs = self._decode_epochs(lines, fields_dict)
+        df = self._read_data(epochs, fields_dict)
+        tracker.finish()
+        self._report("rinex.crx", df)
+        return df
+
+    @classmethod
+    def iter_epochs(cls, filename, batch_size=3600):
+        """Read a Compact `RINEX` file lazily, by batches of epochs.
+        Only the lines of the current batch are kept in memory.
+
+        Args:
+            filename (str): Path to the file to open.
+            batch_size (int, optional): Number of epochs per batch. Defaults to ``3600``.
+
+        Yields:
+            ObservationDataFrame
+
+        Examples:
+            >>> for df in CRXReader.iter_epochs("ENSG00FRA_R_20182850000_01D_01S_MO.crx", batch_size=60):
+            ...     print(df.shape)
+        """
+        lines = cls._iter_lines(filename)
+        reader = cls(cls._take_header(lines))
+        header = RinexHeaderReader(reader.lines).read()
+        fields_dict = reader._read_header()
+
+        sessions = defaultdict(int)
+        epochs = reader._decode_epochs(lines, fields_dict)
+        while True:
+            batch = list(itertools.islice(epochs, batch_size))
+            if len(batch) == 0:
+                break
+            df = reader._continue_sessions(reader._read_data(batch, fields_dict), sessions)
+            df.attrs = header
+            yield df
@@ -16,60 +16,208 @@ from gnsstools.gnsstime import to_gnsstime
 from gnsstools.utils import camel2snake
 
 
+SATELLITES = {
+    "G": GPS,
+    "R": GLONASS,
+    "E": GALILEO
+}
+
+# Name of the satellites' arguments that are not the snake case of the column.
+ARGUMENTS = {
+    "IODnav": "iod_nav",
+    "BGDe5a": "bgd_e5a",
+    "BGDe5b": "bgd_e5b"
+}
+
+
+class EphemerisIndex(object):
+    r"""
+    Lookup table of the navigation messages, per satellite and sorted by date.
+    It is built once from a ``NavigationDataFrame``, so that :meth:`NavigationDataFrame.select`
+    finds the closest message with a binary search.
+
+    * :attr:`index` (pandas.MultiIndex): Index of the DataFrame the table was built from.
+
+    * :attr:`columns` (pandas.Index): Columns of the DataFrame the table was built from.
+
+    * :attr:`groups` (dict): Position of the messages (sorted by date) and their dates (as ``int64`` nanoseconds),
+        per ``(system, prn)`` and per ``system``.
+
+    * :attr:`values` (numpy.ndarray): Values of the DataFrame, as ``float64``.
+
+    * :attr:`arguments` (list): Name of the satellites' arguments, for each column.
+
+    * :attr:`satellites` (dict): Satellites already created, per position.
+
+    """
+
+    def __init__(self, df):
+        super().__init__()
+        self.index = df.index
+        self.columns = df.columns
+        self.values = df.to_numpy(dtype=np.float64)
+        self.arguments = [ARGUMENTS.get(column, None) or camel2snake(column) for column in self.columns]
+        self.satellites = {}
+
+        dates = df.index.get_level_values("Date").values.astype("datetime64[ns]").astype(np.int64)
+        self.groups = {}
+        for key, positions in df.groupby(level=["System", "PRN"]).indices.items():
+            positions = positions[np.argsort(dates[positions], kind="stable")]
+            self.groups[key] = (positions, dates[positions])
+        for system, positions in df.groupby(level="System").indices.items():
+            positions = positions[np.argsort(dates[positions], kind="stable")]
+            self.groups[system] = (positions, dates[positions])
+
+    def nearest(self, key, dates):
+        """Find the closest messages to some dates.
+
+        Args:
+            key (tuple or str): Satellite ``(system, prn)``, or only the ``system``.
+            dates (numpy.ndarray): Dates, as ``int64`` nanoseconds.
+
+        Returns:
+            tuple: The position of the messages, and their offset to the dates (in seconds).
+        """
+        positions, times = self.groups[key]
+        after = np.minimum(np.searchsorted(times, dates), len(times) - 1)
+        before = np.maximum(after - 1, 0)
+        # On a tie, the earliest message is used.
+        closest = np.where(np.abs(dates - times[before]) <= np.abs(times[after] - dates), before, after)
+        return positions[closest], np.abs(dates - times[closest]) / 1e9
+
+    def satellite(self, position):
+        """Create the satellite of a navigation message.
+        The satellites are cached, and a copy is returned: modifying it does not change the cache.
+
+        Args:
+            position (int): Position of the message in the DataFrame.
+
+        Returns:
+            Satellite
+        """
+        satellite = self.satellites.get(position, None)
+        if satellite is None:
+            system, prn, date = self.index[position]
+            arguments = {"prn": int(prn), "toc": to_gnsstime(date)}
+            for argument, value in zip(self.arguments, self.values[position]):
+                if not np.isnan(value):
+                    arguments[argument] = value
+            satellite = SATELLITES[system](**arguments) if system in SATELLITES else None
+            self.satellites[position] = satellite
+        return None if satellite is None else satellite.copy()
+
+
 class NavigationDataFrame(pd.DataFrame):
 
     @property
     def _constructor(self):
         return NavigationDataFrame
 
+    @property
+    def ephemerides(self):
+        """Lookup table of the navigation messages, built on first access and rebuilt when the index changes.
+
+        Returns:
+            EphemerisIndex
+        """
+        ephemerides = self.__dict__.get("_ephemerides", None)
+        if ephemerides is None or ephemerides.index is not self.index or ephemerides.columns is not self.columns:
+            ephemerides = EphemerisIndex(self)
+            object.__setattr__(self, "_ephemerides", ephemerides)
+        return ephemerides
+
     def select(self, system=None, prn=None, date=None, ignore_offset=False):
+        """Select the navigation message of a satellite, the closest to a date.
+
+        .. note::
+            The satellites are cached, and each call returns a copy that can be modified freely.
+            If the values of the DataFrame are modified inplace, select from a copy (``df.copy()``)
+            to rebuild the cache.
+
+        Args:
+            system (str): System of the satellite (e.g. ``"G"``).
+            prn (int, optional): PRN of the satellite. If ``None``, the closest message of the system is used.
+            date (datetime): Date of the message.
+            ignore_offset (bool, optional): If ``True``, do not check that the message is less than 2 hours away
+                from the date. Defaults to ``False``.
+
+        Returns:
+            Satellite
+
+        Examples:
+            >>> df.select("G", 2, gnsstime(2018, 10, 12, 0, 40, 15))
+        """
+        ephemerides = self.ephemerides
 
         # Make sure the arguments are available.
-        systems = np.unique(self.index.get_level_values('System'))
-        prns = np.unique(self.index.get_level_values('PRN'))
-        assert system in systems, f"The provided system {system} was not found in the dataset. " \
-                                  f"Available systems are {', '.join(systems)}."
-        assert prn in prns, f"The provided PRN {prn} was not found in the dataset. " \
-                            f"Available PRNs are {', '.join(prns.astype('str'))}."
-
-        # Search for subsets in the dataframe (if valid arguments are provided).
-        if prn is None:
-            sub_df = self.loc[system]
-        else:
-            sub_df = self.loc[system, prn]
+        key = system if prn is None else (system, prn)
+        if key not in ephemerides.groups:
+            systems = np.unique([key_ for key_ in ephemerides.groups if isinstance(key_, str)])
+            assert system in systems, f"The provided system {system} was not found in the dataset. " \
+                                      f"Available systems are {', '.join(systems)}."
+            prns = np.unique([key_[1] for key_ in ephemerides.groups if isinstance(key_, tuple) and key_[0] == system])
+            assert False, f"The provided PRN {prn} was not found in the dataset. " \
+                          f"Available PRNs are {', '.join(prns.astype('str'))}."
 
         # Find the closest time to the provided `date`.
-        deltas = []
-        for date_ in sub_df.index.get_level_values('Date'):
-            date_ = to_gnsstime(date_)
-            deltas.append(np.abs((date - date_).total_seconds()))
-        offset = np.min(deltas)
-        # Find the indexes of the sub dataframe
-        if system is not None and prn is None:
-            prn, date = sub_df.index[np.argmin(deltas)]
-        elif system is not None and prn is not None:
-            date = sub_df.index[np.argmin(deltas)]
+        dates = np.array([np.datetime64(date.replace(tzinfo=None), "ns")]).astype(np.int64)
+        positions, offsets = ephemerides.nearest(key, dates)
+        position, offset = positions[0], offsets[0]
         # The time coverage should be lower than 2 hours.
-        if not ignore_offset:
+        if not ignore_offset and offset / 3600 >= 2:
+            _, prn, date = self.index[position]
             assert offset / 3600 < 2, f"The provided date does not overlap with dates from {system}{prn} satellite. " \
                                       f"There must be a time delta of 2h at least. " \
                                       f"Got a time delta of {offset / 3600:.2f} hours. " \
                                       f"The closest date is {date}. You can ignore this behavior with `ignore_offset=True`."
-        # Get the row and drop NaNs
-        data = self.loc[system, prn, date].squeeze()
-        data = data.dropna()
-        arguments = {"prn": int(prn), "toc": to_gnsstime(date)}
-        for arg, value in zip(data.index, data.values):
-            arguments[camel2snake(arg)] = value
 
         # Create a satellite instance.
-        if system == "G":
-            return GPS(**arguments)
-        elif system == "R":
-            return GLONASS(**arguments)
-        elif system == "E":
-            return GALILEO(**arguments)
-        return None
+        return ephemerides.satellite(position)
+
+    def select_many(self, systems, prns, times, max_offset=7200):
+        """Select the navigation messages of many satellites at once, the closest to their dates.
+        Unlike :meth:`select`, no satellite is created: the parameters are returned as arrays.
+
+        Args:
+            systems (str or list): System of each query (e.g. ``"G"``), or one system for all.
+            prns (int or list): PRN of each query.
+            times (list): Date of each query (``datetime``, ``numpy.datetime64`` etc.).
+            max_offset (float, optional): Maximum time delta between a query and its message, in seconds.
+                If ``None``, the closest message is always valid. Defaults to ``7200`` (2 hours).
+
+        Returns:
+            dict: Arrays aligned with the queries. There is one array per parameter, named like the satellites'
+                arguments (e.g. ``"sqrt_a"``), plus ``"system"``, ``"prn"``, ``"toc"`` (date of the message),
+                ``"offset"`` (in seconds) and ``"valid"``. The parameters of invalid queries are set to ``NaN``.
+
+        Examples:
+            >>> ephemerides = df.select_many("G", [2, 3, 5], [date, date, date])
+            >>> ephemerides["sqrt_a"][ephemerides["valid"]]
+        """
+        ephemerides = self.ephemerides
+        times = pd.to_datetime(np.atleast_1d(times)).values.astype("datetime64[ns]")
+        systems, prns, times = np.broadcast_arrays(np.asarray(systems), np.asarray(prns), times)
+        dates = times.astype(np.int64)
+
+        positions = np.zeros(len(dates), dtype=np.int64)
+        offsets = np.full(len(dates), np.inf)
+        # The queries are grouped per satellite, each group being searched at once.
+        groups = pd.Series(np.arange(len(dates))).groupby([systems, prns]).indices
+        for key, indexes in groups.items():
+            if key in ephemerides.groups:
+                positions[indexes], offsets[indexes] = ephemerides.nearest(key, dates[indexes])
+        valid = np.isfinite(offsets)
+        if max_offset is not None:
+            valid &= offsets < max_offset
+
+        values = ephemerides.values[positions]
+        values[~valid] = np.nan
+        toc = self.index.get_level_values("Date").values[positions].astype("datetime64[ns]")
+        toc[~valid] = np.datetime64("NaT")
+        data = {"system": systems, "prn": prns, "toc": toc, "offset": offsets, "valid": valid}
+        for i, argument in enumerate(ephemerides.arguments):
+            data[argument] = values[:, i]
+        return data
 
 
 class ObservationDataFrame(pd.DataFrame):
@@ -83,10 +231,34 @@ class ObservationDataFrame(pd.DataFrame):
 
 
 class PositionDataFrame(pd.DataFrame):
+    r"""
+    Positions, velocities and clocks of the satellites (e.g. from a ``SP3`` file), as numeric columns:
+    ``X``, ``Y``, ``Z`` (and ``VX``, ``VY``, ``VZ`` if the velocities are provided) and ``Clock``.
+    """
 
     @property
     def _constructor(self):
         return PositionDataFrame
 
+    def points(self, velocity=False):
+        r"""Convert the positions (or velocities) to ``shapely`` points, for the ones who need geometries.
+
+        Args:
+            velocity (bool, optional): If ``True``, convert the velocities instead of the positions. Defaults to ``False``.
+
+        Returns:
+            pandas.Series: Points with the same index as the DataFrame, ``None`` if the record is missing.
+
+        Examples:
+            >>> df = rinex.load("COM20225_15M.SP3")
+            >>> points = df.points()
+        """
+        from shapely.geometry import Point
+
+        columns = ["VX", "VY", "VZ"] if velocity else ["X", "Y", "Z"]
+        values = self[columns].to_numpy(dtype=np.float64)
+        points = [None if np.any(np.isnan(value)) else Point(value) for value in values]
+        return pd.Series(points, index=self.index, dtype=object)
+
     def select(self):
         raise NotImplementedError
@@ -66,7 +66,6 @@ class RinexHeaderReader(ABCReader):
                 data["SystemName"] = name
             # For Rinex2 support
             elif name in dtype_string:
-                print(dtype_string, system, name)
                 data["System"] = system
                 data["SystemName"] = name
         # If nothing was found
@@ -96,6 +95,11 @@ class RinexHeaderReader(ABCReader):
             elif category == "PGM / RUN BY / DATE":
                 data = self._read_pgm(line)
                 header.update(data)
+            elif category == "MARKER NAME":
+                header["MarkerName"] = self._eval(line[:60])
+            # Compact RINEX (Hatanaka) files
+            elif category == "CRINEX VERS   / TYPE":
+                header["CompactVersion"] = self._eval(line[:20])
 
             self._cursor += 1
         return header
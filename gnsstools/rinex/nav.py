@@ -13,14 +13,13 @@ It was only tested with `RINEX` version 2.10 and 3.03, but should works for any
 
 
 # Basic imports
-import re
-from collections import defaultdict
-import pandas as pd
+import numpy as np
 
 # gnsstime
-from .reader import ABCReader
-from .datasets import NavigationDataFrame
-from gnsstools import gnsstime
+from .reader import ABCReader, CHUNK_SIZE
+from .progress import Progress
+from gnsstools import metrics
+from gnsstools.gnsstime import to_datetime64
 
 
 __all__ = [
@@ -28,6 +27,126 @@ __all__ = [
 ]
 
 
+# Layout of the navigation messages, as ``(name, row, start, end)`` columns of `RINEX3` files.
+# `RINEX2` messages are shifted by one column to the left.
+GPS_FIELDS = [
+    # First row
+    ("SVClockBias", 0, 23, 42),
+    ("SVClockDrift", 0, 42, 61),
+    ("SVClockDriftRate", 0, 61, 80),
+    # Second row
+    ("IODE", 1, 4, 23),
+    ("Crs", 1, 23, 42),
+    ("DeltaN", 1, 42, 61),
+    ("M0", 1, 61, 80),
+    # Third row
+    ("Cuc", 2, 4, 23),
+    ("e", 2, 23, 42),
+    ("Cus", 2, 42, 61),
+    ("sqrtA", 2, 61, 80),
+    # Fourth row
+    ("TOE", 3, 4, 23),
+    ("Cic", 3, 23, 42),
+    ("Omega0", 3, 42, 61),
+    ("Cis", 3, 61, 80),
+    # Fifth row
+    ("i0", 4, 4, 23),
+    ("Crc", 4, 23, 42),
+    ("Omega", 4, 42, 61),
+    ("OmegaDot", 4, 61, 80),
+    # Sixth row
+    ("IDOT", 5, 4, 23),
+    ("L2Codes", 5, 23, 42),
+    ("GPSWeek", 5, 42, 61),
+    ("L2Pflag", 5, 61, 80),
+    # Seventh row
+    ("SVAcc", 6, 4, 23),
+    ("SVHealth", 6, 23, 42),
+    ("TGD", 6, 42, 61),
+    ("IODC", 6, 61, 80),
+    # Eight row
+    ("TransTime", 7, 4, 23),
+    ("FitInter", 7, 23, 42),
+]
+
+
+GLONASS_FIELDS = [
+    # First row
+    ("SVClockBias", 0, 23, 42),
+    ("SVRelFreqBias", 0, 42, 61),
+    ("MessageFrameTime", 0, 61, 80),
+    # Second row
+    ("X", 1, 4, 23),
+    ("dX", 1, 23, 42),
+    ("dX2", 1, 42, 61),
+    ("Health", 1, 61, 80),
+    # Third row
+    ("Y", 2, 4, 23),
+    ("dY", 2, 23, 42),
+    ("dY2", 2, 42, 61),
+    ("FreqNum", 2, 61, 80),
+    # Fourth row
+    ("Z", 3, 4, 23),
+    ("dZ", 3, 23, 42),
+    ("dZ2", 3, 42, 61),
+    ("AgeOpInfo", 3, 61, 80),
+]
+
+
+GALILEO_FIELDS = [
+    # First row
+    ("SVClockBias", 0, 23, 42),
+    ("SVClockDrift", 0, 42, 61),
+    ("SVClockDriftRate", 0, 61, 80),
+    # Second row
+    ("IODnav", 1, 4, 23),
+    ("Crs", 1, 23, 42),
+    ("DeltaN", 1, 42, 61),
+    ("M0", 1, 61, 80),
+    # Third row
+    ("Cuc", 2, 4, 23),
+    ("e", 2, 23, 42),
+    ("Cus", 2, 42, 61),
+    ("sqrtA", 2, 61, 80),
+    # Fourth row
+    ("TOE", 3, 4, 23),
+    ("Cic", 3, 23, 42),
+    ("Omega0", 3, 42, 61),
+    ("Cis", 3, 61, 80),
+    # Fifth row
+    ("i0", 4, 4, 23),
+    ("Crc", 4, 23, 42),
+    ("Omega", 4, 42, 61),
+    ("OmegaDot", 4, 61, 80),
+    # Sixth row
+    ("IDOT", 5, 4, 23),
+    ("GPSWeek", 5, 23, 42),
+    ("GALWeek", 5, 42, 61),
+    # Seventh row
+    ("SISA", 6, 4, 23),
+    ("SVHealth", 6, 23, 42),
+    ("BGDe5a", 6, 42, 61),
+    ("BGDe5b", 6, 61, 80),
+    # Eight row
+    ("TransTime", 7, 4, 23),
+]
+
+
+# Number of rows and layout of a navigation message, per system.
+NAV_FIELDS = {
+    "G": (8, GPS_FIELDS),
+    "R": (4, GLONASS_FIELDS),
+    "E": (8, GALILEO_FIELDS)
+}
+
+
+# Columns of the PRN and epoch (year, month, day, hour, minute, second), per `RINEX` version.
+EPOCH_FIELDS = {
+    2: [(0, 0, 2), (0, 2, 5), (0, 5, 8), (0, 8, 11), (0, 11, 14), (0, 14, 17), (0, 17, 22)],
+    3: [(0, 1, 3), (0, 4, 8), (0, 9, 11), (0, 12, 14), (0, 15, 17), (0, 18, 20), (0, 21, 23)]
+}
+
+
 # TODO: Separate Rinex3 and Rinex2 navigation reader (not much to change: only `read` method for prn.)
 class RinexNavReader(ABCReader):
     """
@@ -41,189 +160,138 @@ class RinexNavReader(ABCReader):
         super().__init__(lines)
         self.system = system
 
-    def _extract_g_fields(self):
-        lines = self.lines[self._cursor:self._cursor+8]
-        self._cursor += 8
-        return {
-            # First row
-            "SVClockBias": self._eval(lines[0][23:42]),
-            "SVClockDrift": self._eval(lines[0][42:61]),
-            "SVClockDriftRate": self._eval(lines[0][61:80]),
-            # Second row
-            "IODE": self._eval(lines[1][4:23]),
-            "Crs": self._eval(lines[1][23:42]),
-            "DeltaN": self._eval(lines[1][42:61]),
-            "M0": self._eval(lines[1][61:80]),
-            # Third row
-            "Cuc": self._eval(lines[2][4:23]),
-            "e": self._eval(lines[2][23:42]),
-            "Cus": self._eval(lines[2][42:61]),
-            "sqrtA": self._eval(lines[2][61:80]),
-            # Fourth row
-            "TOE": self._eval(lines[3][4:23]),
-            "Cic": self._eval(lines[3][23:42]),
-            "Omega0": self._eval(lines[3][42:61]),
-            "Cis": self._eval(lines[3][61:80]),
-            # Fifth row
-            "i0": self._eval(lines[4][4:23]),
-            "Crc": self._eval(lines[4][23:42]),
-            "Omega": self._eval(lines[4][42:61]),
-            "OmegaDot": self._eval(lines[4][61:80]),
-            # Sixth row
-            "IDOT": self._eval(lines[5][4:23]),
-            "L2Codes": self._eval(lines[5][23:42]),
-            "GPSWeek": self._eval(lines[5][42:61]),
-            "L2Pflag": self._eval(lines[5][61:80]),
-            # Seventh row
-            "SVAcc": self._eval(lines[6][4:23]),
-            "SVHealth": self._eval(lines[6][23:42]),
-            "TGD": self._eval(lines[6][42:61]),
-            "IODC": self._eval(lines[6][61:80]),
-            # Eight row
-            "TransTime": self._eval(lines[7][4:23]),
-            "FitInter": self._eval(lines[7][23:42]),
-        }
-
-    def _extract_r_fields(self):
-        lines = self.lines[self._cursor:self._cursor+4]
-        self._cursor += 4
-        return {
-            # First row
-            "SVClockBias": self._eval(lines[0][23:42]),
-            "SVRelFreqBias": self._eval(lines[0][42:61]),
-            "MessageFrameTime": self._eval(lines[0][61:80]),
-            # Second row
-            "X": self._eval(lines[1][4:23]),
-            "dX": self._eval(lines[1][23:42]),
-            "dX2": self._eval(lines[1][42:61]),
-            "Health": self._eval(lines[1][61:80]),
-            # Third row
-            "Y": self._eval(lines[2][4:23]),
-            "dY": self._eval(lines[2][23:42]),
-            "dY2": self._eval(lines[2][42:61]),
-            "FreqNum": self._eval(lines[2][61:80]),
-            # Fourth row
-            "Z": self._eval(lines[3][4:23]),
-            "dZ": self._eval(lines[3][23:42]),
-            "dZ2": self._eval(lines[3][42:61]),
-            "AgeOpInfo": self._eval(lines[3][61:80]),
-        }
-
-    def _extract_e_fields(self):
-        lines = self.lines[self._cursor:self._cursor+8]
-        self._cursor += 8
-        return {
-            # First row
-            "SVClockBias": self._eval(lines[0][23:42]),
-            "SVClockDrift": self._eval(lines[0][42:61]),
-            "SVClockDriftRate": self._eval(lines[0][61:80]),
-            # Second row
-            "IODnav": self._eval(lines[1][4:23]),
-            "Crs": self._eval(lines[1][23:42]),
-            "DeltaN": self._eval(lines[1][42:61]),
-            "M0": self._eval(lines[1][61:80]),
-            # Third row
-            "Cuc": self._eval(lines[2][4:23]),
-            "e": self._eval(lines[2][23:42]),
-            "Cus": self._eval(lines[2][42:61]),
-            "sqrtA": self._eval(lines[2][61:80]),
-            # Fourth row
-            "TOE": self._eval(lines[3][4:23]),
-            "Cic": self._eval(lines[3][23:42]),
-            "Omega0": self._eval(lines[3][42:61]),
-            "Cis": self._eval(lines[3][61:80]),
-            # Fifth row
-            "i0": self._eval(lines[4][4:23]),
-            "Crc": self._eval(lines[4][23:42]),
-            "Omega": self._eval(lines[4][42:61]),
-            "OmegaDot": self._eval(lines[4][61:80]),
-            # Sixth row
-            "IDOT": self._eval(lines[5][4:23]),
-            "GPSWeek": self._eval(lines[5][23:42]),
-            "GALWeek": self._eval(lines[5][42:61]),
-            # Seventh row
-            "SISA": self._eval(lines[6][4:23]),
-            "SVHealth": self._eval(lines[6][23:42]),
-            "BGDe5a": self._eval(lines[6][42:61]),
-            "BGDe5b": self._eval(lines[6][61:80]),
-            # Eight row
-            "TransTime": self._eval(lines[7][4:23]),
-        }
-
-    def read(self):
+    def _read_records(self, starts, system, version):
+        """Decode all the navigation messages of a system at once.
+
+        Args:
+            starts (list): Index of the first line of each message.
+            system (str): System of the messages (e.g. ``"G"``).
+            version (int): Major `RINEX` version of the messages (``2`` or ``3``).
+
+        Returns:
+            tuple: The ``system``, the PRNs, the dates and the values of the fields of the messages.
+        """
+        nrows, fields = NAV_FIELDS[system]
+        shift = 1 if version == 2 else 0
+        spans = [(row, start - shift, end - shift) for _, row, start, end in fields]
+        values = self._decode(starts, nrows, spans + EPOCH_FIELDS[version])
+
+        prns, years, months, days, hours, minutes, seconds = values[:, len(fields):].T
+        dates = to_datetime64(years, months, days, hours, minutes, seconds)
+        return system, prns.astype(int), dates, values[:, :len(fields)]
+
+    @staticmethod
+    def _to_dataframe(blocks):
+        """Gather the records of all the systems in one DataFrame, indexed by ``System``, ``PRN`` and ``Date``.
+        The fields of the other systems are set to ``NaN``.
+
+        Args:
+            blocks (list): Records of a system, as returned by :meth:`_read_records`.
+
+        Returns:
+            NavigationDataFrame
+        """
+        import pandas as pd
+        from .datasets import NavigationDataFrame
+
+        if len(blocks) == 0:
+            index = pd.MultiIndex.from_arrays([[], [], []], names=["System", "PRN", "Date"])
+            return NavigationDataFrame(index=index, columns=pd.Index([], dtype=str))
+        columns = sorted({name for system, _, _, _ in blocks for name, _, _, _ in NAV_FIELDS[system][1]})
+        positions = {name: position for position, name in enumerate(columns)}
+        systems = np.concatenate([np.full(len(prns), system) for system, prns, _, _ in blocks])
+        prns = np.concatenate([prns for _, prns, _, _ in blocks])
+        dates = np.concatenate([dates for _, _, dates, _ in blocks])
+
+        # The values are written once in a single matrix, in the order of the index.
+        values = np.full((len(prns), len(columns)), np.nan)
+        start = 0
+        for system, _, _, block in blocks:
+            indexes = [positions[name] for name, _, _, _ in NAV_FIELDS[system][1]]
+            values[start:start + len(block), indexes] = block
+            start += len(block)
+        # Stable sort, with the missing dates last (like ``sort_index``).
+        order = np.lexsort((dates, np.isnat(dates), prns, systems))
+        index = pd.MultiIndex.from_arrays([systems[order].astype(object), prns[order], dates[order]],
+                                          names=["System", "PRN", "Date"])
+        return NavigationDataFrame(values[order], index=index, columns=columns)
+
+    def _read_chunks(self, records, progress, chunk_size=None):
+        """Read the navigation messages by chunks of about ``chunk_size`` lines, to report the progress.
+
+        Args:
+            records (dict): Index of the first line of the messages, per system and version.
+            progress (Progress): Progress of the reading.
+            chunk_size (int, optional): Number of lines per chunk (rounded to whole messages).
+                Defaults to ``None`` (``CHUNK_SIZE``).
+
+        Returns:
+            list: The records of each chunk, see :meth:`_read_records`.
+        """
+        blocks = []
+        done = self._cursor
+        progress.update(done)
+        for (system, version), starts in records.items():
+            nrows = NAV_FIELDS[system][0]
+            size = max((chunk_size or CHUNK_SIZE) // nrows, 1)
+            for start in range(0, len(starts), size):
+                chunk = starts[start:start + size]
+                blocks.append(self._read_records(chunk, system, version))
+                done += len(chunk) * nrows
+                progress.update(done)
+        return blocks
+
+    @metrics.measure("rinex.nav")
+    def read(self, progress=None, cancel=None, progress_interval=0.1, chunk_size=None):
         """Read all the lines from a `RINEX` file and return a ``pandas.DataFrame``.
         The indexes are based on the ``satellite`` id.
         The number of row corresponds to the number of records (i.e. navigation elements).
 
+        Args:
+            progress (callable, optional): Function called with the number of lines read and the total number of lines,
+                as ``progress(done, total)``. Defaults to ``None``.
+            cancel (CancellationToken, optional): Token stopping the reading, with a ``ReadCancelled`` error.
+                Defaults to ``None``.
+            progress_interval (float, optional): Minimum duration between two calls of ``progress``, in seconds.
+                Defaults to ``0.1``.
+            chunk_size (int, optional): Number of lines read between two updates of the progress (and checks of
+                the cancellation). Only used with ``progress`` or ``cancel``. Defaults to ``None`` (10 000 lines).
+
         Returns:
             pandas.DataFrame
         """
-        # Construct a DataFrame
+        tracker = Progress(len(self.lines), progress, cancel, progress_interval)
         self._cursor = 0
-        satellites = defaultdict(list)
 
         # Skip the header
         self._skip_header()
         self._cursor += 1
 
-        while self._cursor < len(self.lines):
-            line = self.lines[self._cursor]
-            print(f"\r{self._cursor}", end="")
-
-            # If the line is blank
-            if line.strip() == "":
-                self._cursor += 1
-                continue
-
-            # Find the associated satellite system
-            # Create the satellite name (e.g. " 03" - > "G03", "G 2" -> "G02")
-            if line[0] == " " or line[0].isdigit():
-                system_ = self.system or "G"
-                prn = self._eval(line[:3])
-                satellite = f"{system_}{prn}"
-            else:
-                system_ = line[0]
-                prn = self._eval(line[1:3])
-                satellite = f"{system_}{prn}"
-
-            # If the PRN was not found (unknown satellite or corrupted data)
-            if prn is None:
-                self._cursor += 1
-                continue
-
-            # Extract the data
-            if system_ == "E":
-                data = self._extract_e_fields()
-            elif system_ == "G":
-                data = self._extract_g_fields()
-            elif system_ == "R":
-                data = self._extract_r_fields()
-
-            # If the system is unknown, read the next line
-            else:
-                self._cursor += 1
-                continue
-
-            # From here we should have found a valid system (satellite with known PRN).
-            # Extract the date (year, month, day etc.), common for all systems.
-            # Remove redundant spaces and split on spaces (dates are separated by a space (or more...))
-            line_dates = re.sub("  +", " ", line[3:23].strip())
-            year, month, day, hour, minute, second = line_dates.split(" ")
-            data["Date"] = gnsstime(year, month, day, hour, minute, second)
-
-            # Count PRN and save the data
-            data["System"] = system_
-            data["PRN"] = prn
-            satellites[satellite].append(data)
+        # Locate the navigation messages from their first columns.
+        # RINEX2 messages start with the PRN (e.g. " 3"), RINEX3 with the satellite (e.g. "G03", "G 3").
+        # The continuation lines start with blank spaces.
+        indexes = np.arange(self._cursor, len(self.lines))
+        heads = self._gather(indexes, 3)
+        digits = (heads >= ord("0")) & (heads <= ord("9"))
+        blanks = heads == ord(" ")
+        rinex2 = (blanks[:, 0] | digits[:, 0]) & digits[:, 1]
+        rinex3 = ~rinex2 & ~blanks[:, 0] & (blanks[:, 1] | digits[:, 1]) & digits[:, 2]
+
+        # Messages from unknown systems are ignored. Their fields are decoded one system at a time.
+        records = {}
+        for system in NAV_FIELDS:
+            if system == (self.system or "G") and rinex2.any():
+                records[system, 2] = indexes[rinex2]
+            starts = indexes[rinex3 & (heads[:, 0] == ord(system))]
+            if len(starts) > 0:
+                records[system, 3] = starts
 
         # Create the DataFrame
-        df_data = []
-        for satellites, values in satellites.items():
-            df_data.extend(values)
-        df = NavigationDataFrame(df_data)
-        # Make it pretty
-        df = df.set_index(["System", "PRN", "Date"])
-        columns = sorted([col for col in df.columns])
-        df = df.reindex(columns, axis=1)
-        df = df.sort_index()
+        if tracker.enabled:
+            blocks = self._read_chunks(records, tracker, chunk_size=chunk_size)
+        else:
+            blocks = [self._read_records(starts, system, version) for (system, version), starts in records.items()]
+        df = self._to_dataframe(blocks)
+        tracker.finish()
+        self._report("rinex.nav", df)
         return df
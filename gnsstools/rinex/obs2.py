@@ -15,9 +15,11 @@ import pandas as pd
 
 # GNSS Tools
 from .reader import ABCReader
+from .header import RinexHeaderReader
 from .datasets import ObservationDataFrame
+from .progress import Progress
+from gnsstools import metrics
 from gnsstools.logger import logger
-from gnsstools import gnsstime
 
 
 class Rinex2ObsReader(ABCReader):
@@ -59,13 +61,8 @@ class Rinex2ObsReader(ABCReader):
     def _read_sat(self):
         satellites_name = []
         line = self.lines[self._cursor]
-        year, month, day = line[0:3], line[3:6], line[6:9]
-        hour, minute, second = line[9:12], line[12:15], line[15:26]
         sat_num = int(line[29:32])
 
-        # If the date is not valid, exit the function.
-        date = gnsstime(year, month, day, hour, minute, second)
-
         sat_row = math.ceil(sat_num / 12)
         while len(satellites_name) < sat_num:
             line = self.lines[self._cursor]
@@ -81,66 +78,137 @@ class Rinex2ObsReader(ABCReader):
                     satellites_name.append(satellite)
             self._cursor += 1
 
-        # Return the corresponding satellites at a specific date.
-        return date, satellites_name
+        # Return the corresponding satellites.
+        return satellites_name
 
-    def _read_obs(self, fields):
-        # There ara maximum 5 fields per row.
-        field_row = math.ceil(len(fields) / 5)
-        data = {field: np.nan for field in fields}
+    def _read_obs(self, starts, fields):
+        """Decode the observations of all the satellites at once.
 
-        # Read the row corresponding to the observations of one navigation element.
-        line = self.lines[self._cursor]
-        for irow in range(field_row):
-            # Maximum of five fields per row
-            for ifield in range(5):
-                # If the field exist (in case the  number of field / observation on the row < 5)
-                if irow * 5 + ifield < len(fields):
-                    # Extract the value for a specific field / observation.
-                    field = fields[irow * 5 + ifield]
-                    value = line[ifield * 16: (ifield + 1) * 16]
-                    # Replace blank space in the number by 0 (e.g. " 12223.444 42" -> " 12223.444042")
-                    value = re.sub(f"[0-9\-][\s][0-9\-]", lambda x: x.group(0).replace(" ", "0"), value)
-                    data[field] = self._eval(value)
-
-            # Read next line or exit.
-            self._cursor += 1
-            if self._cursor >= len(self.lines):
-                return data
-            line = self.lines[self._cursor]
+        Args:
+            starts (list): Index of the first line of each satellite's observations.
+            fields (list): Name of the fields / observations.
 
-        return data
+        Returns:
+            dict: Array of values per field.
+        """
+        # There ara maximum 5 fields per row, each one written as F14.3 followed by the LLI and signal strength.
+        field_row = math.ceil(len(fields) / 5)
+        spans = [(i // 5, (i % 5) * 16, (i % 5) * 16 + 14) for i in range(len(fields))]
+        values = self._decode(starts, field_row, spans)
+        return {field: values[:, i] for i, field in enumerate(fields)}
 
-    def read(self):
-        self._cursor = 0
-        fields = self._read_header()
-        self._cursor += 1
+    def _read_data(self, fields, progress=None):
+        """Read the epochs from the cursor to the end of the lines.
+
+        Args:
+            fields (list): Name of the fields / observations, see :meth:`_read_header`.
+            progress (Progress, optional): Progress updated (and cancellation checked) at each epoch.
+                Defaults to ``None``.
 
-        satellites = defaultdict(list)
+        Returns:
+            ObservationDataFrame
+        """
+        # There ara maximum 5 fields per row.
+        field_row = math.ceil(len(fields) / 5)
+        starts, epochs, systems, prns = [], [], [], []
 
+        # Locate the observations of each satellite, and their epoch. They are decoded afterward, all at once.
         while self._cursor < len(self.lines):
             if self.lines[self._cursor].strip() == "":
                 self._cursor += 1
                 continue
 
-            date, satellites_name = self._read_sat()
+            epoch = self._cursor
+            if progress is not None:
+                progress.update(epoch)
+            satellites_name = self._read_sat()
             for satellite in satellites_name:
-                data = self._read_obs(fields)
-                data["Date"] = date
-                system, prn = self._eval(satellite[0]), self._eval(satellite[1:3])
-                data["System"] = system
-                data["PRN"] = prn
-                data["Session"] = len(satellites[satellite]) + 1
-                satellites[satellite].append(data)
+                starts.append(self._cursor)
+                epochs.append(epoch)
+                systems.append(satellite[0])
+                prns.append(int(satellite[1:3]))
+                self._cursor += field_row
 
         # Create the DataFrame
-        df_data = []
-        for satellites, values in satellites.items():
-            df_data.extend(values)
-        df = ObservationDataFrame(df_data)
+        df = ObservationDataFrame(self._read_obs(starts, fields))
+        # The dates are decoded once per epoch.
+        epochs, positions = np.unique(np.array(epochs, dtype=np.int64), return_inverse=True)
+        dates = self._decode_dates(epochs, [(0, 3), (3, 6), (6, 9), (9, 12), (12, 15), (15, 26)])
+        df["Date"] = dates[positions]
+        df["System"] = systems
+        df["PRN"] = prns
+        df["Session"] = df.groupby(["System", "PRN"]).cumcount() + 1
         # Make it pretty
         df = df.set_index(["System", "PRN", "Date"])
         columns = sorted([col for col in df.columns])
         df = df.reindex(columns, axis=1)
         df = df.sort_index()
         return df
+
+    @metrics.measure("rinex.obs2")
+    def read(self, progress=None, cancel=None, progress_interval=0.1):
+        """Read the observations.
+
+        Args:
+            progress (callable, optional): Function called with the number of lines read and the total number of lines,
+                as ``progress(done, total)``. Defaults to ``None``.
+            cancel (CancellationToken, optional): Token stopping the reading, with a ``ReadCancelled`` error.
+                Defaults to ``None``.
+            progress_interval (float, optional): Minimum duration between two calls of ``progress``, in seconds.
+                Defaults to ``0.1``.
+
+        Returns:
+            ObservationDataFrame
+        """
+        tracker = Progress(len(self.lines), progress, cancel, progress_interval)
+        self._cursor = 0
+        fields = self._read_header()
+        self._cursor += 1
+        df = self._read_data(fields, progress=tracker if tracker.enabled else None)
+        tracker.finish()
+        self._report("rinex.obs2", df)
+        return df
+
+    @classmethod
+    def iter_epochs(cls, filename, batch_size=3600):
+        """Read a `RINEX2` observation file lazily, by batches of epochs.
+        Only the lines of the current batch are kept in memory.
+
+        Args:
+            filename (str): Path to the file to open.
+            batch_size (int, optional): Number of epochs per batch. Defaults to ``3600``.
+
+        Yields:
+            ObservationDataFrame
+
+        Examples:
+            >>> for df in Rinex2ObsReader.iter_epochs("edf1285b.18o", batch_size=60):
+            ...     print(df.shape)
+        """
+        lines = cls._iter_lines(filename)
+        reader = cls(cls._take_header(lines))
+        header = RinexHeaderReader(reader.lines).read()
+        fields = reader._read_header()
+        # There ara maximum 5 fields per row.
+        field_row = math.ceil(len(fields) / 5)
+
+        sessions = defaultdict(int)
+        batch, num_epochs = [], 0
+        # Number of lines left to read for the current epoch.
+        remaining = 0
+        for line in lines:
+            if remaining == 0:
+                if line.strip() == "":
+                    continue
+                if num_epochs == batch_size:
+                    yield reader._read_batch(batch, fields, sessions, header)
+                    batch, num_epochs = [], 0
+                num_epochs += 1
+                # The epoch is made of the satellites list (12 per row) and their observations.
+                sat_num = int(line[29:32])
+                remaining = math.ceil(sat_num / 12) + sat_num * field_row
+            batch.append(line)
+            remaining -= 1
+
+        if num_epochs > 0:
+            yield reader._read_batch(batch, fields, sessions, header)
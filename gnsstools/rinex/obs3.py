@@ -10,12 +10,15 @@
 from collections import defaultdict
 import re
 import math
+import numpy as np
 import pandas as pd
 
 # GNSS Tools
-from .reader import ABCReader
+from .reader import ABCReader, decode_columns
+from .header import RinexHeaderReader
 from .datasets import ObservationDataFrame
-from gnsstools import gnsstime
+from .progress import Progress
+from gnsstools import metrics
 
 
 class Rinex3ObsReader(ABCReader):
@@ -53,59 +56,141 @@ class Rinex3ObsReader(ABCReader):
                 line = self.lines[self._cursor]
         return fields_dict
 
-    def _read_obs(self, fields):
-        data = {}
-        line = self.lines[self._cursor]
-        for i, field in enumerate(fields):
-            value = line[4+i + 15*i: 4+i + 15*(i + 1)]
-            value = re.sub(f"[0-9][\s][0-9]", lambda x: x.group(0).replace(" ", "0"), value)
-            data[field] = self._eval(value)
-        return data
-
-    def read(self):
-        self._cursor = 0
-        fields_dict = self._read_header()
-        self._cursor += 1
-
-        satellites = defaultdict(list)
-
-        while self._cursor < len(self.lines):
-            line = self.lines[self._cursor]
-            if line.strip() == "":
-                self._cursor += 1
-                continue
-            elif line[0] == ">":
-                # Read the date
-                year, month, day, hour, minute, second = line[2:6], line[7:9], line[10:12], line[13:15], line[16:18], line[19:29]
-                date = gnsstime(year, month, day, hour, minute, second)
-                # Read the number associated to this date. Loop and extract their data.
-                sat_num = self._eval(line[33:35])
-                for _ in range(sat_num):
-                    self._cursor += 1
-                    line = self.lines[self._cursor]
-                    # Extract the data for one satellite.
-                    system, prn = self._eval(line[0]), self._eval(line[1:3])
-                    satellite = f"{system}{prn}"
-                    fields = fields_dict[system]
-                    data = self._read_obs(fields)
-                    data["Date"] = date
-                    data["System"] = system
-                    data["PRN"] = prn
-                    data["Session"] = len(satellites[satellite]) + 1
-                    # Save the data.
-                    satellites[satellite].append(data)
-
-            # Then, read next line (even if the line does not contain data)
-            self._cursor += 1
-
-        # Create the DataFrame
+    def _read_obs(self, starts, fields):
+        """Decode the observations of all the satellites of a system at once.
+
+        Args:
+            starts (list): Index of the line of each satellite's observations.
+            fields (list): Name of the fields / observations of the system.
+
+        Returns:
+            dict: Array of values per field.
+        """
+        # Each field is written as F14.3 followed by the LLI and signal strength, after the satellite id.
+        spans = [(0, 3 + 16 * i, 17 + 16 * i) for i in range(len(fields))]
+        values = self._decode(starts, 1, spans)
+        return {field: values[:, i] for i, field in enumerate(fields)}
+
+    def _read_data(self, fields_dict):
+        """Read the epochs from the cursor to the end of the lines.
+
+        Args:
+            fields_dict (dict): Name of the fields / observations per system, see :meth:`_read_header`.
+
+        Returns:
+            ObservationDataFrame
+        """
+        # Locate the epochs from the first column of the lines.
+        indexes = np.arange(self._cursor, len(self.lines))
+        epochs = indexes[self._gather(indexes, 1)[:, 0] == ord(">")]
+
+        # Only observations are read (flag 0: OK, 1: power failure). Events are skipped.
+        flags = self._gather(epochs, 32)[:, 31]
+        epochs = epochs[np.isin(flags, (ord(" "), ord("0"), ord("1")))]
+        self._cursor = len(self.lines)
+
+        # Read the dates, and the number of satellites associated to each date. Their data are on the next lines.
+        dates = self._decode_dates(epochs, [(2, 6), (7, 9), (10, 12), (13, 15), (16, 18), (19, 29)])
+        sat_nums = decode_columns(self._gather(epochs, 35), [(32, 35)])[:, 0].astype(np.int64)
+        offsets = np.arange(sat_nums.sum()) - np.repeat(np.cumsum(sat_nums) - sat_nums, sat_nums)
+        starts = np.repeat(epochs + 1, sat_nums) + offsets
+        dates = np.repeat(dates, sat_nums)
+
+        # Extract the satellite of each line (e.g. "G03", "G 3").
+        satellites = self._gather(starts, 3)
+        systems = satellites[:, 0]
+        prns = decode_columns(satellites, [(1, 3)])[:, 0]
+
+        # Create the DataFrame, decoding the observations one system at a time.
         df_data = []
-        for satellites, values in satellites.items():
-            df_data.extend(values)
-        df = ObservationDataFrame(df_data)
+        for system in np.unique(systems[~np.isnan(prns)]):
+            mask = (systems == system) & ~np.isnan(prns)
+            system = chr(system)
+            df_system = pd.DataFrame(self._read_obs(starts[mask], fields_dict[system]))
+            df_system["Date"] = dates[mask]
+            df_system["System"] = system
+            df_system["PRN"] = prns[mask].astype(int)
+            df_data.append(df_system)
+        df_data = df_data or [pd.DataFrame(columns=["Date", "System", "PRN"])]
+        df = ObservationDataFrame(pd.concat(df_data, ignore_index=True, sort=False))
+        df["Session"] = df.groupby(["System", "PRN"]).cumcount() + 1
         # Make it pretty
         df = df.set_index(["System", "PRN", "Date"])
         columns = sorted([col for col in df.columns])
         df = df.reindex(columns, axis=1)
         df = df.sort_index()
         return df
+
+    @metrics.measure("rinex.obs3")
+    def read(self, n_jobs=1, progress=None, cancel=None, progress_interval=0.1, chunk_size=None):
+        """Read the observations.
+
+        Args:
+            n_jobs (int, optional): Maximum number of processes. If greater than ``1``, a memory-mapped file is split
+                on its epochs and the chunks are read in parallel, with at most one process per CPU and per
+                8 MB of data. Defaults to ``1``.
+            progress (callable, optional): Function called with the number of lines read and the total number of lines,
+                as ``progress(done, total)``. Defaults to ``None``.
+            cancel (CancellationToken, optional): Token stopping the reading, with a ``ReadCancelled`` error.
+                Defaults to ``None``.
+            progress_interval (float, optional): Minimum duration between two calls of ``progress``, in seconds.
+                Defaults to ``0.1``.
+            chunk_size (int, optional): Number of lines read between two updates of the progress (and checks of
+                the cancellation). Only used with ``progress`` or ``cancel``. Defaults to ``None`` (10 000 lines).
+
+        Returns:
+            ObservationDataFrame
+        """
+        tracker = Progress(len(self.lines), progress, cancel, progress_interval)
+        n_jobs = self._num_jobs(n_jobs)
+        self._cursor = 0
+        fields_dict = self._read_header()
+        self._cursor += 1
+        if n_jobs > 1 or tracker.enabled:
+            # Epochs always start with ">".
+            indexes = np.arange(self._cursor, len(self.lines))
+            epochs = indexes[self._gather(indexes, 1)[:, 0] == ord(">")]
+            if n_jobs > 1:
+                df = self._read_parallel(epochs, n_jobs, fields_dict, progress=tracker)
+            else:
+                df = self._read_chunks(epochs, tracker, fields_dict, chunk_size=chunk_size)
+        else:
+            df = self._read_data(fields_dict)
+        tracker.finish()
+        self._report("rinex.obs3", df)
+        return df
+
+    @classmethod
+    def iter_epochs(cls, filename, batch_size=3600):
+        """Read a `RINEX3` observation file lazily, by batches of epochs.
+        Only the lines of the current batch are kept in memory.
+
+        Args:
+            filename (str): Path to the file to open.
+            batch_size (int, optional): Number of epochs per batch. Defaults to ``3600``.
+
+        Yields:
+            ObservationDataFrame
+
+        Examples:
+            >>> for df in Rinex3ObsReader.iter_epochs("ENSG00FRA_R_20182850000_01D_01S_MO.rnx", batch_size=60):
+            ...     print(df.shape)
+        """
+        lines = cls._iter_lines(filename)
+        reader = cls(cls._take_header(lines))
+        header = RinexHeaderReader(reader.lines).read()
+        fields_dict = reader._read_header()
+
+        sessions = defaultdict(int)
+        batch, num_epochs = [], 0
+        for line in lines:
+            # Epochs always start with ">".
+            if line.startswith(">"):
+                if num_epochs == batch_size:
+                    yield reader._read_batch(batch, fields_dict, sessions, header)
+                    batch, num_epochs = [], 0
+                num_epochs += 1
+            batch.append(line)
+
+        if num_epochs > 0:
+            yield reader._read_batch(batch, fields_dict, sessions, header)
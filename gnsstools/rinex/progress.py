@@ -0,0 +1,111 @@
+# Encoding: UTF-8
+# File: progress.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module handles the progress and cancellation of long readings.
+
+The readers report the number of lines read with a ``progress(done, total)`` callback, throttled to
+one call per interval (plus a last call at the end). A :class:`CancellationToken` can be cancelled from another
+thread (e.g. a request handler): the reader then stops at its next check and raises :class:`ReadCancelled`.
+"""
+
+
+# Basic imports
+import threading
+import time
+
+
+__all__ = [
+    "CancellationToken",
+    "ReadCancelled",
+    "Progress"
+]
+
+
+class ReadCancelled(Exception):
+    r"""Raised by a reader stopped with a :class:`CancellationToken`."""
+
+
+class CancellationToken(object):
+    r"""
+    Token used to stop a reading cleanly, e.g. from another thread.
+
+    * :attr:`cancelled` (bool): ``True`` once :meth:`cancel` has been called.
+
+    Examples:
+        >>> token = CancellationToken()
+        >>> threading.Timer(5, token.cancel).start()
+        >>> df = rinex.load("ENSG00FRA_R_20182850000_01D_01S_MO.rnx", cancel=token)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """Request the cancellation."""
+        self._event.set()
+
+    def check(self):
+        """Raise :class:`ReadCancelled` if the cancellation was requested."""
+        if self._event.is_set():
+            raise ReadCancelled("The reading was cancelled.")
+
+
+class Progress(object):
+    r"""
+    Progress of a reading: throttles the ``progress`` callback and checks the cancellation token.
+
+    * :attr:`total` (int): Total number of lines to read.
+
+    * :attr:`interval` (float): Minimum duration between two calls of the callback, in seconds.
+
+    Examples:
+        >>> progress = Progress(len(lines), callback=lambda done, total: print(f"{done}/{total}"), interval=0.5)
+        >>> for start in range(0, len(lines), 1000):
+        ...     ...
+        ...     progress.update(start + 1000)
+        >>> progress.finish()
+    """
+
+    def __init__(self, total, callback=None, cancel=None, interval=0.1):
+        super().__init__()
+        self.total = total
+        self.interval = interval
+        self._callback = callback
+        self._cancel = cancel
+        self._last = -float("inf")
+
+    @property
+    def enabled(self):
+        """``True`` if there is a callback or a cancellation token, i.e. if the reading should be split."""
+        return self._callback is not None or self._cancel is not None
+
+    def update(self, done):
+        """Report the number of lines read, and stop if the cancellation was requested.
+
+        Args:
+            done (int): Number of lines read so far.
+        """
+        if self._cancel is not None:
+            self._cancel.check()
+        if self._callback is None:
+            return
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self._callback(min(int(done), self.total), self.total)
+
+    def finish(self):
+        """Report the end of the reading, whatever the throttling."""
+        if self._callback is not None:
+            self._callback(self.total, self.total)
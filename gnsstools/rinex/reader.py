@@ -8,7 +8,145 @@
 
 # Basic imports
 from abc import ABC
+from collections import defaultdict
+import os
 import re
+import numpy as np
+
+# GNSS Tools
+from .buffer import LineBuffer
+from gnsstools import metrics
+from gnsstools.gnsstime import to_datetime64
+
+
+__all__ = [
+    "ABCReader",
+    "decode_fields"
+]
+
+
+# Default number of lines read at once, when a reading reports its progress or can be cancelled.
+# About 1 MB of lines, so the progress is updated (and the cancellation checked) a few times per second.
+CHUNK_SIZE = 10_000
+
+# Minimum number of bytes read per process, when a file is read in parallel.
+# Smaller chunks are read faster in the current process than sent to another one.
+PARALLEL_SIZE = 8_000_000
+
+# ASCII codes used while decoding fixed-width fields.
+_SPACE = ord(" ")
+# Translation table of the ASCII codes, replacing the Fortran ``D`` exponents by ``E``.
+_EXPONENTS = np.arange(256, dtype=np.uint8)
+_EXPONENTS[[ord("D"), ord("d")]] = ord("E")
+
+
+def _to_matrix(lines, width):
+    r"""Convert a list of lines to a ``(len(lines), width)`` matrix of ASCII codes.
+    Shorter lines are padded with blank spaces, longer ones are truncated.
+
+    Args:
+        lines (list): List of lines to convert.
+        width (int): Number of columns to keep.
+
+    Returns:
+        numpy.ndarray
+    """
+    if len(lines) == 0:
+        return np.zeros((0, width), dtype=np.uint8)
+    text = "".join([line[:width].ljust(width) for line in lines])
+    buffer = np.frombuffer(text.encode("ascii", "replace"), dtype=np.uint8)
+    return buffer.reshape(len(lines), width)
+
+
+def _to_float(strings):
+    r"""Convert an array of byte strings to float, the unreadable ones being set to ``NaN``."""
+    try:
+        return strings.astype(np.float64)
+    except ValueError:
+        pass
+    # Slow path, only for corrupted fields.
+    values = np.empty(strings.shape, dtype=np.float64)
+    for index, string in enumerate(strings.tolist()):
+        try:
+            values[index] = float(string)
+        except ValueError:
+            values[index] = np.nan
+    return values
+
+
+def decode_columns(matrix, spans):
+    r"""Decode fixed-width numeric columns from a matrix of ASCII codes.
+
+    All records are decoded at once: the Fortran ``D`` exponents are replaced by ``E``
+    and blank fields are set to ``NaN`` in one vectorized pass per field width.
+
+    Args:
+        matrix (numpy.ndarray): Matrix of ASCII codes of shape ``(N, W)``, one row per record.
+        spans (list): List of ``(start, end)`` columns to decode.
+
+    Returns:
+        numpy.ndarray: Array of ``float64`` of shape ``(N, len(spans))``.
+    """
+    num_records = matrix.shape[0]
+    values = np.full((num_records, len(spans)), np.nan)
+    if num_records == 0:
+        return values
+
+    # Group the fields by width, so that each group can be viewed as an array of byte strings.
+    widths = [end - start for start, end in spans]
+    for width in sorted(set(widths)):
+        indexes = [i for i, width_ in enumerate(widths) if width_ == width]
+        columns = np.array([np.arange(spans[i][0], spans[i][1]) for i in indexes])
+        fields = _EXPONENTS[matrix[:, columns]]
+        blank = np.all(fields == _SPACE, axis=-1)
+        strings = np.ascontiguousarray(fields).view(f"S{width}")[..., 0]
+        decoded = np.full(strings.shape, np.nan)
+        decoded[~blank] = _to_float(strings[~blank])
+        values[:, indexes] = decoded
+    return values
+
+
+def decode_fields(records, fields):
+    r"""Decode a block of same-layout fixed-width records into a ``numpy`` array.
+
+    A record is made of one or several lines (e.g. 8 lines for a GPS navigation message),
+    and a field is located by its row in the record and its columns in that row.
+
+    Args:
+        records (list): List of records. Each record is a list of ``nrows`` lines.
+        fields (list): List of ``(row, start, end)`` tuples.
+
+    Returns:
+        numpy.ndarray: Array of ``float64`` of shape ``(len(records), len(fields))``.
+            Blank or unreadable fields are set to ``NaN``.
+
+    Examples:
+        >>> decode_fields([[" 5.5D+01  ", "   12"], ["-1.0D-02  ", "     "]], [(0, 0, 10), (1, 0, 5)])
+            array([[ 5.5e+01,  1.2e+01],
+                   [-1.0e-02,      nan]])
+    """
+    nrows = max([row for row, _, _ in fields]) + 1
+    width = max([end for _, _, end in fields])
+    lines = []
+    for record in records:
+        # Truncated records (e.g. at the end of the file) are completed with blank lines.
+        lines.extend(record[:nrows])
+        lines.extend([""] * (nrows - len(record)))
+    matrix = _to_matrix(lines, width).reshape(len(records), nrows * width)
+    spans = [(row * width + start, row * width + end) for row, start, end in fields]
+    return decode_columns(matrix, spans)
+
+
+def _read_chunk(cls, lines, *args):
+    r"""Read a chunk of epochs with a new reader."""
+    return cls(lines)._read_data(*args)
+
+
+def _read_range(cls, filename, start, end, *args):
+    r"""Read the epochs between the bytes ``start`` and ``end`` of a file with a new reader, in a worker process.
+    The file is memory-mapped by the worker, so only the offsets are sent to it."""
+    with LineBuffer.open(filename, start, end) as lines:
+        return cls(lines)._read_data(*args)
 
 
 class ABCReader(ABC):
@@ -55,6 +193,264 @@ class ABCReader(ABC):
         # Else, return the stripped string
         return str(string)
 
+    def _size(self):
+        """Number of bytes of the lines (end of lines included), known without reading them for a
+        :class:`~gnsstools.rinex.buffer.LineBuffer` only.
+
+        Returns:
+            int: The number of bytes, or ``None`` for a list of lines.
+        """
+        if isinstance(self.lines, LineBuffer):
+            return int(self.lines.ends[-1] - self.lines.starts[0]) if len(self.lines) > 0 else 0
+        return None
+
+    def _report(self, stage, df):
+        """Report the number of records (and bytes, from a memory-mapped file) read to the metrics of a stage."""
+        if metrics.registry.enabled:
+            metrics.count(f"{stage}.records", len(df))
+            size = self._size()
+            if size is not None:
+                metrics.count(f"{stage}.bytes", size)
+
+    def _decode(self, starts, nrows, fields):
+        """Decode the records starting at the lines ``starts``, each one spanning ``nrows`` lines.
+
+        Args:
+            starts (list): Index of the first line of each record.
+            nrows (int): Number of lines per record.
+            fields (list): List of ``(row, start, end)`` tuples, see :func:`decode_fields`.
+
+        Returns:
+            numpy.ndarray
+        """
+        # Memory-mapped files are sliced at the byte level, without decoding the lines.
+        if isinstance(self.lines, LineBuffer):
+            width = max([end for _, _, end in fields])
+            indexes = np.add.outer(np.asarray(starts, dtype=np.int64), np.arange(nrows)).ravel()
+            matrix = self.lines.to_matrix(indexes, width).reshape(len(starts), nrows * width)
+            spans = [(row * width + start, row * width + end) for row, start, end in fields]
+            return decode_columns(matrix, spans)
+
+        records = [self.lines[start:start + nrows] for start in starts]
+        return decode_fields(records, fields)
+
+    def _decode_dates(self, indexes, spans):
+        """Decode the epochs of the lines ``indexes`` as ``datetime64``, without creating ``gnsstime`` objects.
+
+        Args:
+            indexes (numpy.ndarray): Index of the epoch lines.
+            spans (list): ``(start, end)`` columns of the year, month, day, hour, minute and second.
+
+        Returns:
+            numpy.ndarray
+        """
+        width = max([end for _, end in spans])
+        values = decode_columns(self._gather(indexes, width), spans)
+        return to_datetime64(*values.T)
+
+    def _gather(self, indexes, width):
+        """Gather the first ``width`` columns of the lines ``indexes`` as a matrix of ASCII codes.
+        It lets the readers locate their records without processing the lines one by one.
+
+        Args:
+            indexes (numpy.ndarray): Index of the lines to gather.
+            width (int): Number of columns to keep.
+
+        Returns:
+            numpy.ndarray
+        """
+        if isinstance(self.lines, LineBuffer):
+            return self.lines.to_matrix(indexes, width)
+        return _to_matrix([self.lines[i] if i < len(self.lines) else "" for i in indexes], width)
+
+    def _split(self, epochs, num_chunks):
+        """Split the lines on the epochs boundaries, in chunks of (about) the same number of epochs.
+
+        Args:
+            epochs (numpy.ndarray): Index of the first line of each epoch.
+            num_chunks (int): Number of chunks.
+
+        Returns:
+            tuple: The ``(start, end)`` lines of the chunks.
+        """
+        epochs = np.asarray(epochs, dtype=np.int64)
+        num_chunks = max(min(num_chunks, len(epochs)), 1)
+        starts = epochs[np.linspace(0, len(epochs), num_chunks, endpoint=False).astype(int)] if len(epochs) > 0 else [self._cursor]
+        ends = list(starts[1:]) + [len(self.lines)]
+        return list(zip(starts, ends))
+
+    def _extract(self, start, end):
+        """Copy the lines ``start:end``, to be read by another reader."""
+        if isinstance(self.lines, LineBuffer):
+            return self.lines.extract(start, end)
+        return self.lines[start:end]
+
+    def _num_jobs(self, n_jobs):
+        """Number of processes reading the lines in parallel: at most one per CPU and per ``PARALLEL_SIZE`` bytes,
+        and only for a memory-mapped file.
+
+        Args:
+            n_jobs (int): Maximum number of processes.
+
+        Returns:
+            int
+        """
+        if getattr(self.lines, "filename", None) is None:
+            return 1
+        return max(min(n_jobs, os.cpu_count() or 1, self._size() // PARALLEL_SIZE), 1)
+
+    def _read_parallel(self, epochs, n_jobs, *args, progress=None):
+        """Split the lines on the epochs boundaries, and read the chunks in a pool of processes.
+        The chunks are independent, and read with the same arguments (e.g. the fields of the header).
+        Each process memory-maps the file and reads its own range of bytes.
+
+        The number of processes is capped by :meth:`_num_jobs`. The lines are read in the current process
+        if only one process is left.
+
+        Args:
+            epochs (numpy.ndarray): Index of the first line of each epoch.
+            n_jobs (int): Maximum number of processes.
+            args (tuple): Arguments of ``_read_data``.
+            progress (Progress, optional): Progress updated (and cancellation checked) after each chunk.
+                Defaults to ``None``.
+
+        Returns:
+            pandas.DataFrame
+        """
+        n_jobs = min(self._num_jobs(n_jobs), len(epochs))
+        if n_jobs <= 1:
+            if progress is not None and progress.enabled:
+                return self._read_chunks(epochs, progress, *args)
+            return self._read_data(*args)
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        bounds = self._split(epochs, n_jobs)
+        starts, ends = self.lines.starts, self.lines.ends
+        ranges = [(self.lines.offset + starts[start], self.lines.offset + ends[min(end, len(self.lines)) - 1])
+                  for start, end in bounds]
+        self._cursor = len(self.lines)
+
+        num_chunks = len(bounds)
+        pool = ProcessPoolExecutor(max_workers=num_chunks)
+        try:
+            futures = [pool.submit(_read_range, type(self), self.lines.filename, int(start), int(end), *args)
+                       for start, end in ranges]
+            dfs = []
+            for future, (_, end) in zip(futures, bounds):
+                dfs.append(future.result())
+                if progress is not None:
+                    progress.update(end)
+        finally:
+            # The chunks not started yet are dropped if the reading is cancelled.
+            pool.shutdown(wait=True, cancel_futures=True)
+        return self._merge(dfs)
+
+    def _read_chunks(self, epochs, progress, *args, chunk_size=None):
+        """Read the lines by chunks of epochs, updating the progress (and checking the cancellation) after each chunk.
+
+        Args:
+            epochs (numpy.ndarray): Index of the first line of each epoch.
+            progress (Progress): Progress of the reading.
+            args (tuple): Arguments of ``_read_data``.
+            chunk_size (int, optional): Number of lines per chunk (rounded to whole epochs).
+                Defaults to ``None`` (``CHUNK_SIZE``).
+
+        Returns:
+            pandas.DataFrame
+        """
+        num_chunks = int(np.ceil((len(self.lines) - self._cursor) / (chunk_size or CHUNK_SIZE)))
+        bounds = self._split(epochs, num_chunks)
+        self._cursor = len(self.lines)
+
+        dfs = []
+        progress.update(bounds[0][0])
+        for start, end in bounds:
+            dfs.append(_read_chunk(type(self), self._extract(start, end), *args))
+            progress.update(end)
+        return self._merge(dfs)
+
+    def _merge(self, dfs):
+        """Merge DataFrames read from consecutive chunks.
+
+        Args:
+            dfs (list): DataFrames of the chunks, in order.
+
+        Returns:
+            pandas.DataFrame
+        """
+        import pandas as pd
+
+        # Merge the chunks in order, numbering their sessions from the previous chunks.
+        sessions = defaultdict(int)
+        dfs = [self._continue_sessions(df, sessions) for df in dfs]
+        df = pd.concat(dfs, sort=False)
+        # Make it pretty
+        columns = sorted([col for col in df.columns])
+        df = df.reindex(columns, axis=1)
+        df = df.sort_index()
+        return df
+
+    @staticmethod
+    def _iter_lines(filename):
+        """Iterate lazily over the lines of a file, without the end of line characters."""
+        with open(filename, "r") as f:
+            for line in f:
+                yield line.rstrip("\r\n")
+
+    @staticmethod
+    def _take_header(lines):
+        """Consume the header lines (``"END OF HEADER"`` included) from an iterator of lines.
+
+        Returns:
+            list
+        """
+        header = []
+        for line in lines:
+            header.append(line)
+            if line[60:].strip() == "END OF HEADER":
+                break
+        return header
+
+    def _read_batch(self, lines, fields, sessions, header=None):
+        """Read a batch of epochs, with sessions numbered from the previous batches.
+
+        Args:
+            lines (list): Lines of the epochs to read.
+            fields (any): Name of the fields / observations, as returned by ``_read_header``.
+            sessions (dict): Number of sessions already read per ``(system, prn)``. Updated inplace.
+            header (dict, optional): Metadata to add to the DataFrame attributes.
+
+        Returns:
+            pandas.DataFrame
+        """
+        self.lines = lines
+        self._cursor = 0
+        df = self._continue_sessions(self._read_data(fields), sessions)
+        df.attrs = header or {}
+        return df
+
+    @staticmethod
+    def _continue_sessions(df, sessions):
+        """Number the sessions of a batch from the ones of the previous batches.
+
+        Args:
+            df (pandas.DataFrame): Batch indexed by ``System``, ``PRN`` and ``Date``, with a ``Session`` column.
+            sessions (dict): Number of sessions already read per ``(system, prn)``. Updated inplace.
+
+        Returns:
+            pandas.DataFrame
+        """
+        import pandas as pd
+
+        # The offsets are looked up once per satellite, not once per record.
+        codes, keys = pd.factorize(df.index.droplevel("Date"))
+        offsets = np.array([sessions[key] for key in keys], dtype=np.int64)
+        df["Session"] += offsets[codes]
+        for key, count in zip(keys, np.bincount(codes, minlength=len(keys))):
+            sessions[key] += int(count)
+        return df
+
     def _skip_header(self):
         while self._cursor < len(self.lines) and self.lines[self._cursor].strip() != "END OF HEADER":
             self._cursor += 1
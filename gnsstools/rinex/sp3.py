@@ -12,13 +12,13 @@ import re
 import math
 import numpy as np
 import pandas as pd
-from shapely.geometry import Point
 
 # GNSS Tools
-from .reader import ABCReader
+from .reader import ABCReader, decode_columns
 from .datasets import PositionDataFrame
+from .progress import Progress
+from gnsstools import metrics
 from gnsstools.logger import logger
-from gnsstools import gnsstime
 
 
 class SP3Reader(ABCReader):
@@ -58,21 +58,90 @@ class SP3Reader(ABCReader):
         # Return the corresponding satellites.
         return satellites
 
-    def _read_position(self):
-        line = self.lines[self._cursor]
-        return {
-            "Position": Point(self._eval(line[4:18]), self._eval(line[18:32]), self._eval(line[32:46])),
-            "Clock": self._eval(line[46:60])
-        }
-
-    def _read_velocity(self):
-        line = self.lines[self._cursor]
-        return {
-            "Velocity": Point(self._eval(line[4:18]), self._eval(line[18:32]), self._eval(line[32:46])),
-            "Clock": self._eval(line[46:60])
-        }
+    def _read_coords(self, starts):
+        """Decode the coordinates and clock of all the position / velocity records at once.
+
+        Args:
+            starts (list): Index of the position (``"P"``) or velocity (``"V"``) lines.
+
+        Returns:
+            numpy.ndarray: Array of shape ``(N, 4)``, with the ``x``, ``y``, ``z`` and clock values.
+        """
+        return self._decode(starts, 1, [(0, 4, 18), (0, 18, 32), (0, 32, 46), (0, 46, 60)])
+
+    def _read_data(self):
+        """Read the epochs from the cursor to the end of the lines (or the ``"EOF"`` line).
+
+        Returns:
+            PositionDataFrame
+        """
+        # Locate the epochs and the position / velocity records from the first columns of the lines.
+        # They are decoded afterward, all at once.
+        indexes = np.arange(self._cursor, len(self.lines))
+        heads = self._gather(indexes, 4)
+        # If the end is reached, stop.
+        eof = np.flatnonzero(np.all(heads == np.frombuffer(b"EOF ", dtype=np.uint8), axis=1))
+        if len(eof) > 0:
+            indexes, heads = indexes[:eof[0]], heads[:eof[0]]
+        self._cursor = len(self.lines)
+
+        # Read the date for a set of observations.
+        # NOTE: There should be `len(satellites_list)` observations.
+        # However, the following will still work if it's not the case.
+        epochs = indexes[heads[:, 0] == ord("*")]
+        dates_epochs = self._decode_dates(epochs, [(3, 7), (8, 10), (11, 13), (14, 16), (17, 19), (20, 31)])
+        dates_epochs = np.concatenate(([np.datetime64("NaT", "ns")], dates_epochs))
+
+        # Search for data to add, and their date (i.e. the last epoch before).
+        # TODO: add "EP" and "SV" data
+        mask_records = np.isin(heads[:, 0], (ord("P"), ord("V")))
+        starts = indexes[mask_records]
+        dates = dates_epochs[np.searchsorted(epochs, starts)]
+        systems = heads[mask_records, 1].view("S1").astype(str)
+        prns = decode_columns(heads[mask_records], [(2, 4)])[:, 0].astype(int)
+
+        # Create the DataFrame, with one row per satellite and epoch.
+        # The positions (km) and clocks (microseconds) come from the "P" records,
+        # the velocities (dm/s) and clock rates (10**-4 microseconds/s) from the "V" records.
+        values = self._read_coords(starts)
+        records = heads[mask_records, 0]
+        df = None
+        for record, columns in [("P", ["X", "Y", "Z", "Clock"]), ("V", ["VX", "VY", "VZ", "ClockRate"])]:
+            mask = records == ord(record)
+            if record == "V" and not np.any(mask):
+                continue
+            index = pd.MultiIndex.from_arrays([systems[mask], prns[mask], dates[mask]], names=["System", "PRN", "Date"])
+            df_record = PositionDataFrame(values[mask], index=index, columns=columns)
+            df = df_record if df is None else df.join(df_record, how="outer")
+        df = df.sort_index()
+        df["Session"] = df.groupby(level=["System", "PRN"]).cumcount() + 1
+        # Make it pretty
+        columns = sorted([col for col in df.columns])
+        df = df.reindex(columns, axis=1)
+        return df
 
-    def read(self):
+    @metrics.measure("rinex.sp3")
+    def read(self, n_jobs=1, progress=None, cancel=None, progress_interval=0.1, chunk_size=None):
+        """Read the positions and velocities.
+
+        Args:
+            n_jobs (int, optional): Maximum number of processes. If greater than ``1``, a memory-mapped file is split
+                on its epochs and the chunks are read in parallel, with at most one process per CPU and per
+                8 MB of data. Defaults to ``1``.
+            progress (callable, optional): Function called with the number of lines read and the total number of lines,
+                as ``progress(done, total)``. Defaults to ``None``.
+            cancel (CancellationToken, optional): Token stopping the reading, with a ``ReadCancelled`` error.
+                Defaults to ``None``.
+            progress_interval (float, optional): Minimum duration between two calls of ``progress``, in seconds.
+                Defaults to ``0.1``.
+            chunk_size (int, optional): Number of lines read between two updates of the progress (and checks of
+                the cancellation). Only used with ``progress`` or ``cancel``. Defaults to ``None`` (10 000 lines).
+
+        Returns:
+            PositionDataFrame
+        """
+        tracker = Progress(len(self.lines), progress, cancel, progress_interval)
+        n_jobs = self._num_jobs(n_jobs)
         self._cursor = 0
         line = self.lines[self._cursor]
 
@@ -88,56 +157,16 @@ class SP3Reader(ABCReader):
             line = self.lines[self._cursor]
         satellites_list = self._read_sat()
 
-        # Read the data
-        satellites = defaultdict(list)
-        date = None
-
-        while self._cursor < len(self.lines):
-            line = self.lines[self._cursor]
-            # If the end is reached, break.
-            if line.strip() == "EOF":
-                break
-            elif line.strip() == "":
-                self._cursor += 1
-                continue
-            # Read the date for a set of observations.
-            # NOTE: There should be `len(satellites_list)` observations.
-            # However, the following will still work if it's not the case.
-            elif line.startswith("*"):
-                line = self.lines[self._cursor]
-                year, month, day, hour, minute, second = line[3:7], line[8:10], line[11:13], line[14:16], line[17:19], line[20:31]
-                date = gnsstime(year, month, day, hour, minute, second)
-
-            # Search for data to add
-            elif re.search("[PV]", line[0]):
-                line = self.lines[self._cursor]
-                system, prn = self._eval(line[1]), self._eval(line[2:4])
-                # Extract the data
-                if line.startswith("P"):
-                    data = data = self._read_position()
-                elif line.startswith("V"):
-                    data = self._read_velocity()
-                # TODO: add "EP" and "SV" data
-                else:
-                    data = {}
-                # Add relevant information
-                data["Date"] = date
-                data["System"] = system
-                data["PRN"] = prn
-                satellite = f"{system}{prn}"
-                data["Session"] = len(satellites[satellite]) + 1
-                satellites[satellite].append(data)
-            # Read the next line
-            self._cursor += 1
-
-        # Create the DataFrame
-        df_data = []
-        for satellites, values in satellites.items():
-            df_data.extend(values)
-        df = PositionDataFrame(df_data)
-        # Make it pretty
-        df = df.set_index(["System", "PRN", "Date"])
-        columns = sorted([col for col in df.columns])
-        df = df.reindex(columns, axis=1)
-        df = df.sort_index()
+        if n_jobs > 1 or tracker.enabled:
+            # Epochs always start with "*".
+            indexes = np.arange(self._cursor, len(self.lines))
+            epochs = indexes[self._gather(indexes, 1)[:, 0] == ord("*")]
+            if n_jobs > 1:
+                df = self._read_parallel(epochs, n_jobs, progress=tracker)
+            else:
+                df = self._read_chunks(epochs, tracker, chunk_size=chunk_size)
+        else:
+            df = self._read_data()
+        tracker.finish()
+        self._report("rinex.sp3", df)
         return df
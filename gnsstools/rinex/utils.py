@@ -7,11 +7,17 @@
 
 
 from collections import defaultdict
-from shapely.geometry import Point
 import numpy as np
 import pandas as pd
 
 
+# Prefixes of the columns of 3D variables, to match the PositionDataFrame columns.
+VECTOR_PREFIXES = {
+    "position": "",
+    "velocity": "V"
+}
+
+
 def convert_georinex(xarray, convert=True):
 
     # If the dataset does not have "sv" and "time" coordinates, or have more than 3 coordinates,
@@ -40,17 +46,15 @@ def convert_georinex(xarray, convert=True):
         # Retrieve the variable_names per PRN (satellite) and session id.
         for variable_name in variable_names:
             variable = getattr(xarray, variable_name)
-            values = list(np.array(variable[time_indexes, sv_index]))
-            # If the values are 3D, convert them to shapely Point.
+            values = np.array(variable[time_indexes, sv_index])
+            # If the values are 3D, split them in numeric columns (e.g. "position" -> "X", "Y", "Z").
             if len(variable.dims) == 3:
-                points = []
-                for value in values:
-                    try:
-                        points.append(Point(value))
-                    except:
-                        points.append(None)
-                values = points
-            df_data[variable_name].extend(values)
+                labels = [str(label).upper() for label in np.array(xarray[variable.dims[2]])]
+                prefix = VECTOR_PREFIXES.get(variable_name, f"{variable_name}_")
+                for label, component in zip(labels, values.astype(np.float64).T):
+                    df_data[prefix + label].extend(component)
+                continue
+            df_data[variable_name].extend(list(values))
 
         # Create a new variable_name for "date"
         date = list(np.array(xarray.time[time_indexes]))
@@ -9,3 +9,4 @@ from .satellite import Satellite
 from .glonass import GLONASS
 from .gps import GPS
 from .galileo import GALILEO
+from .propagator import GLONASSPropagator
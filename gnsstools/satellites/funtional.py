@@ -10,7 +10,13 @@
 import numpy as np
 
 # GNSS Tools
-from gnsstools.const import mu, F
+from gnsstools import metrics
+from gnsstools.const import mu, F, omega_e
+from gnsstools.logger import get_tracer
+from .propagator import GLONASSPropagator
+
+
+trace = get_tracer("orbits")
 
 
 def get_satellite_position(satellite, date):
@@ -83,3 +89,180 @@ def get_satellite_position(satellite, date):
     dte = satellite.sv_clock_bias + satellite.sv_clock_drift * dt + satellite.sv_clock_drift_rate * dt**2 + dt_relat
 
     return X_ECEF.flatten(), dte
+
+
+def _rotation_z(angle):
+    """Rotation matrices around the Z axis, of shape ``(..., 3, 3)``."""
+    angle = np.asarray(angle, dtype=np.float64)
+    cos, sin = np.cos(angle), np.sin(angle)
+    R = np.zeros(angle.shape + (3, 3))
+    R[..., 0, 0], R[..., 0, 1] = cos, -sin
+    R[..., 1, 0], R[..., 1, 1] = sin, cos
+    R[..., 2, 2] = 1
+    return R
+
+
+def _rotation_x(angle):
+    """Rotation matrices around the X axis, of shape ``(..., 3, 3)``."""
+    angle = np.asarray(angle, dtype=np.float64)
+    cos, sin = np.cos(angle), np.sin(angle)
+    R = np.zeros(angle.shape + (3, 3))
+    R[..., 0, 0] = 1
+    R[..., 1, 1], R[..., 1, 2] = cos, -sin
+    R[..., 2, 1], R[..., 2, 2] = sin, cos
+    return R
+
+
+def solve_kepler(M, e, epsilon=1e-12, max_steps=20):
+    r"""Solve Kepler's equation :math:`E - e \sin(E) = M` with Newton's method, for arrays of anomalies.
+
+    Args:
+        M (numpy.ndarray): Mean anomalies, in radians.
+        e (numpy.ndarray): Eccentricities.
+        epsilon (float, optional): Precision on the eccentric anomalies, in radians. Defaults to ``1e-12``.
+        max_steps (int, optional): Maximum number of iterations. Defaults to ``20``.
+
+    Returns:
+        tuple: The eccentric anomalies, and the number of iterations.
+    """
+    E = np.array(M, dtype=np.float64, copy=True)
+    steps = 0
+    # Only the anomalies that did not converge yet are updated.
+    active = np.ones(E.shape, dtype=bool)
+    while steps < max_steps and active.any():
+        E_, M_, e_ = E[active], M[active], e[active]
+        dE = (E_ - e_ * np.sin(E_) - M_) / (1 - e_ * np.cos(E_))
+        E[active] = E_ - dE
+        active[active] = np.abs(dE) > epsilon
+        steps += 1
+    metrics.count("orbits.kepler.solves")
+    metrics.count("orbits.kepler.iterations", steps)
+    metrics.count("orbits.kepler.anomalies", E.size)
+    return E, steps
+
+
+def kepler_invariants(sqrt_a, e, delta_n):
+    r"""Compute the values of a Keplerian orbit that do not depend on time.
+
+    Args:
+        sqrt_a (numpy.ndarray): Square roots of the semi-major axes.
+        e (numpy.ndarray): Eccentricities.
+        delta_n (numpy.ndarray): Mean motion differences.
+
+    Returns:
+        tuple: The semi-major axes, the (corrected) mean motions and the ratios :math:`\sqrt{(1 + e) / (1 - e)}`.
+    """
+    sqrt_a = np.asarray(sqrt_a, dtype=np.float64)
+    e = np.asarray(e, dtype=np.float64)
+    A = sqrt_a ** 2
+    n = np.sqrt(mu / A ** 3) + delta_n
+    ratio = np.sqrt((1 + e) / (1 - e))
+    return A, n, ratio
+
+
+def _eccentric_anomaly(ephemerides, times, invariants, epsilon, max_steps):
+    """Compute the time variation from the time of clock, and the eccentric anomaly."""
+    toc = np.asarray(ephemerides["toc"]).astype("datetime64[ns]")
+    times = np.asarray(times).astype("datetime64[ns]")
+    dt = (times - toc).astype(np.float64) / 1e9
+    _, n, _ = invariants
+    # Compute mean anomaly at the specified time.
+    M = ephemerides["m0"] + n * dt
+    # Solve Kepler equation with an iterative method.
+    M, e = np.broadcast_arrays(M, np.asarray(ephemerides["e"], dtype=np.float64))
+    E, steps = solve_kepler(M, e, epsilon=epsilon, max_steps=max_steps)
+    trace("kepler", "%d anomalies solved in %d steps", np.size(E), steps)
+    return dt, E
+
+
+def _clock(ephemerides, dt, E):
+    """Compute satellite time error delta."""
+    dt_relat = F * ephemerides["sqrt_a"] * ephemerides["e"] * np.sin(E)
+    return ephemerides["sv_clock_bias"] + ephemerides["sv_clock_drift"] * dt + ephemerides["sv_clock_drift_rate"] * dt ** 2 + dt_relat
+
+
+@metrics.measure("orbits.position")
+def get_satellites_position(ephemerides, times, epsilon=1e-12, max_steps=20, invariants=None):
+    r"""Compute the position and clock offset of `GPS` / `Galileo` satellites from their broadcast ephemerides,
+    for many satellites and dates at once. This is the vectorized counterpart of :func:`get_satellite_position`.
+
+    Args:
+        ephemerides (dict): Arrays of Keplerian parameters, named like the satellites' arguments (``"sqrt_a"``,
+            ``"m0"``, ``"toe"`` etc.), and their ``"toc"`` as ``datetime64``.
+            See :meth:`~gnsstools.rinex.datasets.NavigationDataFrame.select_many`.
+        times (numpy.ndarray): Dates of the positions, as ``datetime64``. Broadcast against the ephemerides.
+        epsilon (float, optional): Precision of the eccentric anomalies, in radians. Defaults to ``1e-12``.
+        max_steps (int, optional): Maximum number of iterations to solve Kepler's equation. Defaults to ``20``.
+        invariants (tuple, optional): Values of the orbits that do not depend on time, see :func:`kepler_invariants`.
+            Computed from the ephemerides if ``None``. Defaults to ``None``.
+
+    Returns:
+        tuple: The ECEF positions of shape ``(N, 3)`` in meters, and the clock offsets of shape ``(N,)`` in seconds.
+
+    Examples:
+        >>> ephemerides = df.select_many("G", prns, times)
+        >>> positions, clocks = get_satellites_position(ephemerides, times)
+    """
+    # * Step 1
+    # Compute the time variation from the time of clock, the mean movement n and the eccentric anomaly.
+    invariants = invariants or kepler_invariants(ephemerides["sqrt_a"], ephemerides["e"], ephemerides["delta_n"])
+    A, _, ratio = invariants
+    dt, E = _eccentric_anomaly(ephemerides, times, invariants, epsilon, max_steps)
+
+    # Compute satellite true anomaly.
+    v = 2 * np.arctan(ratio * np.tan(E / 2))
+
+    # Compute distance Earth - Satellite (radius).
+    r = A * (1 - ephemerides["e"] * np.cos(E))
+    # Compute coordinates in the orbital plane.
+    phi = ephemerides["omega"] + v
+    sin2phi, cos2phi = np.sin(2 * phi), np.cos(2 * phi)
+    # Compute corrections.
+    dr = ephemerides["crs"] * sin2phi + ephemerides["crc"] * cos2phi
+    dphi = ephemerides["cus"] * sin2phi + ephemerides["cuc"] * cos2phi
+    # Compute (x, y, 0) in the orbital plane.
+    X_orb = np.stack([(r + dr) * np.cos(phi + dphi), (r + dr) * np.sin(phi + dphi), np.zeros_like(r)], axis=-1)
+
+    # * Step 2
+    # Plane corrections.
+    di = ephemerides["cis"] * sin2phi + ephemerides["cic"] * cos2phi
+    i = ephemerides["i0"] + ephemerides["idot"] * dt + di
+    omega = ephemerides["omega0"] + ephemerides["omega_dot"] * dt
+    # Transform cartesian to geocentric coordinates.
+    X_ECI = np.einsum("...ij,...jk,...k->...i", _rotation_z(omega), _rotation_x(i), X_orb)
+
+    # Transform to ECEF cartesian coordinates, from the seconds of the ephemerides' week.
+    t_sow = ephemerides["toe"] + dt
+    X_ECEF = np.einsum("...ij,...j->...i", _rotation_z(omega_e * t_sow), X_ECI)
+
+    metrics.count("orbits.position.records", X_ECEF[..., 0].size)
+    return X_ECEF, _clock(ephemerides, dt, E)
+
+
+def get_satellites_clock(ephemerides, times, epsilon=1e-12, max_steps=20, invariants=None):
+    r"""Compute the clock offset of `GPS` / `Galileo` satellites from their broadcast ephemerides,
+    without computing their positions. See :func:`get_satellites_position` for the arguments.
+
+    Returns:
+        numpy.ndarray: The clock offsets, in seconds.
+    """
+    invariants = invariants or kepler_invariants(ephemerides["sqrt_a"], ephemerides["e"], ephemerides["delta_n"])
+    dt, E = _eccentric_anomaly(ephemerides, times, invariants, epsilon, max_steps)
+    return _clock(ephemerides, dt, E)
+
+
+def get_glonass_position(ephemerides, times, step=60):
+    r"""Compute the position and clock offset of `GLONASS` satellites from their broadcast ephemerides,
+    for many satellites and dates at once. See :class:`~gnsstools.satellites.propagator.GLONASSPropagator`
+    to propagate the same ephemerides to consecutive dates.
+
+    Args:
+        ephemerides (dict): Arrays of states (``"x"``, ``"dx"``, ``"dx2"`` etc.) and their ``"toc"`` as ``datetime64``.
+            See :meth:`~gnsstools.rinex.datasets.NavigationDataFrame.select_many`.
+        times (numpy.ndarray): Dates of the positions, as ``datetime64`` (UTC).
+        step (float, optional): Integration step, in seconds. Defaults to ``60``.
+
+    Returns:
+        tuple: The ECEF positions of shape ``(N, 3)`` in meters, and the clock offsets of shape ``(N,)`` in seconds.
+    """
+    return GLONASSPropagator(ephemerides, step=step).propagate(times)
@@ -5,10 +5,18 @@
 # Copyright (c) 2021 Arthur Dujardin
 
 
-from .satellite import Satellite
+from .satellite import KeplerianSatellite
 
 
-class GALILEO(Satellite):
+class GALILEO(KeplerianSatellite):
+
+    __slots__ = ()
+
+    PARAMETERS = (
+        "sv_clock_bias", "sv_clock_drift", "sv_clock_drift_rate", "iod_nav", "crs", "delta_n", "m0", "cuc",
+        "e", "cus", "sqrt_a", "toe", "cic", "omega0", "cis", "i0", "crc", "omega", "omega_dot", "idot",
+        "gps_week", "gal_week", "sisa", "sv_health", "bgd_e5a", "bgd_e5b", "trans_time"
+    )
 
     def __init__(self, prn=None, toc=None,
                  sv_clock_bias=None, sv_clock_drift=None, sv_clock_drift_rate=None,
@@ -50,11 +58,13 @@ class GALILEO(Satellite):
         self.gal_week = gal_week
         # Seventh row
         self.sisa = sisa
-        self.sv_heath = sv_health
+        self.sv_health = sv_health
         self.bgd_e5a = bgd_e5a
         self.bgd_e5b = bgd_e5b
         # Eighth row
         self.trans_time = trans_time
+        # Values of the orbit that do not depend on time.
+        self._precompute()
 
     @property
     def system(self):
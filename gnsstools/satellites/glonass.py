@@ -5,11 +5,23 @@
 # Copyright (c) 2021 Arthur Dujardin
 
 
+# Basic imports
+import numpy as np
+
+# GNSS Tools
 from .satellite import Satellite
+from .propagator import GLONASSPropagator
 
 
 class GLONASS(Satellite):
-    
+
+    __slots__ = ("_propagator",)
+
+    PARAMETERS = (
+        "sv_clock_bias", "sv_rel_freq_bias", "message_frame_time", "x", "dx", "dx2", "health",
+        "y", "dy", "dy2", "freq_num", "z", "dz", "dz2", "age_op_info"
+    )
+
     def __init__(self, prn=None, toc=None,
                  sv_clock_bias=None, sv_rel_freq_bias=None, message_frame_time=None,
                  x=None, dx=None, dx2=None, health=None,
@@ -34,11 +46,54 @@ class GLONASS(Satellite):
         self.dz = dz
         self.dz2 = dz2
         self.age_op_info = age_op_info
-        
+        # Integration state, cached between consecutive calls.
+        self._propagator = None
+
     @property
     def system(self):
         return "R"
 
+    def copy(self):
+        satellite = super().copy()
+        # The integration state is not shared between copies.
+        satellite._propagator = None
+        return satellite
+
+    def _propagate(self, times):
+        """Integrate the state of the satellite, from the last integrated state if the dates have the same shape."""
+        times = np.asarray(times).astype("datetime64[ns]")
+        if self._propagator is None or self._propagator.toc.shape != times.shape:
+            names = ["sv_clock_bias", "sv_rel_freq_bias", "x", "dx", "dx2", "y", "dy", "dy2", "z", "dz", "dz2"]
+            ephemerides = {name: np.full(times.shape, self[name], dtype=np.float64) for name in names}
+            ephemerides["toc"] = np.full(times.shape, self["toc"])
+            self._propagator = GLONASSPropagator(ephemerides)
+        positions, clocks = self._propagator.propagate(times)
+        return positions.reshape(times.shape + (3,)), clocks.reshape(times.shape)
+
+    def position(self, times):
+        """Compute the ECEF (PZ-90) position of the satellite, by integrating its broadcast state.
+
+        Args:
+            times (datetime or numpy.ndarray): Date, or array of dates (UTC).
+
+        Returns:
+            numpy.ndarray: Position of shape ``(3,)`` for a date, ``(N, 3)`` for an array of dates, in meters.
+        """
+        positions, _ = self._propagate(times)
+        return positions
+
+    def clock(self, times):
+        """Compute the clock offset of the satellite.
+
+        Args:
+            times (datetime or numpy.ndarray): Date, or array of dates (UTC).
+
+        Returns:
+            float or numpy.ndarray: Clock offset, in seconds.
+        """
+        dt = (np.asarray(times).astype("datetime64[ns]") - self["toc"]).astype(np.float64) / 1e9
+        return self.sv_clock_bias + self.sv_rel_freq_bias * dt
+
     def __repr__(self):
         rep = f"GLONASS("
         rep += f"\n  system:              {self.system}"
@@ -10,12 +10,20 @@ import numpy as np
 import pandas as pd
 
 # GNSS Tools
-from .satellite import Satellite
+from .satellite import KeplerianSatellite
 from gnsstools import gnsstime
 from gnsstools.utils import camel2snake
 
 
-class GPS(Satellite):
+class GPS(KeplerianSatellite):
+
+    __slots__ = ()
+
+    PARAMETERS = (
+        "sv_clock_bias", "sv_clock_drift", "sv_clock_drift_rate", "iode", "crs", "delta_n", "m0", "cuc", "e",
+        "cus", "sqrt_a", "toe", "cic", "omega0", "cis", "i0", "crc", "omega", "omega_dot", "idot", "l2_codes",
+        "gps_week", "l2_pflag", "sv_acc", "sv_health", "tgd", "iodc", "trans_time", "fit_inter"
+    )
 
     def __init__(self, prn=None, toc=None,
                  sv_clock_bias=None, sv_clock_drift=None, sv_clock_drift_rate=None,
@@ -64,6 +72,8 @@ class GPS(Satellite):
         # Eighth row
         self.trans_time = trans_time
         self.fit_inter = fit_inter
+        # Values of the orbit that do not depend on time.
+        self._precompute()
 
     @property
     def system(self):
@@ -0,0 +1,130 @@
+# Encoding: UTF-8
+# File: propagator.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+This module handles the propagation of `GLONASS` broadcast ephemerides.
+
+`GLONASS` satellites broadcast their state (position, velocity and lunisolar acceleration in the PZ-90 frame)
+instead of Keplerian parameters. The state is integrated with a Runge-Kutta (4th order) method,
+for all the satellites at once.
+"""
+
+
+# Basic imports
+import numpy as np
+
+# GNSS Tools
+from gnsstools.const import mu_glonass, ae_glonass, J2_glonass, omega_e_glonass
+
+
+__all__ = [
+    "GLONASSPropagator"
+]
+
+
+def _derivatives(states, accelerations):
+    r"""Equations of motion of `GLONASS` satellites in the PZ-90 (rotating) frame.
+
+    Args:
+        states (numpy.ndarray): Positions and velocities of shape ``(N, 6)``, in meters and meters per second.
+        accelerations (numpy.ndarray): Lunisolar accelerations of shape ``(N, 3)``, in meters per second squared.
+
+    Returns:
+        numpy.ndarray: Derivatives of the states, of shape ``(N, 6)``.
+    """
+    x, y, z, vx, vy, vz = states.T
+    r2 = x ** 2 + y ** 2 + z ** 2
+    r = np.sqrt(r2)
+    # Central term and second zonal harmonic.
+    c1 = -mu_glonass / (r2 * r)
+    c2 = 1.5 * J2_glonass * mu_glonass * ae_glonass ** 2 / (r2 ** 2 * r)
+    z2 = 5 * z ** 2 / r2
+    ax = c1 * x - c2 * x * (1 - z2) + omega_e_glonass ** 2 * x + 2 * omega_e_glonass * vy
+    ay = c1 * y - c2 * y * (1 - z2) + omega_e_glonass ** 2 * y - 2 * omega_e_glonass * vx
+    az = c1 * z - c2 * z * (3 - z2)
+    return np.stack([vx, vy, vz, ax, ay, az], axis=-1) + np.concatenate([np.zeros_like(accelerations), accelerations], axis=-1)
+
+
+class GLONASSPropagator(object):
+    r"""
+    Propagate the broadcast states of `GLONASS` satellites to any date, for many satellites at once.
+
+    The last integrated states are cached: the next dates are integrated from them,
+    instead of restarting from the time of clock (e.g. when processing consecutive epochs).
+
+    * :attr:`toc` (numpy.ndarray): Time of clock of the ephemerides, as ``datetime64``.
+
+    * :attr:`step` (float): Integration step, in seconds.
+
+    Examples:
+        >>> ephemerides = df.select_many("R", prns, times)
+        >>> propagator = GLONASSPropagator(ephemerides)
+        >>> positions, clocks = propagator.propagate(times)
+        >>> positions, clocks = propagator.propagate(times + np.timedelta64(1, "s"))
+    """
+
+    def __init__(self, ephemerides, step=60):
+        super().__init__()
+        self.toc = np.asarray(ephemerides["toc"]).astype("datetime64[ns]")
+        self.step = step
+        # The ephemerides are in kilometers.
+        positions = np.stack([ephemerides["x"], ephemerides["y"], ephemerides["z"]], axis=-1)
+        velocities = np.stack([ephemerides["dx"], ephemerides["dy"], ephemerides["dz"]], axis=-1)
+        accelerations = np.stack([ephemerides["dx2"], ephemerides["dy2"], ephemerides["dz2"]], axis=-1)
+        self._initial_states = np.concatenate([positions, velocities], axis=-1).reshape(-1, 6) * 1e3
+        self._accelerations = accelerations.reshape(-1, 3) * 1e3
+        self._clock_bias = np.asarray(ephemerides["sv_clock_bias"], dtype=np.float64)
+        self._clock_drift = np.asarray(ephemerides["sv_rel_freq_bias"], dtype=np.float64)
+        # Cache of the last integrated states, and their time from the time of clock.
+        self._states = self._initial_states.copy()
+        self._dt = np.zeros(len(self._states))
+
+    def _integrate(self, states, dt, target):
+        """Integrate the states from ``dt`` to ``target`` (in seconds from the time of clock) with Runge-Kutta 4."""
+        states, dt = states.copy(), dt.copy()
+        active = dt != target
+        while active.any():
+            h = np.clip(target[active] - dt[active], -self.step, self.step)[:, None]
+            y, a = states[active], self._accelerations[active]
+            k1 = _derivatives(y, a)
+            k2 = _derivatives(y + h / 2 * k1, a)
+            k3 = _derivatives(y + h / 2 * k2, a)
+            k4 = _derivatives(y + h * k3, a)
+            states[active] = y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+            dt[active] += h[:, 0]
+            active[active] = np.abs(target[active] - dt[active]) > 1e-9
+        return states
+
+    def propagate(self, times):
+        """Compute the position and clock offset of the satellites.
+
+        .. note::
+            The dates must be in the same time scale as the ephemerides (UTC for `GLONASS` navigation files).
+
+        Args:
+            times (numpy.ndarray): Dates, as ``datetime64``. One per ephemeris, or one for all.
+
+        Returns:
+            tuple: The ECEF (PZ-90) positions of shape ``(N, 3)`` in meters, and the clock offsets of shape ``(N,)`` in seconds.
+        """
+        times = np.broadcast_to(np.asarray(times).astype("datetime64[ns]"), self.toc.shape).ravel()
+        target = (times - self.toc.ravel()).astype(np.float64) / 1e9
+
+        # Restart from the time of clock if it is closer than the cached state.
+        restart = np.abs(target) < np.abs(target - self._dt)
+        self._states[restart] = self._initial_states[restart]
+        self._dt[restart] = 0
+
+        valid = np.isfinite(target) & np.all(np.isfinite(self._states), axis=-1)
+        self._states[valid] = self._integrate(self._states[valid], self._dt[valid], target[valid])
+        self._dt[valid] = target[valid]
+        positions = np.where(valid[:, None], self._states[:, :3], np.nan)
+
+        # The clock offset is -TauN + GammaN * dt.
+        clocks = self._clock_bias.ravel() + self._clock_drift.ravel() * target
+        return positions, clocks
@@ -7,15 +7,62 @@
 
 # Basic imports
 from abc import ABC
+import numpy as np
 
 # GNSS Tools
 from gnsstools.gnsstime import to_gnsstime, gnsstime
+from .funtional import kepler_invariants, get_satellites_position, get_satellites_clock
+
+
+class Parameter(object):
+    r"""
+    Broadcast parameter of a satellite, stored in the record (array of ``float64``) of the satellite.
+    Missing parameters are stored as ``NaN`` and read as ``None``.
+    """
+
+    def __init__(self, index, name=None):
+        super().__init__()
+        self.index = index
+        self.name = name
+
+    def __get__(self, satellite, owner=None):
+        if satellite is None:
+            return self
+        value = satellite._record[self.index]
+        return None if np.isnan(value) else float(value)
+
+    def __set__(self, satellite, value):
+        satellite._record[self.index] = np.nan if value is None else value
+        satellite._update(self.name)
 
 
 class Satellite(ABC):
+    r"""
+    Broadcast ephemeris of a satellite.
+
+    The broadcast parameters (listed in :attr:`PARAMETERS`) are stored in one array of ``float64`` per satellite,
+    and the satellites use ``__slots__``: thousands of ephemerides stay cheap in memory.
+    A satellite can also be used as a mapping of its parameters (e.g. ``satellite["sqrt_a"]``),
+    like the arrays returned by :meth:`~gnsstools.rinex.datasets.NavigationDataFrame.select_many`.
+    """
+
+    __slots__ = ("_prn", "_toc", "_toc64", "_record")
+
+    PARAMETERS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Create the accessors of the parameters listed by the subclass.
+        if "PARAMETERS" in cls.__dict__:
+            for index, name in enumerate(cls.PARAMETERS):
+                setattr(cls, name, Parameter(index, name))
+
     def __init__(self, prn, toc):
         self._prn = prn
         self._toc = to_gnsstime(toc)
+        # Reference of the clock polynomial, used by the vectorized computations.
+        self._toc64 = np.datetime64(self._toc.replace(tzinfo=None), "ns")
+        self._record = np.full(len(self.PARAMETERS), np.nan)
 
     @property
     def system(self):
@@ -29,16 +76,92 @@ class Satellite(ABC):
     def toc(self):
         return self._toc
 
+    def _update(self, name):
+        """Called when the parameter ``name`` is set, to update the values derived from it."""
+        pass
+
+    def copy(self):
+        """Copy the satellite, with its own record of parameters.
+
+        Returns:
+            Satellite
+        """
+        satellite = object.__new__(type(self))
+        for cls in type(self).__mro__:
+            for slot in cls.__dict__.get("__slots__", ()):
+                if hasattr(self, slot):
+                    setattr(satellite, slot, getattr(self, slot))
+        satellite._record = self._record.copy()
+        return satellite
+
+    def __getitem__(self, name):
+        if name == "toc":
+            return self._toc64
+        return getattr(self, name)
+
     def position(self, *args, **kwargs):
         raise NotImplementedError("This method is currently not available. Make a PR if you wish to update gnsstools.")
 
+    def clock(self, *args, **kwargs):
+        raise NotImplementedError("This method is currently not available. Make a PR if you wish to update gnsstools.")
+
     def __repr__(self):
         rep = f"{self.__class__.__name__}("
         rep += f"\n  system: {self.system}"
         rep += f"\n  prn: {self.prn}"
         rep == f"\n  toc: {self.toc}"
-        for attr, value in self.__dict__.items():
-            if attr[0] != "_":
-                rep += f"\n  {attr}: {value:.6e}"
+        for attr in self.PARAMETERS:
+            rep += f"\n  {attr}: {getattr(self, attr):.6e}"
         rep += "\n)"
         return rep
+
+
+class KeplerianSatellite(Satellite):
+    r"""
+    Satellite broadcasting Keplerian parameters (`GPS`, `Galileo`).
+    The values of the orbit that do not depend on time are computed once, by :meth:`_precompute`.
+    """
+
+    __slots__ = ("_invariants",)
+
+    # Parameters of the invariants of the orbit.
+    INVARIANTS = ("sqrt_a", "e", "delta_n")
+
+    def _update(self, name):
+        # The invariants are computed once the satellite is created, then kept up to date.
+        if name in self.INVARIANTS and hasattr(self, "_invariants"):
+            self._precompute()
+
+    def _precompute(self):
+        """Compute the semi-major axis, the mean motion and the eccentricity ratio of the orbit."""
+        self._invariants = None
+        if self.sqrt_a is not None and self.e is not None and self.delta_n is not None:
+            self._invariants = kepler_invariants(self.sqrt_a, self.e, self.delta_n)
+
+    def position(self, times):
+        """Compute the ECEF position of the satellite.
+
+        Args:
+            times (datetime or numpy.ndarray): Date, or array of dates.
+
+        Returns:
+            numpy.ndarray: Position of shape ``(3,)`` for a date, ``(N, 3)`` for an array of dates, in meters.
+
+        Examples:
+            >>> satellite = df.select("G", 2, gnsstime(2018, 10, 12, 0, 40, 15))
+            >>> satellite.position(gnsstime(2018, 10, 12, 0, 40, 15))
+            >>> satellite.position(np.datetime64("2018-10-12T00:40:15") + np.arange(3600).astype("timedelta64[s]"))
+        """
+        positions, _ = get_satellites_position(self, np.asarray(times).astype("datetime64[ns]"), invariants=self._invariants)
+        return positions
+
+    def clock(self, times):
+        """Compute the clock offset of the satellite.
+
+        Args:
+            times (datetime or numpy.ndarray): Date, or array of dates.
+
+        Returns:
+            float or numpy.ndarray: Clock offset, in seconds.
+        """
+        return get_satellites_clock(self, np.asarray(times).astype("datetime64[ns]"), invariants=self._invariants)
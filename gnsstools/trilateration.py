@@ -9,6 +9,7 @@
 import numpy as np
 
 # GNSS ToolBox
+from gnsstools import metrics
 from gnsstools.const import c
 
 
@@ -44,6 +45,7 @@ class Trilateration:
         self.v = np.zeros((4, 1))
         self.sigma0_2 = 1
 
+    @metrics.measure("trilateration.optimize")
     def optimize(self, max_steps=None, epsilon=1e-6):
         """Calcul d'une trilatération simple avec un offset
         correspondant à l'erreur d'horloge du récepteur
@@ -63,6 +65,7 @@ class Trilateration:
 
         # Iterative process
         max_steps = max_steps or 20
+        num_steps = max_steps
         epsilon = 1e-6
         sigma0_2_previous = np.inf
         while max_steps > 0 and abs(sigma0_2_previous - self.sigma0_2) > epsilon:
@@ -94,10 +97,111 @@ class Trilateration:
             self.sigma0_2 = sigma0_2.item()  # Convert to scalar
             max_steps -= 1
 
+        metrics.count("trilateration.solves")
+        metrics.count("trilateration.iterations", num_steps - max_steps)
         self.Qx = self.sigma0_2 * np.linalg.inv(N)
         rec_coords = x0.flatten()[:3]
         cdt = x0.flatten()[-1]
         return rec_coords, cdt
 
+    @staticmethod
+    def _linearize(x0, sat_coords, distances, mask):
+        """Jacobian matrices ``(E, S, 4)`` and Observation - Model vectors ``(E, S)`` of padded epochs,
+        at the parameters ``x0`` of shape ``(E, 4)``. The masked satellites have null rows."""
+        diff = x0[:, None, :3] - sat_coords
+        # The padded satellites are at a unit distance, to avoid dividing by zero.
+        distance = np.where(mask, np.linalg.norm(diff, axis=-1), 1)
+        A = np.concatenate([diff / distance[..., None], np.ones(distance.shape + (1,))], axis=-1) * mask[..., None]
+        B = (distances - (distance + x0[:, 3:])) * mask
+        return A, B
+
+    @staticmethod
+    @metrics.measure("trilateration.optimize_batch")
+    def optimize_batch(sat_coords, distances, mask=None, rec_coords=None, cdt=0, sigma=1, max_steps=20, epsilon=1e-6):
+        """Trilateration of many epochs at once, with the same model as :meth:`optimize`.
+
+        The epochs are stacked in padded arrays of ``S`` satellites, the missing ones being masked.
+        The weights are diagonal, and the normal equations of all the epochs are solved together.
+        Each epoch stops iterating once its own correction is smaller than ``epsilon``.
+
+        Args:
+            sat_coords (numpy.ndarray): Satellites positions of shape ``(E, S, 3)``.
+            distances (numpy.ndarray): Observed distances (satellites - receptor) of shape ``(E, S)``.
+            mask (numpy.ndarray, optional): Satellites to use, of shape ``(E, S)``. Non finite values are always masked.
+                Defaults to ``None``.
+            rec_coords (numpy.ndarray, optional): Initial receptor positions, of shape ``(E, 3)`` or ``(3,)``.
+                Defaults to ``None`` (Earth center).
+            cdt (float or numpy.ndarray, optional): Initial time delay * celerity, per epoch. Defaults to ``0``.
+            sigma (float or numpy.ndarray, optional): Standard deviation of the distances, for all of them or
+                of shape ``(E, S)``. Defaults to ``1``.
+            max_steps (int, optional): Maximum number of iterations. Defaults to ``20``.
+            epsilon (float, optional): Convergence threshold of the corrections. Defaults to ``1e-6``.
+
+        Returns:
+            tuple: Receptor positions ``(E, 3)``, time delays * celerity ``(E,)``, variance factors ``sigma0_2`` ``(E,)``
+                and covariance matrices ``Qx`` ``(E, 4, 4)``. Epochs with less than 4 satellites are set to ``NaN``.
+
+        Examples:
+            >>> rec_coords, cdt, sigma0_2, Qx = Trilateration.optimize_batch(sat_coords, distances, mask)
+        """
+        sat_coords = np.asarray(sat_coords, dtype=np.float64)
+        distances = np.asarray(distances, dtype=np.float64)
+        nb_epochs, nb_sat = distances.shape
+        valid = np.isfinite(distances) & np.all(np.isfinite(sat_coords), axis=-1)
+        mask = valid if mask is None else valid & np.asarray(mask, dtype=bool)
+        # Padded satellites get a null weight.
+        sat_coords = np.where(mask[..., None], sat_coords, 0)
+        distances = np.where(mask, distances, 0)
+        P = np.broadcast_to(1 / np.asarray(sigma, dtype=np.float64) ** 2, (nb_epochs, nb_sat)) * mask
+
+        # Initial state
+        x0 = np.zeros((nb_epochs, 4))
+        if rec_coords is not None:
+            x0[:, :3] = rec_coords
+        x0[:, 3] = cdt
+        nb_obs = mask.sum(axis=-1)
+        solvable = nb_obs >= 4
+        N = np.full((nb_epochs, 4, 4), np.nan)
+        v = np.zeros((nb_epochs, nb_sat))
+
+        metrics.count("trilateration.solves", np.count_nonzero(solvable))
+        # Iterative process, only on the epochs that did not converge.
+        active = solvable.copy()
+        for _ in range(max_steps):
+            epochs = np.flatnonzero(active)
+            if len(epochs) == 0:
+                break
+            metrics.count("trilateration.iterations", len(epochs))
+            A, B = Trilateration._linearize(x0[epochs], sat_coords[epochs], distances[epochs], mask[epochs])
+
+            # Optimization
+            AtP = np.swapaxes(A * P[epochs, :, None], 1, 2)
+            N[epochs] = AtP @ A
+            K = AtP @ B[..., None]
+            try:
+                dx = np.linalg.solve(N[epochs], K)[..., 0]
+            except np.linalg.LinAlgError:
+                # Degenerated geometry for some epochs.
+                dx = (np.linalg.pinv(N[epochs]) @ K)[..., 0]
+
+            # Update the parameters vectors and residuals
+            x0[epochs] += dx
+            v[epochs] = B - (A @ dx[..., None])[..., 0]
+            active[epochs] = np.max(np.abs(dx), axis=-1) > epsilon
+
+        # Variance factors and covariance matrices, from the Cholesky factors of the normal matrices.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sigma0_2 = np.where(nb_obs > 4, np.sum(P * v ** 2, axis=-1) / (nb_obs - 4), np.nan)
+        Qx = np.full((nb_epochs, 4, 4), np.nan)
+        try:
+            L_inv = np.linalg.inv(np.linalg.cholesky(N[solvable]))
+            Qx[solvable] = np.swapaxes(L_inv, 1, 2) @ L_inv
+        except np.linalg.LinAlgError:
+            Qx[solvable] = np.linalg.pinv(N[solvable])
+        Qx *= sigma0_2[:, None, None]
+
+        x0[~solvable] = np.nan
+        return x0[:, :3], x0[:, 3], np.where(solvable, sigma0_2, np.nan), Qx
+
     def __call__(self, *args, **kwargs):
         return self.optimize(*args, **kwargs)
@@ -0,0 +1,78 @@
+# Encoding: UTF-8
+# File: test_cache.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+# Basic imports
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# GNSS ToolBox
+from gnsstools.rinex.cache import FileCache
+from gnsstools.rinex.datasets import PositionDataFrame
+
+
+def make_dataframe(size=100):
+    index = pd.MultiIndex.from_arrays([
+        np.full(size, "G"),
+        np.arange(size) % 32 + 1,
+        np.datetime64("2018-10-12T00:00:00", "ns") + np.arange(size).astype("timedelta64[s]")
+    ], names=["System", "PRN", "Date"])
+    df = PositionDataFrame({"X": np.random.rand(size), "Y": np.random.rand(size), "Z": np.random.rand(size)},
+                           index=index)
+    df.attrs = {"Version": 3.03, "Type": "N", "Agencies": ["IGS", "COD"], "Count": np.int64(size)}
+    return df
+
+
+def entries(cache_dir):
+    return sorted(name for name in os.listdir(cache_dir) if not name.startswith("."))
+
+
+def test_round_trip(tmp_path):
+    cache = FileCache(tmp_path)
+    df = make_dataframe()
+    assert cache.set("a", df)
+    loaded = cache.get("a")
+    assert type(loaded) is PositionDataFrame
+    pd.testing.assert_frame_equal(loaded, df, check_index_type=False)
+    assert loaded.attrs == {"Version": 3.03, "Type": "N", "Agencies": ["IGS", "COD"], "Count": 100}
+    # The archive is loaded without pickle.
+    with np.load(tmp_path / "a.npz", allow_pickle=False) as archive:
+        assert all(archive[name].dtype != object for name in archive.files)
+
+
+def test_objects_are_not_cached(tmp_path):
+    cache = FileCache(tmp_path)
+    df = make_dataframe()
+    df["Flag"] = [None] * len(df)
+    assert not cache.set("a", df)
+    assert entries(tmp_path) == []
+
+
+def test_evict_keeps_new_entry(tmp_path):
+    cache = FileCache(tmp_path)
+    cache.set("a", make_dataframe())
+    size = os.path.getsize(tmp_path / "a.npz")
+    cache.max_size = int(size * 1.5)
+    os.utime(tmp_path / "a.npz", (0, 0))
+    cache.set("b", make_dataframe())
+    assert entries(tmp_path) == ["b.npz"]
+    # An entry larger than the cache is not stored, and does not evict the others.
+    assert not cache.set("c", make_dataframe(10_000))
+    assert entries(tmp_path) == ["b.npz"]
+
+
+def test_failed_write_is_removed(tmp_path, monkeypatch):
+    def savez(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    cache = FileCache(tmp_path)
+    monkeypatch.setattr(np, "savez", savez)
+    with pytest.raises(OSError):
+        cache.set("a", make_dataframe())
+    assert entries(tmp_path) == []
@@ -0,0 +1,54 @@
+# Encoding: UTF-8
+# File: test_chebyshev.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+# Basic imports
+import numpy as np
+import pandas as pd
+
+# GNSS ToolBox
+from gnsstools.orbits.chebyshev import ChebyshevOrbit
+from gnsstools.rinex.datasets import PositionDataFrame
+
+
+ORIGIN = np.datetime64("2018-10-12T00:00:00", "ns")
+RADIUS = 26_560.   # km
+PERIOD = 43_082.   # s
+
+
+def orbit(seconds):
+    angle = 2 * np.pi * seconds / PERIOD
+    return np.column_stack([RADIUS * np.cos(angle), RADIUS * np.sin(angle), np.zeros(len(seconds))])
+
+
+def make_dataframe(epochs):
+    """Circular orbits tabulated every 15 minutes, with ``epochs`` the number of epochs per PRN."""
+    frames = []
+    for prn, num_epochs in epochs.items():
+        seconds = 900. * np.arange(num_epochs)
+        index = pd.MultiIndex.from_arrays([
+            np.full(num_epochs, "G"), np.full(num_epochs, prn), ORIGIN + (seconds * 1e9).astype("timedelta64[ns]")
+        ], names=["System", "PRN", "Date"])
+        coords = orbit(seconds)
+        frames.append(pd.DataFrame({"X": coords[:, 0], "Y": coords[:, 1], "Z": coords[:, 2],
+                                    "Clock": np.full(num_epochs, 100.)}, index=index))
+    return PositionDataFrame(pd.concat(frames))
+
+
+def test_skip_short_arcs():
+    df = make_dataframe({1: 97, 2: 1, 3: 5})
+    with np.errstate(all="raise"):
+        chebyshev = ChebyshevOrbit.fit(df, degree=10)
+    assert chebyshev.unfitted == [("G", 2), ("G", 3)]
+    assert chebyshev.residuals.loc[("G", 2)].isna().all()
+
+    seconds = np.arange(0, 86_400, 60.)
+    positions, clocks = chebyshev.evaluate("G", 1, ORIGIN + (seconds * 1e9).astype("timedelta64[ns]"))
+    assert np.max(np.linalg.norm(positions - orbit(seconds) * 1e3, axis=-1)) < 1e-2
+    np.testing.assert_allclose(clocks, 1e-4)
+    positions, clocks = chebyshev.evaluate("G", 2, ORIGIN)
+    assert np.all(np.isnan(positions)) and np.isnan(clocks)
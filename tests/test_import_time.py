@@ -0,0 +1,69 @@
+# Encoding: UTF-8
+# File: test_import_time.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+r"""
+Check that importing ``gnsstools`` stays fast: the heavy dependencies are only imported on first use.
+Each import is timed in a fresh interpreter, without the start-up of Python itself.
+"""
+
+
+# Basic imports
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Agreed target: tens of milliseconds per import. The cap is loose, to not fail on slow machines.
+IMPORT_TIME = 0.1
+
+# Dependencies that must not be imported until they are used.
+HEAVY_MODULES = ["pandas", "georinex", "xarray", "gnsstoolbox", "shapely"]
+
+SCRIPT = """
+import json, sys, time
+{setup}
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"time": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _import(statement, setup=""):
+    """Run ``statement`` in a new interpreter, and return its duration and the modules imported."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get("PYTHONPATH", "")]))
+    output = subprocess.run([sys.executable, "-c", SCRIPT.format(setup=setup, statement=statement)],
+                            env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    # Only the last line is ours, some dependencies print on import.
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("statement", [
+    "import gnsstools",
+    "import gnsstools.gnsstime",
+    "import gnsstools.rinex",
+])
+def test_import_packages(statement):
+    result = _import(statement)
+    imported = [name for name in HEAVY_MODULES + ["numpy"] if name in result["modules"]]
+    assert imported == [], f"{statement!r} imported {imported}"
+    assert result["time"] < IMPORT_TIME, f"{statement!r} took {result['time'] * 1000:.0f} ms"
+
+
+def test_import_nav_reader():
+    # The readers need numpy, whose own import time (about 50 to 100 ms) is not counted.
+    statement = "from gnsstools.rinex import RinexNavReader"
+    result = _import(statement, setup="import numpy")
+    imported = [name for name in HEAVY_MODULES if name in result["modules"]]
+    assert imported == [], f"{statement!r} imported {imported}"
+    assert result["time"] < IMPORT_TIME, f"{statement!r} took {result['time'] * 1000:.0f} ms"
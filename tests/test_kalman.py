@@ -0,0 +1,43 @@
+# Encoding: UTF-8
+# File: test_kalman.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+# Basic imports
+import numpy as np
+
+# GNSS ToolBox
+from gnsstools.kalman import KalmanFilter
+
+
+RECEPTOR = np.array([4_201_575., 189_856., 4_779_066.])
+CDT = 1_500.
+
+
+def _epoch(rng, num_satellites, sigma=1.):
+    """Satellites above the receptor (about 20 000 km away), and their noisy pseudo-ranges."""
+    up = RECEPTOR / np.linalg.norm(RECEPTOR)
+    directions = rng.normal(size=(num_satellites, 3))
+    directions /= np.linalg.norm(directions, axis=-1)[:, None]
+    # Keep the satellites above the horizon.
+    directions = np.where((directions @ up)[:, None] < 0.2, directions + up, directions)
+    directions /= np.linalg.norm(directions, axis=-1)[:, None]
+    sat_coords = RECEPTOR + 2.2e7 * directions
+    distances = np.linalg.norm(sat_coords - RECEPTOR, axis=-1) + CDT + rng.normal(0, sigma, num_satellites)
+    return sat_coords, distances
+
+
+def test_start_on_four_satellites():
+    rng = np.random.default_rng(0)
+    kalman = KalmanFilter(sigma=1.)
+    start = np.datetime64("2018-10-12T00:00:00", "ns")
+    rec_coords, cdt = kalman.update(start, *_epoch(rng, 4))
+    assert np.all(np.isfinite(kalman.covariance))
+    for second in range(1, 30):
+        rec_coords, cdt = kalman.update(start + np.timedelta64(second, "s"), *_epoch(rng, 7))
+    assert np.all(np.isfinite(rec_coords))
+    assert np.linalg.norm(rec_coords - RECEPTOR) < 10
+    assert abs(cdt - CDT) < 10
@@ -0,0 +1,57 @@
+# Encoding: UTF-8
+# File: test_raim.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+# Basic imports
+import numpy as np
+
+# GNSS ToolBox
+from gnsstools.raim import RAIM
+
+
+RECEPTOR = np.array([4_201_575., 189_856., 4_779_066.])
+CDT = 1_500.
+
+
+def _epochs(rng, num_epochs, num_satellites, sigma=1.):
+    """Satellites above the receptor (about 20 000 km away), and their noisy pseudo-ranges."""
+    up = RECEPTOR / np.linalg.norm(RECEPTOR)
+    directions = rng.normal(size=(num_epochs, num_satellites, 3))
+    directions /= np.linalg.norm(directions, axis=-1)[..., None]
+    directions = np.where((directions @ up)[..., None] < 0.2, directions + up, directions)
+    directions /= np.linalg.norm(directions, axis=-1)[..., None]
+    sat_coords = RECEPTOR + 2.2e7 * directions
+    noise = rng.normal(0, sigma, (num_epochs, num_satellites))
+    distances = np.linalg.norm(sat_coords - RECEPTOR, axis=-1) + CDT + noise
+    return sat_coords, distances
+
+
+def test_exclude_one_fault():
+    rng = np.random.default_rng(0)
+    sat_coords, distances = _epochs(rng, 50, 9)
+    distances[:, 2] += 300
+    rec_coords, cdt, excluded, fault = RAIM(sigma=1., max_exclusions=1).optimize(sat_coords, distances)
+    assert np.mean(excluded[:, 2]) > 0.9
+    assert np.median(np.linalg.norm(rec_coords - RECEPTOR, axis=-1)) < 5
+
+
+def test_exclude_two_faults():
+    rng = np.random.default_rng(1)
+    sat_coords, distances = _epochs(rng, 50, 10)
+    distances[:, [2, 5]] += 300
+    rec_coords, cdt, excluded, fault = RAIM(sigma=1., max_exclusions=2).optimize(sat_coords, distances)
+    both = excluded[:, 2] & excluded[:, 5]
+    # The greedy exclusion may leave out a healthy satellite first, but such epochs are reported.
+    assert np.mean(both) > 0.7
+    assert np.all(both | fault)
+    assert np.count_nonzero(excluded.sum(axis=-1) > 2) == 0
+    assert np.median(np.linalg.norm(rec_coords[both] - RECEPTOR, axis=-1)) < 5
+    assert not np.any(fault[both])
+
+    # A single exclusion is not enough: the remaining fault is reported.
+    rec_coords, cdt, excluded, fault = RAIM(sigma=1., max_exclusions=1).optimize(sat_coords, distances)
+    assert np.mean(fault) > 0.9
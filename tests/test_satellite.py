@@ -0,0 +1,49 @@
+# Encoding: UTF-8
+# File: test_satellite.py
+# Creation: Saturday October 17th 2026
+# Author: Arthur Dujardin (arthurdjn)
+# ------
+# Copyright (c) 2021, Makina Corpus
+
+
+# Basic imports
+import numpy as np
+
+# GNSS ToolBox
+from gnsstools import gnsstime
+from gnsstools.satellites.gps import GPS
+from gnsstools.satellites.funtional import get_satellites_position
+
+
+# Navigation message of G02, from BRDC00IGS_R_20182850000_01D_MN.rnx.
+EPHEMERIS = {
+    "sv_clock_bias": -2.73766927421e-05, "sv_clock_drift": -1.08002495836e-11, "sv_clock_drift_rate": 0.0,
+    "iode": 34.0, "crs": 19.3125, "delta_n": 4.54840374499e-09, "m0": 1.73098360651,
+    "cuc": 8.27014446259e-07, "e": 0.0182396549499, "cus": 9.38586890697e-06, "sqrt_a": 5153.57457924,
+    "toe": 432000.0, "cic": -1.210719347e-07, "omega0": 1.08869819985, "cis": -5.25265932083e-07,
+    "i0": 0.951740559746, "crc": 192.40625, "omega": -1.82477717281, "omega_dot": -8.04747806691e-09,
+    "idot": 5.87167315018e-10, "l2_codes": 1.0, "gps_week": 2022.0, "l2_pflag": 0.0,
+    "sv_acc": 2.4, "sv_health": 0.0, "tgd": -2.04890966415e-08, "iodc": 34.0,
+    "trans_time": 424818.0, "fit_inter": 4.0
+}
+DATE = np.datetime64("2018-10-12T00:40:15", "ns")
+
+
+def test_set_invariant_parameters():
+    satellite = GPS(prn=2, toc=gnsstime(2018, 10, 12, 0, 0, 0), **EPHEMERIS)
+    before = satellite.position(DATE)
+    for name, delta in [("sqrt_a", 10.), ("e", 1e-3), ("delta_n", 1e-9)]:
+        setattr(satellite, name, getattr(satellite, name) + delta)
+        # Same position as without the precomputed invariants.
+        expected, _ = get_satellites_position(satellite, DATE)
+        np.testing.assert_allclose(satellite.position(DATE), expected, rtol=0, atol=1e-6)
+    assert np.linalg.norm(satellite.position(DATE) - before) > 1_000
+
+
+def test_copy():
+    satellite = GPS(prn=2, toc=gnsstime(2018, 10, 12, 0, 0, 0), **EPHEMERIS)
+    copy = satellite.copy()
+    np.testing.assert_array_equal(copy.position(DATE), satellite.position(DATE))
+    copy.sqrt_a += 10.
+    assert satellite.sqrt_a == EPHEMERIS["sqrt_a"]
+    assert np.linalg.norm(copy.position(DATE) - satellite.position(DATE)) > 1_000